@@ -1,767 +1,279 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from pptx import Presentation
-from pptx.util import Inches
-from pptx.enum.shapes import MSO_SHAPE
-from pptx.dml.color import RGBColor
 import io
-import base64
-from openpyxl import load_workbook
+import time
 
-def extract_wells_with_net_diff_bo(file_content):
+import report_core as core
+from report_core.drilling_index import DrillingReportIndex
+from report_core.history import HistoryStore, duplicate_wells, history_rows
+
+# Refresh interval of the background PowerPoint build progress
+PPT_POLL_SECONDS = 0.5
+
+def render_diagnostics(diagnostics):
     """
-    Extract wells that have Net Diff BO values (excluding zeros) from specific columns and stop at TOTAL row
+    Show diagnostics returned by the core pipeline with the matching Streamlit element
     """
-    try:
-        # Read the Excel file with multi-level headers, skipping first 6 rows
-        df = pd.read_excel(
-            file_content, 
-            sheet_name='Report', 
-            skiprows=6,
-            header=[0, 1]  # Two header rows
-        )
-        
+    for diagnostic in diagnostics:
+        getattr(st, diagnostic.level)(diagnostic.message)
+        if diagnostic.detail:
+            st.error(f"Detailed error: {diagnostic.detail}")
+
+@st.cache_resource
+def get_history_store():
+    """
+    Local production history database shared by all sessions
+    """
+    return HistoryStore()
+
+@st.cache_resource
+def get_drilling_index():
+    """
+    Local full-text index of drilling report summaries shared by all sessions
+    """
+    return DrillingReportIndex()
+
+def record_production_history(result):
+    """
+    Store an extraction in the production history (a no-op for reports that were already stored)
+    """
+    store = get_history_store()
+    if store.has_report(result.content_hash):
+        return
+    
+    duplicates = duplicate_wells(history_rows(result))
+    if duplicates:
+        st.warning(f"⚠️ Wells listed more than once in this report (every row is stored): {', '.join(duplicates)}")
+    
+    if result.report_date is not None:
+        written = store.ingest_result(result)
+        st.caption(f"💾 Saved {written} wells to the production history for {result.report_date:%Y-%m-%d}")
+        return
+    
+    # Without a detectable date the user has to pick one before the report can be stored
+    history_col1, history_col2 = st.columns([2, 1])
+    with history_col1:
+        report_date = st.date_input("📅 Report date for the production history", key="history_report_date")
+    with history_col2:
+        if st.button("💾 Save to History", use_container_width=True, key="history_save"):
+            written = store.ingest_result(result, report_date=report_date)
+            st.success(f"✅ Saved {written} wells to the production history for {report_date:%Y-%m-%d}")
+
+def upload_id(uploaded_file):
+    """
+    Identity of an upload that changes when a file is uploaded again
+    """
+    return getattr(uploaded_file, 'file_id', None) or f"{uploaded_file.name}:{uploaded_file.size}"
+
+def production_session_artifacts(uploaded_file):
+    """
+    Per-upload results kept in the session: extraction, charts and built exports
+
+    A different upload (new Streamlit file id) starts from an empty dict, so reruns for the same
+    upload reuse everything without touching the pipeline.
+    """
+    file_id = upload_id(uploaded_file)
+    session = st.session_state.get('production_session')
+    if session is None or session['file_id'] != file_id:
+        session = {'file_id': file_id, 'artifacts': {}}
+        st.session_state['production_session'] = session
+    return session['artifacts']
+
+def session_artifact(artifacts, name, build, *args, **kwargs):
+    """
+    build(*args, **kwargs), computed only the first time `name` is requested for the upload
+    """
+    if name not in artifacts:
+        artifacts[name] = build(*args, **kwargs)
+    return artifacts[name]
+
+def extract_wells_with_net_diff_bo(file_content, artifacts):
+    """
+    Run the production extraction once per upload and render its column structure and diagnostics
+    """
+    result = session_artifact(artifacts, 'extraction', core.extract_wells_with_net_diff_bo, file_content)
+    if result.columns_info is not None:
         st.subheader("🔍 Detected Column Structure")
-        
-        # Display all columns to help with debugging
-        columns_info = []
-        for i, col in enumerate(df.columns):
-            col_info = {
-                'Column Index': i,
-                'Level 0': str(col[0]) if pd.notna(col[0]) else '',
-                'Level 1': str(col[1]) if len(col) > 1 and pd.notna(col[1]) else '',
-                'Full Name': str(col)
-            }
-            columns_info.append(col_info)
-        
-        columns_df = pd.DataFrame(columns_info)
-        st.dataframe(columns_df)
-        
-        # Find the specific columns we need
-        field_col = None
-        well_name_col = None
-        net_diff_bo_col = None
-        net_bo_col = None
-        wc_col = None
-        
-        for i, col in enumerate(df.columns):
-            # Look for the exact column structures
-            if str(col) == "('TOTAL PRODUCTION', 'Net diff. BO')":
-                net_diff_bo_col = col
-                st.success(f"✅ Found Net Diff BO column: {col} (Index {i})")
-            
-            elif str(col) == "('TOTAL PRODUCTION', 'Net\\nBO')" or "('TOTAL PRODUCTION', 'Net\nBO')" in str(col):
-                net_bo_col = col
-                st.success(f"✅ Found Net BO column: {col} (Index {i})")
-            
-            # Field column - look for ('Field', 'Unnamed: 0_level_1')
-            elif str(col) == "('Field', 'Unnamed: 0_level_1')":
-                field_col = col
-                st.success(f"✅ Found Field column: {col} (Index {i})")
-            
-            # Well name column - look for ('RUNNING WELLS', 'Unnamed: 1_level_1')
-            elif str(col) == "('RUNNING WELLS', 'Unnamed: 1_level_1')":
-                well_name_col = col
-                st.success(f"✅ Found Well Name column: {col} (Index {i})")
-            
-            # W/C column - look for ('W/C', '%')
-            elif str(col) == "('W/C', '%')":
-                wc_col = col
-                st.success(f"✅ Found W/C column: {col} (Index {i})")
-        
-        # Validation
-        if field_col is None:
-            st.error("❌ Could not find 'Field' column")
-            return None, None, None, None, None
-        
-        if well_name_col is None:
-            st.error("❌ Could not find well name column")
-            return None, None, None, None, None
-        
-        if net_diff_bo_col is None:
-            st.error("❌ Could not find 'Net diff. BO' column")
-            return None, None, None, None, None
-        
-        if net_bo_col is None:
-            st.error("❌ Could not find 'Net BO' column")
-            return None, None, None, None, None
-        
-        if wc_col is None:
-            st.warning("⚠️ Could not find 'W/C' column, but continuing with analysis")
-        
-        # Convert numeric columns
-        df[net_diff_bo_col] = pd.to_numeric(df[net_diff_bo_col], errors='coerce')
-        df[net_bo_col] = pd.to_numeric(df[net_bo_col], errors='coerce')
-        if wc_col:
-            df[wc_col] = pd.to_numeric(df[wc_col], errors='coerce')
-        
-        # Find where to stop (at "TOTAL" in Field column)
-        stop_index = None
-        for idx, value in enumerate(df[field_col]):
-            if pd.notna(value) and 'TOTAL' in str(value).upper():
-                stop_index = idx
-                st.info(f"🛑 Found 'TOTAL' row at index {idx}, stopping extraction here")
-                break
-        
-        # If no TOTAL found, use all rows
-        if stop_index is None:
-            stop_index = len(df)
-            st.warning("⚠️ No 'TOTAL' row found, using all available data")
-        
-        # Filter rows up to the TOTAL row
-        df_before_total = df.iloc[:stop_index].copy()
-        
-        # Calculate TOTAL statistics for ALL wells (including zeros)
-        all_wells_count = len(df_before_total)
-        total_net_bo_all = df_before_total[net_bo_col].sum()
-        total_net_diff_bo_all = df_before_total[net_diff_bo_col].sum()
-        total_wc_all = df_before_total[wc_col].sum() if wc_col else 0
-        
-        # Filter rows that have Net diff. BO values AND are not zero (but include negative values)
-        filtered_df = df_before_total[
-            (df_before_total[net_diff_bo_col].notna()) & 
-            (df_before_total[net_diff_bo_col] != 0)  # Exclude zeros but include negatives
-        ].copy()
-        
-        if filtered_df.empty:
-            st.warning("⚠️ No wells found with non-zero Net Diff BO values before TOTAL row")
-            return None, None, None, None, None
-        
-        # Show how many wells were filtered out due to zero values
-        all_wells_with_net_diff = df_before_total[df_before_total[net_diff_bo_col].notna()]
-        zero_wells_count = len(all_wells_with_net_diff[all_wells_with_net_diff[net_diff_bo_col] == 0])
-        st.info(f"📊 Filtered out {zero_wells_count} wells with zero Net Diff BO values")
-        
-        # Show distribution of positive vs negative values
-        positive_count = len(filtered_df[filtered_df[net_diff_bo_col] > 0])
-        negative_count = len(filtered_df[filtered_df[net_diff_bo_col] < 0])
-        st.info(f"📈 Value distribution: {positive_count} positive, {negative_count} negative Net Diff BO values")
-        
-        # Select the columns we need in the correct order
-        result_columns = [field_col, well_name_col, net_bo_col, net_diff_bo_col]
-        if wc_col:
-            result_columns.append(wc_col)
-        
-        # Create final result dataframe
-        result_df = filtered_df[result_columns].copy()
-        
-        # Clean up the data - remove rows where well name is empty or is a field name
-        field_names = ['Ferdaus', 'Sidra', 'Ganna', 'Rayan', 'Abrar', 'Abrar-South', 'Rawda']
-        
-        # Filter out rows where well_name is actually a field name
-        mask = ~result_df[well_name_col].isin(field_names)
-        result_df = result_df[mask].copy()
-        
-        # Remove rows where well_name is empty or NaN
-        result_df = result_df[result_df[well_name_col].notna()]
-        result_df = result_df[result_df[well_name_col] != '']
-        
-        result_df = result_df.reset_index(drop=True)
-        
-        # Calculate totals and statistics for non-zero wells
-        total_net_bo_non_zero = result_df[net_bo_col].sum()
-        total_net_diff_bo_non_zero = result_df[net_diff_bo_col].sum()
-        total_wc_non_zero = result_df[wc_col].sum() if wc_col else 0
-        well_count_non_zero = len(result_df)
-        
-        # Calculate statistics for both ALL wells and non-zero wells
-        stats = {
-            # All Wells Statistics
-            'Total All Wells': all_wells_count,
-            'Total Net BO (All Wells)': total_net_bo_all,
-            'Total Net Diff BO (All Wells)': total_net_diff_bo_all,
-            'Total W/C (All Wells)': total_wc_all,
-            'Average Net BO (All Wells)': df_before_total[net_bo_col].mean(),
-            'Average Net Diff BO (All Wells)': df_before_total[net_diff_bo_col].mean(),
-            'Average W/C (All Wells)': df_before_total[wc_col].mean() if wc_col else 0,
-            
-            # Non-Zero Wells Statistics
-            'Total Wells with Non-Zero Net Diff BO': well_count_non_zero,
-            'Positive Net Diff BO Wells': positive_count,
-            'Negative Net Diff BO Wells': negative_count,
-            'Total Net BO (Non-Zero Wells)': total_net_bo_non_zero,
-            'Total Net Diff BO (Non-Zero Wells)': total_net_diff_bo_non_zero,
-            'Total W/C (Non-Zero Wells)': total_wc_non_zero,
-            'Average Net BO (Non-Zero Wells)': result_df[net_bo_col].mean(),
-            'Average Net Diff BO (Non-Zero Wells)': result_df[net_diff_bo_col].mean(),
-            'Average W/C (Non-Zero Wells)': result_df[wc_col].mean() if wc_col else 0,
-            'Maximum Net BO': result_df[net_bo_col].max(),
-            'Maximum Net Diff BO': result_df[net_diff_bo_col].max(),
-            'Maximum W/C': result_df[wc_col].max() if wc_col else 0,
-            'Minimum Net BO': result_df[net_bo_col].min(),
-            'Minimum Net Diff BO': result_df[net_diff_bo_col].min(),
-            'Minimum W/C': result_df[wc_col].min() if wc_col else 0,
-            'Median Net BO': result_df[net_bo_col].median(),
-            'Median Net Diff BO': result_df[net_diff_bo_col].median(),
-            'Median W/C': result_df[wc_col].median() if wc_col else 0,
-            'Standard Deviation Net BO': result_df[net_bo_col].std(),
-            'Standard Deviation Net Diff BO': result_df[net_diff_bo_col].std(),
-            'Standard Deviation W/C': result_df[wc_col].std() if wc_col else 0
-        }
-        
-        # Create the final dataframe with proper column structure
-        final_df = result_df.copy()
-        
-        # Format numeric columns
-        for col in [net_bo_col, net_diff_bo_col]:
-            if col in final_df.columns and final_df[col].dtype in [np.float64, np.int64]:
-                final_df[col] = final_df[col].round(2)
-        
-        if wc_col and wc_col in final_df.columns and final_df[wc_col].dtype in [np.float64, np.int64]:
-            final_df[wc_col] = final_df[wc_col].round(2)
-        
-        # Add TOTAL (All Wells) row with net bo and net diff bo
-        total_row_all_data = {
-            field_col: 'TOTAL (All Wells)',
-            well_name_col: f'{all_wells_count} Total Wells',
-            net_bo_col: total_net_bo_all,
-            net_diff_bo_col: total_net_diff_bo_all
-        }
-        
-        if wc_col:
-            total_row_all_data[wc_col] = total_wc_all
-        
-        total_row_all = pd.DataFrame([total_row_all_data])
-        
-        # Combine main data with total row
-        final_df = pd.concat([final_df, total_row_all], ignore_index=True)
-        
-        st.success(f"✅ Successfully extracted {well_count_non_zero} wells with non-zero Net Diff BO values")
-        
-        # Return the original columns including W/C if found
-        original_columns = [field_col, well_name_col, net_bo_col, net_diff_bo_col]
-        if wc_col:
-            original_columns.append(wc_col)
-        
-        return final_df, well_count_non_zero, stats, original_columns, df_before_total
-        
-    except Exception as e:
-        st.error(f"❌ Error processing file: {str(e)}")
-        import traceback
-        st.error(f"Detailed error: {traceback.format_exc()}")
-        return None, None, None, None, None
+        st.dataframe(result.columns_info)
+    render_diagnostics(result.diagnostics)
+    if result.ok:
+        record_production_history(result)
+    return result
 
-def create_visualizations(data_without_total, original_columns, all_wells_data):
+def create_visualizations(data_without_total, original_columns, all_wells_data, artifacts):
     """
-    Create simplified statistical visualizations with only three charts
+    Prepare the dashboard charts once per upload and render any diagnostics
     """
-    try:
-        # Check if we have valid data for visualizations
-        if data_without_total.empty or all_wells_data.empty:
-            st.warning("No data available for visualizations")
-            return None
-            
-        # Extract the column names
-        field_col = original_columns[0]      # ('Field', 'Unnamed: 0_level_1')
-        well_name_col = original_columns[1]  # ('RUNNING WELLS', 'Unnamed: 1_level_1')
-        net_bo_col = original_columns[2]     # ('TOTAL PRODUCTION', 'Net\nBO')
-        net_diff_bo_col = original_columns[3] # ('TOTAL PRODUCTION', 'Net diff. BO')
-        wc_col = original_columns[4] if len(original_columns) > 4 else None  # ('W/C', '%')
-        
-        # Create clean copies for visualization
-        viz_data_non_zero = data_without_total.copy()
-        viz_data_all = all_wells_data.copy()
-        
-        # Remove rows with NaN values in the key columns for visualization
-        viz_data_non_zero = viz_data_non_zero[
-            viz_data_non_zero[well_name_col].notna() & 
-            viz_data_non_zero[net_bo_col].notna() & 
-            viz_data_non_zero[net_diff_bo_col].notna()
-        ]
-        
-        viz_data_all = viz_data_all[
-            viz_data_all[well_name_col].notna() & 
-            viz_data_all[net_bo_col].notna()
-        ]
-        
-        # Check if we have any data left after cleaning
-        if viz_data_non_zero.empty or viz_data_all.empty:
-            st.warning("No valid data available for visualizations after removing NaN values")
-            return None
-        
-        # Extract clean data for visualization
-        # Non-zero wells data
-        well_names_non_zero = viz_data_non_zero[well_name_col]
-        net_bo_data_non_zero = viz_data_non_zero[net_bo_col]
-        net_diff_bo_data_non_zero = viz_data_non_zero[net_diff_bo_col]
-        wc_data_non_zero = viz_data_non_zero[wc_col] if wc_col and wc_col in viz_data_non_zero.columns else None
-        
-        # All wells data
-        well_names_all = viz_data_all[well_name_col]
-        net_bo_data_all = viz_data_all[net_bo_col]
-        
-        # Check for finite values
-        if (net_bo_data_non_zero.isna().all() or net_diff_bo_data_non_zero.isna().all() or 
-            not np.isfinite(net_bo_data_non_zero).any() or not np.isfinite(net_diff_bo_data_non_zero).any() or
-            net_bo_data_all.isna().all() or not np.isfinite(net_bo_data_all).any()):
-            st.warning("No finite values available for visualization")
-            return None
-        
-        # Create simplified subplots - 1 row, 3 columns for better layout
-        fig, axes = plt.subplots(1, 3, figsize=(18, 6))
-        fig.suptitle('Production Analysis Dashboard', fontsize=16, fontweight='bold')
-        
-        # 1. Net Diff BO by Well (Non-Zero Wells - Top 15)
-        if len(net_diff_bo_data_non_zero) > 0 and len(well_names_non_zero) > 0:
-            display_data = pd.DataFrame({
-                'well_name': well_names_non_zero,
-                'net_diff_bo': net_diff_bo_data_non_zero
-            }).head(15)
-            
-            display_wells = display_data['well_name']
-            display_net_diff = display_data['net_diff_bo']
-            
-            bars = axes[0].bar(range(len(display_wells)), display_net_diff, 
-                              color=['lightgreen' if x >= 0 else 'lightcoral' for x in display_net_diff],
-                              alpha=0.7)
-            axes[0].set_xlabel('Wells')
-            axes[0].set_ylabel('Net Diff BO')
-            axes[0].set_title('Net Diff BO Performance (Top 15 Wells)')
-            axes[0].set_xticks(range(len(display_wells)))
-            axes[0].set_xticklabels(display_wells, rotation=45, ha='right')
-            axes[0].grid(True, alpha=0.3)
-            
-            for bar, value in zip(bars, display_net_diff):
-                height = bar.get_height()
-                axes[0].text(bar.get_x() + bar.get_width()/2., height,
-                            f'{value:.1f}', ha='center', va='bottom' if height >= 0 else 'top',
-                            fontsize=8)
-        else:
-            axes[0].text(0.5, 0.5, 'No data available', ha='center', va='center', transform=axes[0].transAxes)
-            axes[0].set_title('Net Diff BO Performance')
-        
-        # 2. Net BO by Well (Non-Zero Wells - Top 15)
-        if len(net_bo_data_non_zero) > 0 and len(well_names_non_zero) > 0:
-            display_data = pd.DataFrame({
-                'well_name': well_names_non_zero,
-                'net_bo': net_bo_data_non_zero
-            }).head(15)
-            
-            display_wells = display_data['well_name']
-            display_net_bo = display_data['net_bo']
-            
-            bars = axes[1].bar(range(len(display_wells)), display_net_bo, 
-                              color='skyblue', alpha=0.7)
-            axes[1].set_xlabel('Wells')
-            axes[1].set_ylabel('Net BO')
-            axes[1].set_title('Net BO Production (Top 15 Wells)')
-            axes[1].set_xticks(range(len(display_wells)))
-            axes[1].set_xticklabels(display_wells, rotation=45, ha='right')
-            axes[1].grid(True, alpha=0.3)
-            
-            for bar, value in zip(bars, display_net_bo):
-                height = bar.get_height()
-                axes[1].text(bar.get_x() + bar.get_width()/2., height,
-                            f'{value:.0f}', ha='center', va='bottom',
-                            fontsize=8)
-        else:
-            axes[1].text(0.5, 0.5, 'No data available', ha='center', va='center', transform=axes[1].transAxes)
-            axes[1].set_title('Net BO Production')
-        
-        # 3. Top 10 Wells with Highest Net BO (ALL WELLS)
-        if len(net_bo_data_all) > 0 and len(well_names_all) > 0:
-            # Get top 10 wells with highest Net BO from ALL wells
-            top_wells_all = pd.DataFrame({
-                'well_name': well_names_all,
-                'net_bo': net_bo_data_all
-            }).nlargest(10, 'net_bo')
-            
-            # Create horizontal bar chart for better readability
-            bars = axes[2].barh(range(len(top_wells_all)), top_wells_all['net_bo'], 
-                               color='gold', alpha=0.7, edgecolor='darkorange', linewidth=1)
-            axes[2].set_xlabel('Net BO')
-            axes[2].set_ylabel('Wells')
-            axes[2].set_title('Top 10 Highest Producing Wells')
-            axes[2].set_yticks(range(len(top_wells_all)))
-            axes[2].set_yticklabels(top_wells_all['well_name'])
-            axes[2].grid(True, alpha=0.3)
-            
-            # Add value labels on bars
-            for bar, value in zip(bars, top_wells_all['net_bo']):
-                width = bar.get_width()
-                axes[2].text(width + width*0.01, bar.get_y() + bar.get_height()/2.,
-                            f'{value:.0f}', ha='left', va='center', fontsize=9, fontweight='bold')
-        else:
-            axes[2].text(0.5, 0.5, 'No data available', ha='center', va='center', transform=axes[2].transAxes)
-            axes[2].set_title('Top 10 Highest Producing Wells')
-        
-        plt.tight_layout()
-        return fig
-        
-    except Exception as e:
-        st.error(f"❌ Error creating visualizations: {str(e)}")
-        import traceback
-        st.error(f"Detailed error: {traceback.format_exc()}")
-        return None
+    result = session_artifact(artifacts, 'charts', core.create_visualizations,
+                              data_without_total, original_columns, all_wells_data)
+    render_diagnostics(result.diagnostics)
+    return result.value
 
-def create_comprehensive_powerpoint(data_df, well_count, stats, original_columns, visualization_fig):
+def start_powerpoint_build(extraction, charts):
     """
-    Create a comprehensive PowerPoint presentation with data, statistics, and visualizations
+    Queue the PowerPoint report in the background builder (a no-op when this report's deck already exists)
     """
-    try:
-        # Create a new presentation
-        prs = Presentation()
-        
-        # Title slide
-        slide_layout = prs.slide_layouts[0]
-        slide = prs.slides.add_slide(slide_layout)
-        title = slide.shapes.title
-        subtitle = slide.placeholders[1]
-        
-        title.text = "Production Analysis Report"
-        subtitle.text = f"Comprehensive Well Performance Analysis\nTotal Wells: {stats['Total All Wells']}\nGenerated on: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')}\nCreated by: Geol. Hassan Gamal Albery - Geologist @ Norpetco"
-        
-        # Executive Summary Slide
-        slide_layout = prs.slide_layouts[1]
-        slide = prs.slides.add_slide(slide_layout)
-        title = slide.shapes.title
-        title.text = "Executive Summary"
-        
-        # Add summary content
-        content_left = Inches(0.5)
-        content_top = Inches(1.5)
-        content_width = Inches(9.0)
-        content_height = Inches(5.0)
-        
-        text_box = slide.shapes.add_textbox(content_left, content_top, content_width, content_height)
-        text_frame = text_box.text_frame
-        text_frame.word_wrap = True
-        
-        # Add summary points
-        summary_points = [
-            f"• Total Wells Analyzed: {stats['Total All Wells']}",
-            f"• Wells with Non-Zero Net Diff BO: {stats['Total Wells with Non-Zero Net Diff BO']}",
-            f"• Positive Performance Wells: {stats['Positive Net Diff BO Wells']}",
-            f"• Wells Requiring Attention: {stats['Negative Net Diff BO Wells']}",
-            f"• Total Net BO Production: {stats['Total Net BO (All Wells)']:,.0f}",
-            f"• Average Net BO per Well: {stats['Average Net BO (All Wells)']:,.0f}",
-            f"• Highest Producing Well: {stats['Maximum Net BO']:,.0f}",
-            f"• Performance Range: {stats['Minimum Net BO']:,.0f} to {stats['Maximum Net BO']:,.0f}"
-        ]
-        
-        # Add W/C statistics if available
-        if stats['Total W/C (All Wells)'] != 0:
-            summary_points.extend([
-                f"• Total W/C: {stats['Total W/C (All Wells)']:,.2f}%",
-                f"• Average W/C: {stats['Average W/C (All Wells)']:,.2f}%"
-            ])
-        
-        for point in summary_points:
-            p = text_frame.add_paragraph()
-            p.text = point
-            p.space_after = Inches(0.05)
-        
-        # Main Data Table Slide
-        slide_layout = prs.slide_layouts[1]
-        slide = prs.slides.add_slide(slide_layout)
-        title = slide.shapes.title
-        title.text = "Production Data - Key Wells"
-        
-        # Create main data table (show only first 15 rows for readability, including TOTAL row if present)
-        display_data = data_df.head(15) if len(data_df) > 15 else data_df
-        
-        rows = len(display_data) + 1
-        cols = len(display_data.columns)
-        left = Inches(0.5)
-        top = Inches(1.5)
-        width = Inches(9.0)
-        height = Inches(0.8 * min(rows, 12))  # Limit height
-        
-        table = slide.shapes.add_table(rows, cols, left, top, width, height).table
-        
-        # Set column headers
-        for i, column in enumerate(display_data.columns):
-            table.cell(0, i).text = str(column)
-        
-        # Fill table with data
-        for row_idx, (_, row_data) in enumerate(display_data.iterrows(), 1):
-            for col_idx, column in enumerate(display_data.columns):
-                value = row_data[column]
-                if isinstance(value, (int, float)) and column not in [original_columns[0], original_columns[1]]:
-                    table.cell(row_idx, col_idx).text = f"{value:,.2f}"
-                else:
-                    table.cell(row_idx, col_idx).text = str(value)
-        
-        # Key Metrics Slide
-        slide_layout = prs.slide_layouts[1]
-        slide = prs.slides.add_slide(slide_layout)
-        title = slide.shapes.title
-        title.text = "Key Performance Metrics"
-        
-        # Create key metrics table
-        key_metrics = {
-            'Total Wells': stats['Total All Wells'],
-            'Wells with Significant Changes': stats['Total Wells with Non-Zero Net Diff BO'],
-            'Positive Performance Wells': stats['Positive Net Diff BO Wells'],
-            'Wells Requiring Attention': stats['Negative Net Diff BO Wells'],
-            'Total Net BO Production': stats['Total Net BO (All Wells)'],
-            'Total Net Diff BO': stats['Total Net Diff BO (All Wells)'],
-            'Average Net BO per Well': stats['Average Net BO (All Wells)'],
-            'Highest Producing Well': stats['Maximum Net BO'],
-            'Performance Standard Deviation': stats['Standard Deviation Net BO']
-        }
-        
-        # Add W/C metrics if available
-        if stats['Total W/C (All Wells)'] != 0:
-            key_metrics.update({
-                'Total W/C': stats['Total W/C (All Wells)'],
-                'Average W/C': stats['Average W/C (All Wells)']
-            })
-        
-        stats_rows = len(key_metrics) + 1
-        stats_cols = 2
-        left = Inches(1.0)
-        top = Inches(1.5)
-        width = Inches(8.0)
-        height = Inches(0.8 * min(stats_rows, 15))
-        
-        stats_table = slide.shapes.add_table(stats_rows, stats_cols, left, top, width, height).table
-        stats_table.cell(0, 0).text = "Metric"
-        stats_table.cell(0, 1).text = "Value"
-        
-        for idx, (metric, value) in enumerate(key_metrics.items(), 1):
-            stats_table.cell(idx, 0).text = metric
-            if isinstance(value, (int, float)):
-                if value > 1000:
-                    stats_table.cell(idx, 1).text = f"{value:,.0f}"
-                else:
-                    stats_table.cell(idx, 1).text = f"{value:,.2f}"
-            else:
-                stats_table.cell(idx, 1).text = str(value)
-        
-        # Visualization Slides
-        if visualization_fig:
-            # Save figure to bytes
-            img_buffer = io.BytesIO()
-            visualization_fig.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
-            img_buffer.seek(0)
-            
-            # Create individual visualization slides
-            visualization_titles = [
-                "Net Diff BO Performance",
-                "Net BO Production", 
-                "Top 10 Highest Producing Wells"
-            ]
-            
-            for viz_title in visualization_titles:
-                slide_layout = prs.slide_layouts[1]
-                slide = prs.slides.add_slide(slide_layout)
-                title = slide.shapes.title
-                title.text = f"Analysis - {viz_title}"
-                
-                # Add the visualization image
-                left = Inches(1.0)
-                top = Inches(1.5)
-                width = Inches(8.0)
-                slide.shapes.add_picture(img_buffer, left, top, width=width)
-        
-        # Recommendations Slide
-        slide_layout = prs.slide_layouts[1]
-        slide = prs.slides.add_slide(slide_layout)
-        title = slide.shapes.title
-        title.text = "Recommendations & Next Steps"
-        
-        text_box = slide.shapes.add_textbox(content_left, content_top, content_width, content_height)
-        text_frame = text_box.text_frame
-        text_frame.word_wrap = True
-        
-        recommendations = [
-            "🎯 Focus Areas:",
-            "• Analyze top performing wells for best practices replication",
-            "• Review wells with negative Net Diff BO for improvement opportunities",
-            "• Monitor wells with significant performance deviations",
-            "",
-            "📊 Operational Actions:",
-            "• Optimize production parameters for underperforming wells",
-            "• Implement preventive maintenance for critical wells",
-            "• Share best practices from top performers",
-            "",
-            "📈 Continuous Improvement:",
-            "• Regular monitoring of Net Diff BO trends",
-            "• Periodic review of well performance categories",
-            "• Update operational strategies based on performance data"
-        ]
-        
-        for recommendation in recommendations:
-            p = text_frame.add_paragraph()
-            p.text = recommendation
-            p.space_after = Inches(0.03)
-        
-        # Save to bytes buffer
-        ppt_buffer = io.BytesIO()
-        prs.save(ppt_buffer)
-        ppt_buffer.seek(0)
-        
-        return ppt_buffer
-        
-    except Exception as e:
-        st.error(f"❌ Error creating PowerPoint: {str(e)}")
-        import traceback
-        st.error(f"Detailed error: {traceback.format_exc()}")
-        return None
+    result_df, well_count, stats, original_columns, _ = extraction.as_tuple()
+    return core.get_background_builder().submit(
+        core.powerpoint_build_key(extraction.content_hash),
+        core.create_comprehensive_powerpoint,
+        result_df, well_count, stats, original_columns, charts
+    )
 
-def create_excel_with_visualizations(data_df, stats, visualization_fig):
+def powerpoint_build_status(job_key, polling, artifacts):
     """
-    Create an Excel file with data, statistics, and embedded visualizations
+    Progress of a background PowerPoint build, then its download button
     """
-    try:
-        # Create Excel writer
-        excel_buffer = io.BytesIO()
-        
-        with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
-            # Write main data (include TOTAL row)
-            data_df.to_excel(writer, sheet_name='Production Data', index=False)
-            
-            # Write statistics
-            stats_df = pd.DataFrame(list(stats.items()), columns=['Metric', 'Value'])
-            stats_df.to_excel(writer, sheet_name='Statistics', index=False)
-            
-            # Get workbook and worksheets
-            workbook = writer.book
-            
-            # Format worksheets
-            header_format = workbook.add_format({
-                'bold': True,
-                'text_wrap': True,
-                'valign': 'top',
-                'fg_color': '#D7E4BC',
-                'border': 1
-            })
-            
-            # Format data sheet
-            data_sheet = writer.sheets['Production Data']
-            for col_num, value in enumerate(data_df.columns.values):
-                data_sheet.write(0, col_num, str(value), header_format)
-            data_sheet.set_column('A:Z', 15)
-            
-            # Format statistics sheet
-            stats_sheet = writer.sheets['Statistics']
-            stats_sheet.write(0, 0, 'Metric', header_format)
-            stats_sheet.write(0, 1, 'Value', header_format)
-            stats_sheet.set_column('A:A', 35)
-            stats_sheet.set_column('B:B', 20)
-            
-            # Add visualization if available
-            if visualization_fig:
-                # Save figure to bytes
-                img_buffer = io.BytesIO()
-                visualization_fig.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-                img_buffer.seek(0)
-                
-                # Create visualization sheet
-                viz_sheet = workbook.add_worksheet('Visualizations')
-                
-                # Insert the image
-                viz_sheet.insert_image('A1', 'visualization.png', {'image_data': img_buffer})
-                viz_sheet.set_column('A:A', 50)
-                viz_sheet.set_row(0, 300)
-        
-        excel_buffer.seek(0)
-        return excel_buffer
+    if 'pptx' in artifacts:
+        powerpoint_download_button(artifacts['pptx'])
+        return
+    
+    job = core.get_background_builder().get(job_key)
+    if job is None:
+        return
+    
+    if not job.done:
+        st.progress(job.fraction, text=f"⏳ {job.message}...")
+        return
+    
+    if polling:
+        # Rerun the whole page once so this fragment stops polling
+        st.rerun()
+    
+    result = job.result
+    render_diagnostics(result.diagnostics)
+    if result.ok:
+        artifacts['pptx'] = result.value
+        powerpoint_download_button(result.value)
+    else:
+        st.error("❌ Failed to create PowerPoint presentation")
+
+def powerpoint_download_button(deck):
+    st.download_button(
+        label="📥 Download PowerPoint",
+        data=deck,
+        file_name="production_presentation.pptx",
+        mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        use_container_width=True,
+        key="ppt_download",
+        on_click="ignore"
+    )
+    st.success("✅ PowerPoint ready for download!")
+
+def powerpoint_download_section(extraction, charts, artifacts):
+    """
+    Build the PowerPoint deck on request without blocking the rest of the dashboard
+    """
+    job_key = core.powerpoint_build_key(extraction.content_hash)
+    builder = core.get_background_builder()
+    job = builder.get(job_key)
+    
+    if 'pptx' not in artifacts and (job is None or (job.done and not job.ok)):
+        if st.button("🔄 Generate PowerPoint", use_container_width=True, key="ppt_gen"):
+            job = start_powerpoint_build(extraction, charts)
+    
+    # Poll the running build from a fragment so only this column reruns
+    polling = job is not None and not job.done
+    status = st.fragment(powerpoint_build_status, run_every=PPT_POLL_SECONDS if polling else None)
+    status(job_key, polling, artifacts)
+
+def create_excel_with_visualizations(data_df, stats, charts, field_stats=None, native_charts=False):
+    """
+    Build the Excel report and render any diagnostics
+
+    native_charts: stream the rows in constant memory and add live Excel charts instead of chart images
+    """
+    build = core.create_streaming_excel_report if native_charts else core.create_excel_with_visualizations
+    result = build(data_df, stats, charts, field_stats)
+    render_diagnostics(result.diagnostics)
+    return result.value
+
+@st.fragment
+def download_reports_section(extraction, charts, artifacts):
+    """
+    Export section of the production tab as a fragment: its buttons rerun only this section,
+    and built files are kept with the session's artifacts for the upload
+    """
+    result_df, well_count, stats, original_columns, _ = extraction.as_tuple()
+    
+    # Enhanced Download section
+    st.markdown("---")
+    st.header("💾 Download Reports")
+    
+    st.markdown("""
+    <div class="info-box">
+    <h3>🎁 Export Your Analysis</h3>
+    <p>Choose from multiple formats to share your insights with your team:</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    download_col1, download_col2, download_col3 = st.columns(3)
+    
+    with download_col1:
+        st.subheader("📄 CSV Export")
+        st.markdown("Simple data format for spreadsheets")
+        # Export with TOTAL row included
+        csv = session_artifact(artifacts, 'csv', result_df.to_csv, index=False)
+        st.download_button(
+            label="📥 Download CSV",
+            data=csv,
+            file_name="production_analysis.csv",
+            mime="text/csv",
+            use_container_width=True,
+            on_click="ignore"
+        )
+    
+    with download_col2:
+        st.subheader("📊 Excel Report")
+        st.markdown("Complete analysis with charts")
+        native_charts = st.toggle(
+            "Native Excel charts",
+            key="excel_native_charts",
+            help="Stream the rows in constant memory and add live Excel charts instead of chart images"
+        )
+        # Each variant is built once per upload, then offered straight away
+        excel_key = ('excel', native_charts)
+        if excel_key not in artifacts and st.button("🔄 Generate Excel Report", use_container_width=True,
+                                                    key="excel_gen"):
+            with st.spinner("Creating comprehensive Excel report..."):
+                artifacts[excel_key] = create_excel_with_visualizations(
+                    result_df, stats, charts, extraction.field_stats, native_charts
+                )
         
-    except Exception as e:
-        st.error(f"❌ Error creating Excel file: {str(e)}")
-        return None
+        if excel_key in artifacts:
+            if artifacts[excel_key]:
+                st.download_button(
+                    label="📥 Download Excel",
+                    data=artifacts[excel_key],
+                    file_name="production_analysis.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    use_container_width=True,
+                    key="excel_download",
+                    on_click="ignore"
+                )
+            else:
+                st.error("❌ Failed to create Excel report")
+    
+    with download_col3:
+        st.subheader("🎤 PowerPoint")
+        st.markdown("Professional presentation")
+        powerpoint_download_section(extraction, charts, artifacts)
 
 # =============================================================================
 # DRILLING REPORTS UPLOAD FUNCTIONS
 # =============================================================================
 
-def extract_operation_summary_from_excel(uploaded_file):
+def extract_operation_summaries(uploaded_files):
     """
-    Extract operation summary, well name, and rig name from uploaded Excel file
+    Extract the operation summaries of all drilling reports in parallel and render any diagnostics
     """
-    try:
-        # Read the Excel file
-        wb = load_workbook(filename=io.BytesIO(uploaded_file.read()), data_only=True)
-        sheet = wb.active
-        
-        # Initialize variables
-        well_name = ""
-        rig_name = ""
-        last_24_summary = ""
-        next_24_forecast = ""
-        
-        # Search for well name
-        for row in sheet.iter_rows(values_only=True):
-            for i, cell in enumerate(row):
-                if cell and "WELL NAME" in str(cell).upper():
-                    # Get the well name from adjacent cells
-                    if i + 1 < len(row) and row[i + 1]:
-                        well_name = str(row[i + 1])
-                        break
-                    # Also check other cells in the row
-                    for j, cell2 in enumerate(row):
-                        if cell2 and "WELL NAME" not in str(cell2).upper() and cell2:
-                            well_name = str(cell2)
-                            break
-                    break
-        
-        # Search for rig name
-        for row in sheet.iter_rows(values_only=True):
-            for i, cell in enumerate(row):
-                if cell and "RIG NAME" in str(cell).upper():
-                    # Get the rig name from adjacent cells
-                    if i + 1 < len(row) and row[i + 1]:
-                        rig_name = str(row[i + 1])
-                        break
-                    # Also check other cells in the row
-                    for j, cell2 in enumerate(row):
-                        if cell2 and "RIG NAME" not in str(cell2).upper() and cell2:
-                            rig_name = str(cell2)
-                            break
-                    break
-        
-        # Search for LAST 24 SUMMARY
-        for row in sheet.iter_rows(values_only=True):
-            for i, cell in enumerate(row):
-                if cell and "LAST 24 SUMMARY" in str(cell).upper():
-                    # Get the summary from the next cell
-                    if i + 1 < len(row) and row[i + 1]:
-                        last_24_summary = str(row[i + 1])
-                        break
-                    # If not in next cell, try to find in the row
-                    for j, cell2 in enumerate(row):
-                        if cell2 and "LAST 24 SUMMARY" not in str(cell2).upper() and cell2:
-                            last_24_summary = str(cell2)
-                            break
-                    break
-        
-        # Search for NEXT 24 FORECAST
-        for row in sheet.iter_rows(values_only=True):
-            for i, cell in enumerate(row):
-                if cell and "NEXT 24 FORECAST" in str(cell).upper():
-                    # Get the forecast from the next cell
-                    if i + 1 < len(row) and row[i + 1]:
-                        next_24_forecast = str(row[i + 1])
-                        break
-                    # If not in next cell, try to find in the row
-                    for j, cell2 in enumerate(row):
-                        if cell2 and "NEXT 24 FORECAST" not in str(cell2).upper() and cell2:
-                            next_24_forecast = str(cell2)
-                            break
-                    break
-        
-        # Clean up the extracted data
-        well_name = well_name.replace(':-', '').replace(':', '').strip() if well_name else "Not Found"
-        rig_name = rig_name.replace(':-', '').replace(':', '').strip() if rig_name else "Not Found"
-        last_24_summary = last_24_summary.replace(':-', '').replace(':', '').strip() if last_24_summary else "Not Found"
-        next_24_forecast = next_24_forecast.replace(':-', '').replace(':', '').strip() if next_24_forecast else "Not Found"
-        
-        return {
-            'file_name': uploaded_file.name,
-            'well_name': well_name,
-            'rig_name': rig_name,
-            'last_24_summary': last_24_summary,
-            'next_24_forecast': next_24_forecast
-        }
-        
-    except Exception as e:
-        st.error(f"Error processing file {uploaded_file.name}: {str(e)}")
-        return None
+    summaries = []
+    for result in core.extract_operation_summaries(uploaded_files):
+        render_diagnostics(result.diagnostics)
+        if result.value:
+            summaries.append(result.value)
+    return summaries
 
 def create_operation_summary_display(last_24_summary, next_24_forecast):
     """
@@ -784,6 +296,202 @@ def create_operation_summary_display(last_24_summary, next_24_forecast):
     """
     return summary_html
 
+# Summary cards shown per page in the drilling operations view
+DRILLING_CARDS_PER_PAGE = 10
+
+# Summary dict key -> column of the drilling operations table and exports
+DRILLING_COLUMNS = {
+    'well_name': 'Well Name',
+    'rig_name': 'Rig Name',
+    'last_24_summary': 'Last 24 Hours Summary',
+    'next_24_forecast': 'Next 24 Hours Forecast',
+    'file_name': 'Source File'
+}
+
+def drilling_summary_frame(summaries):
+    """
+    One row per drilling report with the display/export column names
+    """
+    return pd.DataFrame(summaries, columns=list(DRILLING_COLUMNS)).rename(columns=DRILLING_COLUMNS)
+
+def search_drilling_summaries(summary_df, query):
+    """
+    Rows of the summary table containing the query (case-insensitive) in any column
+    """
+    query = query.strip()
+    if not query:
+        return summary_df
+    matches = np.zeros(len(summary_df), dtype=bool)
+    for column in summary_df.columns:
+        matches |= summary_df[column].astype(str).str.contains(query, case=False, regex=False).to_numpy()
+    return summary_df[matches]
+
+def render_operation_card(summary):
+    """
+    Compact card pair of one drilling report: well and rig on the left, operation summary on the right
+    """
+    with st.container():
+        col1, col2 = st.columns([1, 2])
+        
+        with col1:
+            # Rig and Well information
+            st.markdown(f"""
+            <div style="padding: 15px; background-color: #f8f9fa; border-radius: 10px; border-left: 4px solid #007bff;">
+                <h3 style="margin: 0 0 10px 0; color: #2c3e50;">{summary['well_name'] if summary['well_name'] != 'Not Found' else 'Unknown Well'}</h3>
+                <p style="margin: 0; color: #7f8c8d; font-size: 14px;">
+                    <strong>Rig:</strong> {summary['rig_name'] if summary['rig_name'] != 'Not Found' else 'Unknown Rig'}
+                </p>
+                <p style="margin: 5px 0 0 0; color: #95a5a6; font-size: 12px;">
+                    File: {summary['file_name']}
+                </p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            # Operation summary
+            operation_display = create_operation_summary_display(
+                summary['last_24_summary'], 
+                summary['next_24_forecast']
+            )
+            st.markdown(operation_display, unsafe_allow_html=True)
+        
+        # Add some spacing between entries
+        st.markdown("<br>", unsafe_allow_html=True)
+
+def render_operation_details(summary):
+    """
+    Full detail pane of one drilling report
+    """
+    st.markdown(f"#### 🔧 {summary['well_name']} - {summary['rig_name']} | 📄 {summary['file_name']}")
+    
+    # Create two columns for detailed view
+    detail_col1, detail_col2 = st.columns(2)
+    
+    with detail_col1:
+        st.markdown("### 📋 Well & Rig Information")
+        st.info(f"""
+        **Well Name:** {summary['well_name'] if summary['well_name'] != 'Not Found' else '❌ Not found'}
+        \n**Rig Name:** {summary['rig_name'] if summary['rig_name'] != 'Not Found' else '❌ Not found'}
+        \n**Source File:** {summary['file_name']}
+        """)
+    
+    with detail_col2:
+        st.markdown("### 📊 Operation Status")
+        if summary['last_24_summary'] != "Not Found":
+            st.success("✅ Operations data successfully extracted")
+        else:
+            st.warning("⚠️ Limited operation data available")
+    
+    # Operation details in full width
+    st.markdown("### 🕐 Operation Details")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("#### 📅 Last 24 Hours")
+        if summary['last_24_summary'] != "Not Found":
+            st.info(summary['last_24_summary'])
+        else:
+            st.warning("No last 24 hours summary found")
+    
+    with col2:
+        st.markdown("#### 🔮 Next 24 Hours")
+        if summary['next_24_forecast'] != "Not Found":
+            st.success(summary['next_24_forecast'])
+        else:
+            st.warning("No next 24 hours forecast found")
+
+def drilling_operations_view(all_summaries):
+    """
+    Searchable table of all drilling reports, one page of summary cards and the detail pane of the selected row
+
+    The table is a single virtualized st.dataframe, so the number of elements sent to the browser
+    no longer grows with the number of uploaded files.
+    """
+    summary_df = drilling_summary_frame(all_summaries)
+    query = st.text_input("🔎 Search wells, rigs, operations or files", key="drilling_search")
+    filtered_df = search_drilling_summaries(summary_df, query)
+    if query.strip():
+        st.caption(f"{len(filtered_df)} of {len(summary_df)} reports match '{query.strip()}'")
+    
+    st.markdown("Select a row to see the full details:")
+    event = st.dataframe(
+        filtered_df,
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key="drilling_table"
+    )
+    
+    # Detail pane only for the selected report
+    selected_rows = event.selection.rows
+    if selected_rows and selected_rows[0] < len(filtered_df):
+        with st.container(border=True):
+            render_operation_details(all_summaries[filtered_df.index[selected_rows[0]]])
+    
+    # Paginated summary cards
+    if filtered_df.empty:
+        return
+    page_count = (len(filtered_df) - 1) // DRILLING_CARDS_PER_PAGE + 1
+    st.subheader("🔍 Operation Summaries")
+    page = 1
+    if page_count > 1:
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1,
+                               step=1, key="drilling_page")
+    start = (page - 1) * DRILLING_CARDS_PER_PAGE
+    for position in filtered_df.index[start:start + DRILLING_CARDS_PER_PAGE]:
+        render_operation_card(all_summaries[position])
+
+def rig_activity_section(all_summaries):
+    """
+    Net BO of the analysed production report next to the latest drilling report of each well,
+    joined on canonical well IDs
+    """
+    st.subheader("🔗 Rig Activity by Well")
+    session = st.session_state.get('production_session')
+    extraction = session['artifacts'].get('extraction') if session else None
+    if extraction is None or not extraction.ok:
+        st.info("💡 Analyse a production report in the Production Analysis tab to see rig activity next to each well's Net BO")
+        return
+    
+    well_index = core.get_well_index()
+    joined = core.join_drilling_activity(history_rows(extraction), all_summaries, well_index)
+    matched = joined[joined['Match'] == 'both']
+    drilling_only = joined[joined['Match'] == 'drilling only']
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("🛢️ Producing Wells with Rig Activity", len(matched))
+    with col2:
+        st.metric("🏗️ Drilled Wells not in the Production Report", len(drilling_only))
+    
+    if not matched.empty:
+        st.dataframe(
+            matched[['Well ID', 'Field', 'Well Name', 'Net BO', 'Net Diff BO', 'W/C', 'Rig Name', 'Last 24 Hours',
+                     'Next 24 Hours', 'Drilling Report']],
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    if not drilling_only.empty:
+        st.caption("Wells in the drilling reports without a production row - new wells, or spellings that need an alias")
+        st.dataframe(drilling_only[['Well ID', 'Drilling Well Name', 'Rig Name', 'Drilling Report']],
+                     use_container_width=True, hide_index=True)
+        
+        # Aliases map spellings the canonical rules cannot match (renamed wells, typos) onto a production well
+        alias_col1, alias_col2, alias_col3 = st.columns([2, 2, 1])
+        with alias_col1:
+            alias = st.selectbox("Drilling well", drilling_only['Drilling Well Name'], key="well_alias_name")
+        with alias_col2:
+            production_wells = joined.loc[joined['Match'] != 'drilling only', 'Well Name'].unique()
+            target = st.selectbox("Same well as", production_wells, key="well_alias_target")
+        with alias_col3:
+            if st.button("🔗 Link", use_container_width=True, key="well_alias_link") and alias and target:
+                well_index.add_alias(alias, target)
+                st.toast(f"✅ {alias} is now matched to {target}")
+                st.rerun()
+
 def drilling_reports_tab():
     """Drilling Reports Upload Tab"""
     st.title("🏗️ Drilling Operations Dashboard")
@@ -793,7 +501,7 @@ def drilling_reports_tab():
     st.sidebar.title("📋 Instructions")
     st.sidebar.markdown("""
     **How to Use:**
-    1. Upload Excel drilling report files
+    1. Upload Excel drilling report files (or a ZIP / tar.gz of them)
     2. View operation summaries in the table
     3. Click on rows for detailed information
     
@@ -806,24 +514,28 @@ def drilling_reports_tab():
     # File upload section
     st.subheader("📤 Upload Drilling Report Files")
     uploaded_files = st.file_uploader(
-        "Choose Excel files",
-        type=['xlsx'],
+        "Choose Excel files or archives",
+        type=['xlsx', 'zip', 'tar', 'gz', 'tgz'],
         accept_multiple_files=True,
-        help="Upload one or more drilling report Excel files",
+        help="Upload one or more drilling report Excel files, gzipped workbooks, or ZIP / tar.gz archives of them",
         key="drilling_uploader"
     )
     
     if uploaded_files:
         st.success(f"✅ {len(uploaded_files)} file(s) uploaded successfully!")
         
-        # Process all uploaded files
-        all_summaries = []
+        # Unpack archives in memory while extracting; files with duplicate content are skipped
+        expanded = core.expand_archives(uploaded_files)
         
+        # Process all uploaded files (in parallel, results keep the upload order)
         with st.spinner("🔍 Analyzing drilling reports..."):
-            for uploaded_file in uploaded_files:
-                summary = extract_operation_summary_from_excel(uploaded_file)
-                if summary:
-                    all_summaries.append(summary)
+            all_summaries = extract_operation_summaries(expanded.value)
+        render_diagnostics(expanded.diagnostics)
+        
+        # Keep the summaries searchable after the session ends
+        indexed = get_drilling_index().add_summaries(all_summaries)
+        if indexed:
+            st.caption(f"🔎 Added {indexed} report(s) to the searchable report history")
         
         if all_summaries:
             # Create the main summary table with two columns
@@ -841,98 +553,15 @@ def drilling_reports_tab():
                 unique_rigs = len(set([s['rig_name'] for s in all_summaries if s['rig_name'] != "Not Found"]))
                 st.metric("🔧 Active Rigs", unique_rigs)
             
-            # Create the main two-column display
-            for i, summary in enumerate(all_summaries):
-                # Create a container for each row
-                with st.container():
-                    col1, col2 = st.columns([1, 2])
-                    
-                    with col1:
-                        # Rig and Well information
-                        st.markdown(f"""
-                        <div style="padding: 15px; background-color: #f8f9fa; border-radius: 10px; border-left: 4px solid #007bff;">
-                            <h3 style="margin: 0 0 10px 0; color: #2c3e50;">{summary['well_name'] if summary['well_name'] != 'Not Found' else 'Unknown Well'}</h3>
-                            <p style="margin: 0; color: #7f8c8d; font-size: 14px;">
-                                <strong>Rig:</strong> {summary['rig_name'] if summary['rig_name'] != 'Not Found' else 'Unknown Rig'}
-                            </p>
-                            <p style="margin: 5px 0 0 0; color: #95a5a6; font-size: 12px;">
-                                File: {summary['file_name']}
-                            </p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    with col2:
-                        # Operation summary
-                        operation_display = create_operation_summary_display(
-                            summary['last_24_summary'], 
-                            summary['next_24_forecast']
-                        )
-                        st.markdown(operation_display, unsafe_allow_html=True)
-                    
-                    # Add some spacing between entries
-                    st.markdown("<br>", unsafe_allow_html=True)
+            drilling_operations_view(all_summaries)
             
-            # Detailed expandable sections
-            st.subheader("🔍 Detailed Operation Views")
-            st.markdown("Click on any operation below to see full details:")
-            
-            for i, summary in enumerate(all_summaries):
-                with st.expander(f"🔧 {summary['well_name']} - {summary['rig_name']} | 📄 {summary['file_name']}", expanded=False):
-                    
-                    # Create two columns for detailed view
-                    detail_col1, detail_col2 = st.columns(2)
-                    
-                    with detail_col1:
-                        st.markdown("### 📋 Well & Rig Information")
-                        st.info(f"""
-                        **Well Name:** {summary['well_name'] if summary['well_name'] != 'Not Found' else '❌ Not found'}
-                        \n**Rig Name:** {summary['rig_name'] if summary['rig_name'] != 'Not Found' else '❌ Not found'}
-                        \n**Source File:** {summary['file_name']}
-                        """)
-                    
-                    with detail_col2:
-                        st.markdown("### 📊 Operation Status")
-                        if summary['last_24_summary'] != "Not Found":
-                            st.success("✅ Operations data successfully extracted")
-                        else:
-                            st.warning("⚠️ Limited operation data available")
-                    
-                    # Operation details in full width
-                    st.markdown("### 🕐 Operation Details")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.markdown("#### 📅 Last 24 Hours")
-                        if summary['last_24_summary'] != "Not Found":
-                            st.info(summary['last_24_summary'])
-                        else:
-                            st.warning("No last 24 hours summary found")
-                    
-                    with col2:
-                        st.markdown("#### 🔮 Next 24 Hours")
-                        if summary['next_24_forecast'] != "Not Found":
-                            st.success(summary['next_24_forecast'])
-                        else:
-                            st.warning("No next 24 hours forecast found")
-                    
-                    st.markdown("---")
+            rig_activity_section(all_summaries)
             
             # Download section
             st.subheader("💾 Export Data")
             
             # Prepare data for download
-            download_data = []
-            for summary in all_summaries:
-                download_data.append({
-                    'Well Name': summary['well_name'],
-                    'Rig Name': summary['rig_name'],
-                    'Last 24 Hours Summary': summary['last_24_summary'],
-                    'Next 24 Hours Forecast': summary['next_24_forecast'],
-                    'Source File': summary['file_name']
-                })
-            
-            download_df = pd.DataFrame(download_data)
+            download_df = drilling_summary_frame(all_summaries)
             csv = download_df.to_csv(index=False)
             
             col1, col2 = st.columns(2)
@@ -942,7 +571,8 @@ def drilling_reports_tab():
                     data=csv,
                     file_name="drilling_operations_summary.csv",
                     mime="text/csv",
-                    help="Download all operation summaries as a CSV file"
+                    help="Download all operation summaries as a CSV file",
+                    on_click="ignore"
                 )
             with col2:
                 # Fix for Excel download - actually create Excel file
@@ -956,7 +586,8 @@ def drilling_reports_tab():
                     data=excel_buffer,
                     file_name="drilling_operations_summary.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    help="Download all operation summaries as an Excel file"
+                    help="Download all operation summaries as an Excel file",
+                    on_click="ignore"
                 )
             
         else:
@@ -999,6 +630,170 @@ def drilling_reports_tab():
                 </div>
             </div>
             """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    drilling_search_section()
+
+def drilling_search_section():
+    """
+    Full-text search over every indexed LAST 24 SUMMARY / NEXT 24 FORECAST
+    """
+    index = get_drilling_index()
+    report_count = len(index)
+    
+    with st.expander(f"🔎 Search Report History ({report_count} indexed reports)", expanded=False):
+        if not report_count:
+            st.info("No reports indexed yet - uploaded drilling reports are indexed automatically")
+            return
+        
+        query = st.text_input(
+            "Search operations",
+            placeholder='e.g. stuck pipe, liner, "cement job"',
+            key="drilling_fts_query"
+        )
+        filter_col1, filter_col2 = st.columns(2)
+        with filter_col1:
+            well = st.selectbox("Well", [None] + index.wells(), format_func=lambda w: w or "All wells",
+                                key="drilling_fts_well")
+        with filter_col2:
+            rig = st.selectbox("Rig", [None] + index.rigs(), format_func=lambda r: r or "All rigs",
+                               key="drilling_fts_rig")
+        
+        if query.strip():
+            started = time.perf_counter()
+            results = index.search(query, well=well, rig=rig)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            st.caption(f"{len(results)} matching report(s) in {elapsed_ms:.0f} ms - matches are marked «like this»")
+            if not results.empty:
+                st.dataframe(results, use_container_width=True, hide_index=True)
+
+def production_history_section():
+    """
+    Per-well and per-field views over the stored production history
+    """
+    store = get_history_store()
+    reports = store.reports()
+    
+    with st.expander(f"📚 Production History ({len(reports)} stored reports)", expanded=False):
+        if reports.empty:
+            st.info("No reports stored yet - analysed reports with a known date are saved automatically")
+            return
+        
+        first_date = reports['report_date'].min().date()
+        last_date = reports['report_date'].max().date()
+        date_range = st.date_input(
+            "Date range",
+            value=(first_date, last_date),
+            min_value=first_date,
+            max_value=last_date,
+            key="history_range"
+        )
+        start, end = date_range if len(date_range) == 2 else (date_range[0], date_range[0])
+        
+        view = st.radio("View", ["Field totals", "Single well"], horizontal=True, key="history_view")
+        
+        if view == "Field totals":
+            totals = store.field_daily_totals(start, end)
+            if totals.empty:
+                st.info("No data in the selected range")
+            else:
+                st.line_chart(totals.pivot(index='report_date', columns='Field', values='Net BO'))
+                st.dataframe(totals, use_container_width=True, hide_index=True)
+        else:
+            well = st.selectbox("Well", store.wells(), key="history_well")
+            if well:
+                well_history = store.well_history(well, start, end)
+                st.line_chart(well_history.set_index('report_date')[['Net BO', 'Net Diff BO']])
+                st.dataframe(well_history, use_container_width=True, hide_index=True)
+        
+        st.caption("Stored reports")
+        st.dataframe(reports.drop(columns=['Content Hash']), use_container_width=True, hide_index=True)
+
+def comparison_session(uploaded_files):
+    """
+    Extractions and comparison of the uploaded daily reports, kept in the session until the uploads change
+    """
+    file_ids = tuple(upload_id(uploaded_file) for uploaded_file in uploaded_files)
+    session = st.session_state.get('comparison_session')
+    if session is None or session['file_ids'] != file_ids:
+        extractions = [core.extract_wells_with_net_diff_bo(uploaded_file) for uploaded_file in uploaded_files]
+        session = {
+            'file_ids': file_ids,
+            'extractions': extractions,
+            'comparison': core.compare_reports(extractions)
+        }
+        st.session_state['comparison_session'] = session
+    return session
+
+def production_comparison_section():
+    """
+    Day-over-day comparison of two or more daily reports: per-well deltas, new and dropped wells and field rollups
+    """
+    with st.expander("📅 Compare Daily Reports", expanded=False):
+        uploaded_files = st.file_uploader(
+            "Upload two or more daily production reports",
+            type=['xlsx', 'xls', 'xlsm'],
+            accept_multiple_files=True,
+            key="comparison_uploader"
+        )
+        if not uploaded_files or len(uploaded_files) < 2:
+            st.info("Upload at least two daily reports to compare wells between days")
+            return
+        
+        with st.spinner(f"🔄 Comparing {len(uploaded_files)} reports..."):
+            session = comparison_session(uploaded_files)
+        for extraction in session['extractions']:
+            if not extraction.ok:
+                st.warning(f"⚠️ {extraction.source_file} could not be analysed")
+                render_diagnostics([d for d in extraction.diagnostics if d.level == 'error'])
+        result = session['comparison']
+        render_diagnostics(result.diagnostics)
+        if not result.ok:
+            return
+        
+        comparison = result.value
+        labels = comparison.labels
+        pair_col1, pair_col2 = st.columns(2)
+        with pair_col1:
+            previous = st.selectbox("Compare", labels, index=len(labels) - 2, key="comparison_previous")
+        with pair_col2:
+            current = st.selectbox("With", labels, index=len(labels) - 1, key="comparison_current")
+        if previous == current:
+            st.info("Pick two different reports")
+            return
+        
+        well_deltas = comparison.well_deltas(previous, current)
+        new_wells = well_deltas[well_deltas['Status'] == 'new']
+        dropped_wells = well_deltas[well_deltas['Status'] == 'dropped']
+        metric_cols = st.columns(4)
+        metric_cols[0].metric("Wells", int((well_deltas['Status'] != 'dropped').sum()))
+        metric_cols[1].metric("New Wells", len(new_wells))
+        metric_cols[2].metric("Dropped Wells", len(dropped_wells))
+        metric_cols[3].metric("Δ Net BO", f"{np.nansum(well_deltas['Δ Net BO']):,.1f}",
+                              help="Change of the Net BO of wells in both reports")
+        
+        st.subheader("🏭 Field Rollup")
+        st.dataframe(comparison.field_rollup(previous, current), use_container_width=True, hide_index=True)
+        
+        st.subheader("🛢️ Well Changes")
+        statuses = st.multiselect("Show wells", ['both', 'new', 'dropped'], default=['both', 'new', 'dropped'],
+                                  key="comparison_statuses")
+        shown = well_deltas[well_deltas['Status'].isin(statuses)]
+        # Largest Net BO changes first
+        shown = shown.iloc[np.argsort(-np.nan_to_num(shown['Δ Net BO'].abs().to_numpy()), kind='stable')]
+        st.dataframe(shown, use_container_width=True, hide_index=True)
+        
+        wells_col1, wells_col2 = st.columns(2)
+        with wells_col1:
+            st.caption(f"🆕 New wells in {current}")
+            st.dataframe(new_wells[['Field', 'Well Name']], use_container_width=True, hide_index=True)
+        with wells_col2:
+            st.caption(f"⛔ Wells dropped since {previous}")
+            st.dataframe(dropped_wells[['Field', 'Well Name']], use_container_width=True, hide_index=True)
+        
+        if len(labels) > 2:
+            st.subheader("📈 Field Net BO by Report")
+            st.line_chart(comparison.field_totals('Net BO').T)
 
 def production_analysis_tab():
     """Production Analysis Tab - Original functionality"""
@@ -1042,7 +837,13 @@ def production_analysis_tab():
         st.markdown("---")
         st.subheader("🛠️ Tools")
         if st.button("🔄 Clear Cache & Refresh", use_container_width=True):
-            st.runtime.legacy_caching.clear_cache()
+            core.get_extraction_cache().clear()
+            core.get_png_cache().clear()
+            core.get_background_builder().clear()
+            core.get_drilling_cache().clear()
+            core.get_template_store().clear()
+            st.session_state.pop('production_session', None)
+            st.session_state.pop('comparison_session', None)
             st.success("✅ Application refreshed!")
     
     # Main content area with improved layout
@@ -1092,22 +893,22 @@ def production_analysis_tab():
         try:
             # Process file without toggle status
             with st.spinner("🔄 Processing your file... This may take a few moments."):
-                result_df, well_count, stats, original_columns, all_wells_data = extract_wells_with_net_diff_bo(uploaded_file)
+                # Parsed results, charts and built exports are kept in the session for this upload
+                artifacts = production_session_artifacts(uploaded_file)
+                extraction = extract_wells_with_net_diff_bo(uploaded_file, artifacts)
+                result_df, well_count, stats, original_columns, all_wells_data = extraction.as_tuple()
                 
                 if result_df is not None and not result_df.empty:
                     # Generate visualizations (exclude TOTAL row for visualization)
                     data_without_total = result_df[result_df[original_columns[0]] != 'TOTAL (All Wells)']
-                    fig = create_visualizations(data_without_total, original_columns, all_wells_data)
-                    
-                    # Generate PowerPoint automatically
-                    ppt_buffer = create_comprehensive_powerpoint(result_df, well_count, stats, original_columns, fig)
+                    charts = create_visualizations(data_without_total, original_columns, all_wells_data, artifacts)
                     
                     # Success message
                     st.markdown(f"""
                     <div class="success-box">
                     <h3>✅ Analysis Complete!</h3>
                     <p>Successfully processed <b>{stats['Total All Wells']}</b> total wells and identified <b>{well_count}</b> wells with significant Net Diff BO values.</p>
-                    <p><b>PowerPoint report has been automatically generated and is ready for download below.</b></p>
+                    <p><b>Export the results as CSV, Excel or PowerPoint from the download section below.</b></p>
                     </div>
                     """, unsafe_allow_html=True)
                     
@@ -1200,75 +1001,32 @@ def production_analysis_tab():
                     st.header("📋 Production Data Overview")
                     st.dataframe(result_df, use_container_width=True, height=400)
                     
+                    # Per-field breakdown
+                    if extraction.field_stats is not None and not extraction.field_stats.empty:
+                        st.subheader("🗺️ Field Breakdown")
+                        field_columns = [
+                            'Wells', 'Wells with Non-Zero Net Diff BO', 'Positive Net Diff BO Wells',
+                            'Negative Net Diff BO Wells', 'Total Net BO', 'Total Net Diff BO', 'Average Net BO'
+                        ]
+                        if 'Average W/C' in extraction.field_stats.columns:
+                            field_columns.append('Average W/C')
+                        st.dataframe(extraction.field_stats[field_columns].round(2), use_container_width=True)
+                        with st.expander("All field statistics"):
+                            st.dataframe(extraction.field_stats.round(2), use_container_width=True)
+                    
                     # Visualizations
                     st.markdown("---")
                     st.header("📈 Performance Analytics")
-                    if fig:
-                        st.pyplot(fig)
+                    if charts:
+                        # Cached PNGs, shared with the PowerPoint and Excel exports
+                        for chart_col, (_, chart_title, image) in zip(st.columns(len(charts.keys)), charts.images(dpi=core.SCREEN_DPI)):
+                            with chart_col:
+                                st.image(image, caption=chart_title, use_container_width=True)
                         st.caption("Figure 1: Comprehensive production performance analysis across key metrics")
                     else:
                         st.info("📊 Visualizations not available due to insufficient data")
                     
-                    # Enhanced Download section
-                    st.markdown("---")
-                    st.header("💾 Download Reports")
-                    
-                    st.markdown("""
-                    <div class="info-box">
-                    <h3>🎁 Export Your Analysis</h3>
-                    <p>Choose from multiple formats to share your insights with your team:</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    download_col1, download_col2, download_col3 = st.columns(3)
-                    
-                    with download_col1:
-                        st.subheader("📄 CSV Export")
-                        st.markdown("Simple data format for spreadsheets")
-                        # Export with TOTAL row included
-                        csv = result_df.to_csv(index=False)
-                        st.download_button(
-                            label="📥 Download CSV",
-                            data=csv,
-                            file_name="production_analysis.csv",
-                            mime="text/csv",
-                            use_container_width=True
-                        )
-                    
-                    with download_col2:
-                        st.subheader("📊 Excel Report")
-                        st.markdown("Complete analysis with charts")
-                        if st.button("🔄 Generate Excel Report", use_container_width=True, key="excel_gen"):
-                            with st.spinner("Creating comprehensive Excel report..."):
-                                excel_buffer = create_excel_with_visualizations(result_df, stats, fig)
-                            
-                            if excel_buffer:
-                                st.download_button(
-                                    label="📥 Download Excel",
-                                    data=excel_buffer,
-                                    file_name="production_analysis.xlsx",
-                                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                                    use_container_width=True,
-                                    key="excel_download"
-                                )
-                            else:
-                                st.error("❌ Failed to create Excel report")
-                    
-                    with download_col3:
-                        st.subheader("🎤 PowerPoint")
-                        st.markdown("Professional presentation")
-                        if ppt_buffer:
-                            st.download_button(
-                                label="📥 Download PowerPoint",
-                                data=ppt_buffer,
-                                file_name="production_presentation.pptx",
-                                mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-                                use_container_width=True,
-                                key="ppt_download"
-                            )
-                            st.success("✅ PowerPoint ready for download!")
-                        else:
-                            st.error("❌ Failed to create PowerPoint presentation")
+                    download_reports_section(extraction, charts, artifacts)
                 
                 else:
                     st.error("❌ No valid data found in the uploaded file. Please check your file format and try again.")
@@ -1344,6 +1102,10 @@ def production_analysis_tab():
         <p>Upload your Excel file above to unlock powerful insights and generate professional reports!</p>
         </div>
         """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    production_comparison_section()
+    production_history_section()
 
 def main():
     st.set_page_config(
@@ -1439,14 +1201,52 @@ def main():
     # Main title
     st.markdown('<h1 class="main-header">🛢️ Oil & Gas Analytics Dashboard</h1>', unsafe_allow_html=True)
     
-    # Create tabs
+    # Optional per-stage timings of this run (wall time, CPU time, peak memory)
+    show_stage_diagnostics = st.sidebar.toggle(
+        "🩺 Stage diagnostics",
+        key="stage_diagnostics",
+        help="Time every pipeline stage of this run and append the timings to the local JSON lines log"
+    )
+    
+    if show_stage_diagnostics:
+        # tracemalloc makes parsing several times slower, so peak memory is opt-in
+        trace_memory = st.sidebar.checkbox("Trace peak memory (slower)", key="stage_diagnostics_memory")
+        profiler = core.StageProfiler(
+            trace_memory=trace_memory,
+            log_path=core.DEFAULT_PROFILE_LOG,
+            context={'app': "operation_summary_app", 'parser_version': core.PARSER_VERSION}
+        )
+        with core.profiling(profiler):
+            dashboard_tabs()
+        stage_diagnostics_panel(profiler)
+    else:
+        dashboard_tabs()
+
+def dashboard_tabs():
+    """
+    Production and drilling tabs, each timed as a whole when stage diagnostics are on
+    """
     tab1, tab2 = st.tabs(["📊 Production Analysis", "🏗️ Drilling Reports"])
     
-    with tab1:
+    with tab1, core.stage('ui.production_tab'):
         production_analysis_tab()
     
-    with tab2:
+    with tab2, core.stage('ui.drilling_tab'):
         drilling_reports_tab()
 
+def stage_diagnostics_panel(profiler):
+    """
+    Sidebar table of the stage timings recorded in this run (the profiler also appends them to the JSON lines log)
+    """
+    timings = profiler.frame()
+    with st.sidebar:
+        st.markdown("---")
+        st.subheader("🩺 Stage Diagnostics")
+        if timings.empty:
+            st.caption("No pipeline stage ran in this run")
+            return
+        st.dataframe(timings, use_container_width=True, hide_index=True)
+        st.caption(f"📝 Timings are appended to {core.DEFAULT_PROFILE_LOG}; background builds are logged when they finish")
+
 if __name__ == "__main__":
     main()
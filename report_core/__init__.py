@@ -0,0 +1,89 @@
+"""
+UI-free core of the Oil & Gas Analytics Dashboard
+
+Everything in this package can run in worker processes, batch jobs and benchmarks:
+no function calls Streamlit, and diagnostics are returned as data.
+"""
+from .archives import ArchiveMember, expand_archives, iter_archive_members
+from .cache import DiskCache, LRUCache
+from .charts import SCREEN_DPI, SLIDE_DPI, ChartSet, create_visualizations, get_png_cache
+from .comparison import COMPARISON_METRICS, ReportComparison, compare_reports
+from .drilling import (
+    DrillingSummaryCache,
+    LayoutTemplateStore,
+    extract_operation_summaries,
+    extract_operation_summary_from_excel,
+    get_drilling_cache,
+    get_template_store,
+)
+from .drilling_index import DrillingReportIndex
+from .exports import (
+    create_comprehensive_powerpoint,
+    create_excel_with_visualizations,
+    create_streaming_excel_report,
+    powerpoint_build_key,
+)
+from .jobs import BackgroundBuilder, BuildJob, get_background_builder
+from .production import (
+    PARSER_VERSION,
+    ExtractionResult,
+    ExtractionResultCache,
+    extract_wells_with_net_diff_bo,
+    get_extraction_cache,
+)
+from .profiling import DEFAULT_PROFILE_LOG, StageProfiler, StageTiming, current_profiler, profiling, stage
+from .results import Diagnostic, DiagnosticLog, StageResult
+from .schema import DAILY_PRODUCTION_LAYOUT, ReportLayout, ReportSchemaRegistry, get_schema_registry
+from .wells import WellIndex, canonical_well_id, get_well_index, join_drilling_activity
+
+__all__ = [
+    'PARSER_VERSION',
+    'SCREEN_DPI',
+    'SLIDE_DPI',
+    'COMPARISON_METRICS',
+    'DAILY_PRODUCTION_LAYOUT',
+    'DEFAULT_PROFILE_LOG',
+    'ArchiveMember',
+    'BackgroundBuilder',
+    'BuildJob',
+    'ChartSet',
+    'DiskCache',
+    'DrillingReportIndex',
+    'DrillingSummaryCache',
+    'Diagnostic',
+    'DiagnosticLog',
+    'ExtractionResult',
+    'ExtractionResultCache',
+    'LRUCache',
+    'LayoutTemplateStore',
+    'ReportComparison',
+    'ReportLayout',
+    'ReportSchemaRegistry',
+    'StageProfiler',
+    'StageResult',
+    'StageTiming',
+    'WellIndex',
+    'canonical_well_id',
+    'compare_reports',
+    'create_comprehensive_powerpoint',
+    'create_excel_with_visualizations',
+    'create_streaming_excel_report',
+    'create_visualizations',
+    'current_profiler',
+    'expand_archives',
+    'extract_operation_summaries',
+    'extract_operation_summary_from_excel',
+    'extract_wells_with_net_diff_bo',
+    'get_background_builder',
+    'get_drilling_cache',
+    'get_extraction_cache',
+    'get_png_cache',
+    'get_schema_registry',
+    'get_template_store',
+    'get_well_index',
+    'iter_archive_members',
+    'join_drilling_activity',
+    'powerpoint_build_key',
+    'profiling',
+    'stage',
+]
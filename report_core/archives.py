@@ -0,0 +1,124 @@
+"""
+Bulk upload of report workbooks packed in ZIP or tar(.gz) archives, or a single gzipped workbook
+
+Members are read one at a time straight from the archive stream into memory, never extracted
+to disk, and handed to the extractors like any other upload.
+"""
+import gzip
+import io
+import posixpath
+import tarfile
+import zipfile
+import zlib
+
+from .results import DiagnosticLog, StageResult
+from .uploads import BufferReader, content_hash, source_name, upload_buffer
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.gz')
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz')
+DRILLING_REPORT_SUFFIXES = ('.xlsx',)
+
+class ArchiveMember(io.BytesIO):
+    """
+    In-memory archive member that carries a display name like an uploaded file
+    """
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+
+def is_archive(name):
+    return name.lower().endswith(ARCHIVE_SUFFIXES)
+
+def _is_report_member(member_name, suffixes):
+    """
+    Skip folders, macOS resource forks, hidden files and Excel lock files such as '~$report.xlsx'
+    """
+    base = posixpath.basename(member_name)
+    if '__MACOSX' in member_name.split('/') or base.startswith(('.', '~$')):
+        return False
+    return base.lower().endswith(suffixes)
+
+def iter_archive_members(archive, suffixes=DRILLING_REPORT_SUFFIXES):
+    """
+    Yield the report members of a ZIP or tar(.gz) archive one at a time as ArchiveMember uploads
+
+    A gzipped file that is not a tar ('report.xlsx.gz') has one member, named without '.gz'.
+    """
+    archive_name = source_name(archive)
+    with upload_buffer(archive) as buffer, BufferReader(buffer) as reader:
+        if zipfile.is_zipfile(reader):
+            reader.seek(0)
+            with zipfile.ZipFile(reader) as zf:
+                for info in zf.infolist():
+                    if not info.is_dir() and _is_report_member(info.filename, suffixes):
+                        yield ArchiveMember(f"{archive_name}/{info.filename}", zf.read(info))
+        elif archive_name.lower().endswith('.gz') and not archive_name.lower().endswith(TAR_SUFFIXES):
+            reader.seek(0)
+            member_name = archive_name[:-len('.gz')]
+            if _is_report_member(member_name, suffixes):
+                with gzip.GzipFile(fileobj=reader) as gz:
+                    yield ArchiveMember(member_name, gz.read())
+        else:
+            reader.seek(0)
+            # Stream mode reads the tar sequentially, decompressing as it goes
+            with tarfile.open(fileobj=reader, mode='r|*') as tf:
+                for info in tf:
+                    if info.isfile() and _is_report_member(info.name, suffixes):
+                        yield ArchiveMember(f"{archive_name}/{info.name}", tf.extractfile(info).read())
+
+def _iter_unique_uploads(files, suffixes, log):
+    """
+    Yield the loose uploads and archive members of a batch whose content was not seen before in it
+    """
+    seen = set()
+
+    def is_new(file_content):
+        with upload_buffer(file_content) as buffer:
+            digest = content_hash(buffer)
+        if digest in seen:
+            return False
+        seen.add(digest)
+        return True
+
+    for uploaded_file in files:
+        upload_name = source_name(uploaded_file)
+        if not is_archive(upload_name):
+            try:
+                new = is_new(uploaded_file)
+            except OSError:
+                # Unreadable uploads are passed on, the extractor reports the error
+                new = True
+            if new:
+                yield uploaded_file
+            else:
+                log.info(f"📄 {upload_name}: same content as an earlier upload, skipped")
+            continue
+
+        extracted = skipped = 0
+        try:
+            for member in iter_archive_members(uploaded_file, suffixes):
+                if is_new(member):
+                    extracted += 1
+                    yield member
+                else:
+                    skipped += 1
+        except (zipfile.BadZipFile, tarfile.TarError, zlib.error, OSError, EOFError) as e:
+            log.error(f"Error reading archive {upload_name}: {str(e)}")
+            continue
+
+        message = f"📦 {upload_name}: {extracted} report(s) found"
+        if skipped:
+            message += f", {skipped} duplicate(s) skipped"
+        log.info(message)
+
+def expand_archives(files, suffixes=DRILLING_REPORT_SUFFIXES):
+    """
+    Replace the archives in a list of uploads by their report members
+
+    Uploads and members whose content already appeared earlier in the batch, loose or inside an
+    archive, are skipped. The StageResult value is a generator: archive members are read one at a
+    time as it is consumed, and the diagnostics (a summary per archive) are complete once it is
+    exhausted. Reading is timed as part of the stage that consumes the uploads.
+    """
+    log = DiagnosticLog()
+    return StageResult(_iter_unique_uploads(files, suffixes, log), log)
@@ -0,0 +1,286 @@
+"""
+Batch processing of daily production 'Report' workbooks
+
+Usage:
+    python -m report_core.batch reports/ "archive/2024-*.xlsx" -o batch_output --workers 8
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import glob
+import os
+import sys
+
+import pandas as pd
+
+from .charts import create_visualizations
+from .exports import create_comprehensive_powerpoint, create_excel_with_visualizations, create_streaming_excel_report
+from .history import HistoryStore, duplicate_wells, history_rows
+from .production import extract_wells_with_net_diff_bo
+
+REPORT_EXTENSIONS = ('.xlsx', '.xls', '.xlsm')
+EXPORT_FORMATS = ('csv', 'xlsx', 'pptx')
+
+# Statistics copied into the combined batch summary
+SUMMARY_STATS = [
+    'Total All Wells',
+    'Total Wells with Non-Zero Net Diff BO',
+    'Positive Net Diff BO Wells',
+    'Negative Net Diff BO Wells',
+    'Total Net BO (All Wells)',
+    'Total Net Diff BO (All Wells)',
+    'Average W/C (All Wells)'
+]
+
+def expand_inputs(inputs):
+    """
+    Expand directories and glob patterns into a sorted, de-duplicated list of report workbooks
+    """
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = [os.path.join(item, name) for name in os.listdir(item)]
+        else:
+            candidates = glob.glob(item) or [item]
+        for candidate in candidates:
+            name = os.path.basename(candidate)
+            # Skip Excel lock files such as '~$report.xlsx'
+            if name.startswith('~$') or not name.lower().endswith(REPORT_EXTENSIONS):
+                continue
+            paths.add(os.path.abspath(candidate))
+    return sorted(paths)
+
+def _output_stems(paths):
+    """
+    Unique output file stem per input, even when files in different folders share a name
+    """
+    stems = {}
+    used = set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        candidate = stem
+        counter = 1
+        while candidate in used:
+            counter += 1
+            candidate = f"{stem}_{counter}"
+        used.add(candidate)
+        stems[path] = candidate
+    return stems
+
+def _well_rows(final_df, original_columns, source_file):
+    """
+    Flat per-well rows (without the TOTAL row) for the combined wells file
+    """
+    field_col, well_name_col, net_bo_col, net_diff_bo_col = original_columns[:4]
+    wc_col = original_columns[4] if len(original_columns) > 4 else None
+    data = final_df[final_df[field_col] != 'TOTAL (All Wells)']
+    return pd.DataFrame({
+        'Source File': source_file,
+        'Field': data[field_col].to_numpy(),
+        'Well Name': data[well_name_col].to_numpy(),
+        'Net BO': data[net_bo_col].to_numpy(),
+        'Net Diff BO': data[net_diff_bo_col].to_numpy(),
+        'W/C': data[wc_col].to_numpy() if wc_col is not None else None
+    })
+
+def process_report(path, output_dir, stem, formats=EXPORT_FORMATS, collect_history=False, native_charts=False):
+    """
+    Parse one report, compute its statistics and write the requested exports
+
+    Runs inside a worker process; every failure is caught and reported in the returned summary row.
+    Returns (summary row, combined wells frame, history record); the history record is
+    (content hash, report date, source file, well rows) when collect_history is set.
+    native_charts selects the constant-memory Excel export with native Excel charts.
+    """
+    source_file = os.path.basename(path)
+    summary = {'Source File': source_file, 'Status': 'failed', 'Report Date': None, 'Outputs': '', 'Error': ''}
+    wells = None
+    history = None
+    try:
+        result = extract_wells_with_net_diff_bo(path)
+        if not result.ok:
+            errors = [d.message for d in result.diagnostics if d.level in ('error', 'warning')]
+            summary['Error'] = '; '.join(errors) or 'No valid data found'
+            return summary, wells, history
+
+        final_df, well_count, stats, original_columns, all_wells_data = result.as_tuple()
+        summary['Report Date'] = result.report_date
+        for key in SUMMARY_STATS:
+            summary[key] = stats.get(key)
+        wells = _well_rows(final_df, original_columns, source_file)
+        if collect_history:
+            history = (result.content_hash, result.report_date, source_file, history_rows(result))
+
+        outputs = []
+        export_errors = []
+
+        if 'csv' in formats:
+            csv_path = os.path.join(output_dir, f"{stem}_production_analysis.csv")
+            final_df.to_csv(csv_path, index=False)
+            outputs.append(csv_path)
+
+        charts = None
+        if 'xlsx' in formats or 'pptx' in formats:
+            data_without_total = final_df[final_df[original_columns[0]] != 'TOTAL (All Wells)']
+            charts = create_visualizations(data_without_total, original_columns, all_wells_data).value
+
+        builds = []
+        if 'xlsx' in formats:
+            build_excel = create_streaming_excel_report if native_charts else create_excel_with_visualizations
+            builds.append((f"{stem}_production_analysis.xlsx",
+                           build_excel(final_df, stats, charts, result.field_stats)))
+        if 'pptx' in formats:
+            builds.append((f"{stem}_production_presentation.pptx",
+                           create_comprehensive_powerpoint(final_df, well_count, stats, original_columns, charts)))
+
+        for file_name, build in builds:
+            if build.ok:
+                out_path = os.path.join(output_dir, file_name)
+                with open(out_path, 'wb') as f:
+                    f.write(build.value.getvalue())
+                outputs.append(out_path)
+            else:
+                export_errors.extend(d.message for d in build.errors)
+
+        summary['Status'] = 'ok' if not export_errors else 'partial'
+        summary['Outputs'] = '; '.join(outputs)
+        summary['Error'] = '; '.join(export_errors)
+        return summary, wells, history
+
+    except Exception as e:
+        summary['Error'] = f"{type(e).__name__}: {e}"
+        return summary, wells, history
+
+def _run_in_pools(paths, workers, handle, call):
+    """
+    Run call(path) = (function, *args) for every path in a process pool, passing each path and its
+    result (or exception) to handle() as they finish
+
+    A worker that dies (segfault, OOM kill) breaks the pool and fails every pending file with
+    BrokenProcessPool. Those files are run again in fresh pools, split in halves until the file
+    that crashed runs alone, so a crash only fails its own file.
+    """
+    groups = [list(paths)]
+    while groups:
+        group = groups.pop(0)
+        broken = []
+        with ProcessPoolExecutor(max_workers=min(workers, max(len(group), 1))) as executor:
+            futures = {executor.submit(*call(path)): path for path in group}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    outcome = future.result()
+                except BrokenProcessPool:
+                    broken.append(path)
+                    continue
+                except Exception as e:
+                    outcome = e
+                handle(path, outcome)
+        order = {path: position for position, path in enumerate(group)}
+        broken.sort(key=order.get)
+        if len(broken) == 1:
+            handle(broken[0], BrokenProcessPool("the worker process crashed on this file"))
+        elif broken:
+            middle = len(broken) // 2
+            groups[:0] = [broken[:middle], broken[middle:]]
+
+def run_batch(paths, output_dir, workers=None, formats=EXPORT_FORMATS, progress=None, history_path=None,
+              native_charts=False):
+    """
+    Process report workbooks in a process pool and write the combined summary files
+
+    When history_path is given, the extracted wells are also stored in that HistoryStore
+    (by the parent process, so there is a single SQLite writer).
+    Returns the summary DataFrame (one row per input file, in input order).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    stems = _output_stems(paths)
+    store = HistoryStore(history_path) if history_path else None
+
+    summaries = {}
+    wells = {}
+
+    def handle(path, outcome):
+        if isinstance(outcome, Exception):
+            summary = {'Source File': os.path.basename(path), 'Status': 'failed',
+                       'Outputs': '', 'Error': f"{type(outcome).__name__}: {outcome}"}
+            well_rows = history = None
+        else:
+            summary, well_rows, history = outcome
+        if history is not None:
+            content_hash, report_date, source_file, rows = history
+            if report_date is None:
+                summary['Error'] = '; '.join(filter(None, [summary['Error'], "no report date, not stored in history"]))
+            else:
+                store.ingest(content_hash, report_date, rows, source_file=source_file)
+                duplicates = duplicate_wells(rows)
+                if duplicates:
+                    summary['Error'] = '; '.join(filter(None, [
+                        summary['Error'], f"listed more than once (all rows stored in history): {', '.join(duplicates)}"
+                    ]))
+        summaries[path] = summary
+        if well_rows is not None:
+            wells[path] = well_rows
+        if progress:
+            progress(len(summaries), len(paths), summary)
+
+    _run_in_pools(
+        paths, workers, handle,
+        lambda path: (process_report, path, output_dir, stems[path], tuple(formats), store is not None, native_charts)
+    )
+
+    summary_df = pd.DataFrame(
+        [summaries[path] for path in paths],
+        columns=['Source File', 'Status', 'Report Date'] + SUMMARY_STATS + ['Outputs', 'Error']
+    )
+    summary_df.to_csv(os.path.join(output_dir, 'batch_summary.csv'), index=False)
+
+    if wells:
+        combined = pd.concat([wells[path] for path in paths if path in wells], ignore_index=True)
+        combined.to_csv(os.path.join(output_dir, 'combined_wells.csv'), index=False)
+
+    return summary_df
+
+def _print_progress(done, total, summary):
+    message = f"[{done}/{total}] {summary['Source File']}: {summary['Status']}"
+    if summary.get('Error'):
+        message += f" - {summary['Error']}"
+    print(message, file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Analyse a folder or glob of daily production 'Report' workbooks in parallel"
+    )
+    parser.add_argument('inputs', nargs='+', help="Report workbooks, folders or glob patterns")
+    parser.add_argument('-o', '--output-dir', default='batch_output', help="Folder for exports and summaries")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument(
+        '-f', '--formats', default=','.join(EXPORT_FORMATS),
+        help="Comma separated exports per report: csv, xlsx, pptx (default: all)"
+    )
+    parser.add_argument('--history', metavar='DB', default=None,
+                        help="Also store the extracted wells in this history database")
+    parser.add_argument('--native-charts', action='store_true',
+                        help="Stream the Excel exports in constant memory with native Excel charts")
+    args = parser.parse_args(argv)
+
+    formats = [fmt.strip().lower() for fmt in args.formats.split(',') if fmt.strip()]
+    unknown = sorted(set(formats) - set(EXPORT_FORMATS))
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(unknown)}")
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("no report workbooks found")
+
+    summary_df = run_batch(paths, args.output_dir, args.workers, formats,
+                           progress=_print_progress, history_path=args.history,
+                           native_charts=args.native_charts)
+    failed = int((summary_df['Status'] == 'failed').sum())
+    print(f"Processed {len(summary_df)} report(s), {failed} failed. Summary: "
+          f"{os.path.join(args.output_dir, 'batch_summary.csv')}")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
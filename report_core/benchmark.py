@@ -0,0 +1,445 @@
+"""
+Benchmarks of the report pipeline on synthetic workbooks, compared against a stored baseline
+
+Every case runs on generated workbooks of each size tier, and the startup cases time the
+import of the package and of the Streamlit app in fresh interpreters. A case records its best and
+median wall time and a digest of its output. Against the baseline, a changed digest means
+the results changed, and a slower best time beyond the tolerance is a regression.
+
+Usage:
+    python -m report_core.benchmark --tiers small,medium --repeat 3
+    python -m report_core.benchmark --update-baseline
+"""
+import argparse
+from contextlib import contextmanager
+import datetime
+import hashlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from openpyxl import load_workbook
+from pptx import Presentation
+
+from . import drilling
+from .charts import SCREEN_DPI, create_visualizations, get_png_cache
+from .comparison import compare_reports
+from .history import history_rows
+from .exports import create_comprehensive_powerpoint, create_excel_with_visualizations, create_streaming_excel_report
+from .production import extract_wells_with_net_diff_bo, get_extraction_cache
+from .profiling import StageProfiler, profiling
+from .synthetic import write_drilling_report, write_production_report
+from .wells import WellIndex, join_drilling_activity
+
+DEFAULT_BASELINE_PATH = 'benchmark_baseline.json'
+
+# Workbook sizes per tier: production wells and fields, drilling report activity rows and the
+# number of daily reports compared
+SIZE_TIERS = {
+    'small': {'wells': 60, 'fields': 3, 'activity_rows': 100, 'days': 5},
+    'medium': {'wells': 1500, 'fields': 6, 'activity_rows': 2000, 'days': 30},
+    'large': {'wells': 20000, 'fields': 7, 'activity_rows': 20000, 'days': 10},
+}
+
+# Modules timed by the startup cases, each imported in a fresh interpreter
+STARTUP_MODULES = ('report_core', 'operation_summary_app')
+# Dependencies that must load on first use of their feature, not at import time
+DEFERRED_IMPORTS = ('matplotlib', 'pptx', 'openpyxl', 'xlsxwriter')
+
+_STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, sorted(name for name in {deferred!r} if name in sys.modules)]))
+"""
+
+# A case is slower or faster when its best time moves by more than this fraction of the
+# baseline, and by more than the noise floor (seconds)
+DEFAULT_TOLERANCE = 0.2
+NOISE_FLOOR_SECONDS = 0.005
+
+def _digest(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+def _extraction_digest(result):
+    return _digest([result.final_df.to_csv(index=False), result.stats])
+
+def _presentation_digest(buffer):
+    """
+    Digest of the text of every slide, without the generation time of the title slide
+    """
+    texts = []
+    for slide in Presentation(io.BytesIO(buffer.getvalue())).slides:
+        for shape in slide.shapes:
+            if shape.has_text_frame:
+                lines = shape.text_frame.text.split('\n')
+                texts.append('\n'.join(line for line in lines if not line.startswith('Generated on:')))
+            if shape.has_table:
+                texts.extend(cell.text for row in shape.table.rows for cell in row.cells)
+    return _digest(texts)
+
+def _workbook_digest(buffer):
+    """
+    Digest of the cell values of every sheet (embedded images and charts are not compared)
+    """
+    workbook = load_workbook(io.BytesIO(buffer.getvalue()), read_only=True, data_only=True)
+    try:
+        return _digest({sheet.title: list(sheet.iter_rows(values_only=True)) for sheet in workbook.worksheets})
+    finally:
+        workbook.close()
+
+def _charts_digest(charts):
+    return _digest(charts.hashes)
+
+def _drilling_digest(results):
+    return _digest([result.value for result in results])
+
+def _frame_digest(frame):
+    return _digest(frame.to_csv(index=False))
+
+def _comparison_digest(comparison):
+    return _digest([comparison.well_deltas().to_csv(index=False), comparison.field_rollup().to_csv(index=False)])
+
+@contextmanager
+def isolated_drilling_caches(directory):
+    """
+    Point the drilling summary cache and the layout template store at a scratch directory,
+    so benchmarks neither read nor clear the caches of the app
+    """
+    saved = drilling._drilling_cache, drilling._template_store
+    drilling._drilling_cache = drilling.DrillingSummaryCache(os.path.join(directory, 'summaries'))
+    drilling._template_store = drilling.LayoutTemplateStore(os.path.join(directory, 'templates'))
+    try:
+        yield
+    finally:
+        drilling._drilling_cache, drilling._template_store = saved
+
+class BenchmarkContext:
+    """
+    Generated workbooks of one tier, plus the extraction and charts the export cases start from
+    """
+    def __init__(self, tier, directory):
+        sizes = SIZE_TIERS[tier]
+        self.tier = tier
+        self.directory = directory
+        self.production_path = os.path.join(directory, f"production_{tier}.xlsx")
+        self.drilling_path = os.path.join(directory, f"drilling_{tier}.xlsx")
+        write_production_report(self.production_path, wells=sizes['wells'], fields=sizes['fields'])
+        write_drilling_report(self.drilling_path, activity_rows=sizes['activity_rows'])
+        self._extraction = None
+        self._charts = None
+        self._daily_extractions = None
+
+    @property
+    def extraction(self):
+        if self._extraction is None:
+            self._extraction = extract_wells_with_net_diff_bo(self.production_path)
+        return self._extraction
+
+    @property
+    def charts(self):
+        if self._charts is None:
+            result = self.extraction
+            data_without_total = result.final_df[result.final_df[result.original_columns[0]] != 'TOTAL (All Wells)']
+            self._charts = create_visualizations(data_without_total, result.original_columns,
+                                                 result.df_before_total).value
+        return self._charts
+
+    @property
+    def daily_extractions(self):
+        """
+        Extractions of consecutive daily reports, with a few wells added or dropped from day to day
+        """
+        if self._daily_extractions is None:
+            sizes = SIZE_TIERS[self.tier]
+            first_day = datetime.date(2024, 5, 1)
+            self._daily_extractions = []
+            for day in range(sizes['days']):
+                path = os.path.join(self.directory, f"daily_{self.tier}_{day:02d}.xlsx")
+                write_production_report(path, wells=sizes['wells'] + day % 4, fields=sizes['fields'], seed=day,
+                                        report_date=first_day + datetime.timedelta(days=day))
+                self._daily_extractions.append(extract_wells_with_net_diff_bo(path))
+        return self._daily_extractions
+
+def bench_extract(context):
+    get_extraction_cache().clear()
+    return extract_wells_with_net_diff_bo(context.production_path)
+
+def bench_charts(context):
+    get_png_cache().clear()
+    result = context.extraction
+    data_without_total = result.final_df[result.final_df[result.original_columns[0]] != 'TOTAL (All Wells)']
+    charts = create_visualizations(data_without_total, result.original_columns, result.df_before_total).value
+    charts.images(SCREEN_DPI)
+    return charts
+
+def bench_powerpoint(context):
+    get_png_cache().clear()
+    final_df, well_count, stats, original_columns, _ = context.extraction.as_tuple()
+    return create_comprehensive_powerpoint(final_df, well_count, stats, original_columns, context.charts).value
+
+def bench_excel(context):
+    get_png_cache().clear()
+    result = context.extraction
+    return create_excel_with_visualizations(result.final_df, result.stats, context.charts, result.field_stats).value
+
+def bench_excel_streaming(context):
+    result = context.extraction
+    return create_streaming_excel_report(result.final_df, result.stats, context.charts, result.field_stats).value
+
+def bench_drilling_scan(context):
+    # Neither a cached summary nor a learned layout: hash, full scan and cache write
+    drilling.get_drilling_cache().clear()
+    drilling.get_template_store().clear()
+    return drilling.extract_operation_summaries([context.drilling_path])
+
+def bench_drilling_template(context):
+    # The first repeat learns the layout if no earlier case did
+    drilling.get_drilling_cache().clear()
+    return drilling.extract_operation_summaries([context.drilling_path])
+
+def bench_drilling_cached(context):
+    # The summary cached by an earlier case or repeat: hash and cache lookup only
+    return drilling.extract_operation_summaries([context.drilling_path])
+
+def bench_compare(context):
+    comparison = compare_reports(context.daily_extractions).value
+    comparison.well_deltas()
+    comparison.field_rollup()
+    return comparison
+
+def bench_well_join(context):
+    # Drilling reports for every tenth well, spelled the way rig contractors write them
+    production = history_rows(context.extraction)
+    summaries = [
+        {'well_name': f"{name.title().replace('-', ' ')} ST", 'rig_name': f"EDC-{number % 20}",
+         'last_24_summary': 'Drilled ahead', 'next_24_forecast': 'Continue drilling',
+         'file_name': f"EDC-{number % 20} 2024-05-01.xlsx"}
+        for number, name in enumerate(production['Well Name'].iloc[::10])
+    ]
+    # A fresh index, so the spellings are resolved in every run
+    return join_drilling_activity(production, summaries, WellIndex())
+
+# Case name -> (function(context) returning the output, digest of that output), in run order.
+# Digests are computed outside the timed runs.
+BENCHMARK_CASES = {
+    'extract': (bench_extract, _extraction_digest),
+    'charts': (bench_charts, _charts_digest),
+    'powerpoint': (bench_powerpoint, _presentation_digest),
+    'excel': (bench_excel, _workbook_digest),
+    'excel_streaming': (bench_excel_streaming, _workbook_digest),
+    'drilling_scan': (bench_drilling_scan, _drilling_digest),
+    'drilling_template': (bench_drilling_template, _drilling_digest),
+    'drilling_cached': (bench_drilling_cached, _drilling_digest),
+    'compare': (bench_compare, _comparison_digest),
+    'well_join': (bench_well_join, _frame_digest),
+}
+
+def run_case(case, context, repeat=3, trace_memory=False):
+    """
+    Run one case `repeat` times; returns its timings, output digest and the stage times of the best run
+    """
+    function, digest = BENCHMARK_CASES[case]
+    times = []
+    best_stages = None
+    output = None
+    for _ in range(repeat):
+        profiler = StageProfiler(trace_memory=False)
+        with profiling(profiler):
+            start = time.perf_counter()
+            output = function(context)
+            elapsed = time.perf_counter() - start
+        if not times or elapsed < min(times):
+            best_stages = _stage_totals(profiler)
+        times.append(elapsed)
+
+    record = {
+        'best_seconds': round(min(times), 4),
+        'median_seconds': round(statistics.median(times), 4),
+        'digest': digest(output),
+        'stages': best_stages,
+    }
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            function(context)
+            record['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return record
+
+def run_startup(module, repeat=3):
+    """
+    Import time of a module in `repeat` fresh interpreters; the digest covers the deferred
+    dependencies the import loaded, so loading one eagerly again shows up as a changed result
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = _STARTUP_SCRIPT.format(module=module, deferred=DEFERRED_IMPORTS)
+    times = []
+    loaded = []
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, '-c', script], cwd=root, capture_output=True, text=True,
+                                   check=True)
+        elapsed, loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+        times.append(elapsed)
+    return {
+        'best_seconds': round(min(times), 4),
+        'median_seconds': round(statistics.median(times), 4),
+        'digest': _digest(loaded),
+        'eager_imports': loaded,
+    }
+
+def _stage_totals(profiler):
+    """
+    Total seconds per stage name (a stage can run more than once, e.g. one savefig per chart)
+    """
+    totals = {}
+    for timing in profiler.timings:
+        totals[timing.stage] = round(totals.get(timing.stage, 0.0) + timing.wall_seconds, 4)
+    return totals
+
+def run_benchmarks(tiers=('small', 'medium'), cases=tuple(BENCHMARK_CASES), repeat=3, trace_memory=False,
+                   workbook_dir=None, progress=None, startup=True):
+    """
+    Run the startup cases and the cases on every tier; returns {'tier/case': record} plus the
+    environment under '_meta'
+    """
+    results = {}
+    if startup:
+        for module in STARTUP_MODULES:
+            try:
+                record = run_startup(module, repeat)
+            except subprocess.CalledProcessError:
+                # e.g. the app module is not next to the package
+                continue
+            results[f"startup/{module}"] = record
+            if progress:
+                progress(f"startup/{module}", record)
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = workbook_dir or scratch
+        os.makedirs(directory, exist_ok=True)
+        with isolated_drilling_caches(os.path.join(scratch, 'drilling_cache')):
+            for tier in tiers:
+                context = BenchmarkContext(tier, directory)
+                for case in cases:
+                    record = run_case(case, context, repeat, trace_memory)
+                    results[f"{tier}/{case}"] = record
+                    if progress:
+                        progress(f"{tier}/{case}", record)
+    results['_meta'] = {
+        'recorded_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'repeat': repeat,
+    }
+    return results
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Status per case: 'changed' (different output), 'slower', 'faster', 'ok' or 'new'
+    """
+    statuses = {}
+    for name, record in results.items():
+        if name.startswith('_'):
+            continue
+        reference = baseline.get(name)
+        if reference is None:
+            statuses[name] = 'new'
+        elif reference['digest'] != record['digest']:
+            statuses[name] = 'changed'
+        else:
+            delta = record['best_seconds'] - reference['best_seconds']
+            margin = max(reference['best_seconds'] * tolerance, NOISE_FLOOR_SECONDS)
+            statuses[name] = 'slower' if delta > margin else 'faster' if -delta > margin else 'ok'
+    return statuses
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def format_report(results, baseline=None, statuses=None):
+    """
+    Plain-text table of the results, with the baseline time and status when a baseline is given
+    """
+    lines = [f"{'case':<32}{'best s':>10}{'median s':>10}{'baseline s':>12}  status"]
+    for name, record in results.items():
+        if name.startswith('_'):
+            continue
+        reference = (baseline or {}).get(name)
+        reference_time = f"{reference['best_seconds']:.4f}" if reference else '-'
+        status = (statuses or {}).get(name, '')
+        line = f"{name:<32}{record['best_seconds']:>10.4f}{record['median_seconds']:>10.4f}{reference_time:>12}  {status}"
+        if 'peak_memory_bytes' in record:
+            line += f"  peak {record['peak_memory_bytes'] / 2**20:.1f} MB"
+        if record.get('eager_imports'):
+            line += f"  loads {', '.join(record['eager_imports'])}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the production and drilling pipelines on synthetic workbooks"
+    )
+    parser.add_argument('--tiers', default='small,medium',
+                        help=f"Comma separated size tiers: {', '.join(SIZE_TIERS)} (default: small,medium)")
+    parser.add_argument('--cases', default=','.join(BENCHMARK_CASES),
+                        help="Comma separated cases (default: all)")
+    parser.add_argument('-r', '--repeat', type=int, default=3, help="Runs per case; the best time is compared")
+    parser.add_argument('--memory', action='store_true', help="Also measure the tracemalloc peak of each case")
+    parser.add_argument('--no-startup', action='store_true', help="Skip the import time cases")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument('--update-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative slowdown reported as a regression (default: 0.2)")
+    parser.add_argument('--workbooks', metavar='DIR', default=None, help="Keep the generated workbooks in DIR")
+    parser.add_argument('-o', '--output', default=None, help="Also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    tiers = [tier.strip() for tier in args.tiers.split(',') if tier.strip()]
+    cases = [case.strip() for case in args.cases.split(',') if case.strip()]
+    unknown = sorted(set(tiers) - set(SIZE_TIERS)) + sorted(set(cases) - set(BENCHMARK_CASES))
+    if unknown:
+        parser.error(f"unknown tier(s) or case(s): {', '.join(unknown)}")
+
+    def _print_progress(name, record):
+        print(f"{name}: {record['best_seconds']:.4f} s", file=sys.stderr)
+
+    results = run_benchmarks(tiers, cases, args.repeat, args.memory, args.workbooks, progress=_print_progress,
+                             startup=not args.no_startup)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    baseline = load_baseline(args.baseline)
+    statuses = None
+    if baseline is not None and not args.update_baseline:
+        statuses = compare_to_baseline(results, baseline, args.tolerance)
+    print(format_report(results, baseline, statuses))
+
+    if args.update_baseline or baseline is None:
+        merged = {**(baseline or {}), **results}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    failed = sorted(name for name, status in statuses.items() if status in ('changed', 'slower'))
+    if failed:
+        print(f"{len(failed)} case(s) changed or slower than the baseline: {', '.join(failed)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
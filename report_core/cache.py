@@ -0,0 +1,130 @@
+"""
+Size-bounded caches shared by the report pipeline: an in-memory LRU and a JSON disk tier
+"""
+from collections import OrderedDict
+import json
+import os
+import tempfile
+import threading
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by entry count and by the total size reported for its values
+    """
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            # Mark as most recently used
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size):
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+
+            # Never keep a single result that is larger than the whole cache
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+
+            # Evict least recently used entries until both limits are respected
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+class DiskCache:
+    """
+    Directory of JSON values, one file per key, bounded by entry count
+
+    Reads refresh a file's modification time, so eviction removes the least recently used files.
+    Disk errors are never raised: an unreadable entry is a miss and a failed write is skipped,
+    as is a value that cannot be stored as JSON.
+    """
+    def __init__(self, directory, max_entries):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(path)
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            tmp_path = None
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                # Write to a temporary file first so readers never see a partial entry
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(value, f)
+                os.replace(tmp_path, self._path(key))
+                tmp_path = None
+                self._evict()
+            except (OSError, TypeError, ValueError):
+                # Values that cannot be stored as JSON are not cached; later gets are misses
+                pass
+            finally:
+                if tmp_path is not None:
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+
+    def _entries(self):
+        with os.scandir(self.directory) as entries:
+            return [entry for entry in entries if entry.name.endswith('.json')]
+
+    def _evict(self):
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            try:
+                for entry in self._entries():
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def __len__(self):
+        try:
+            return len(self._entries())
+        except OSError:
+            return 0
@@ -0,0 +1,259 @@
+"""
+Matplotlib charts for the production analysis
+
+Each chart is drawn as its own figure and rasterised at most once per data hash and
+resolution; the cached PNG bytes are shared by the dashboard, the PowerPoint slides and
+the Excel report.
+"""
+import hashlib
+import io
+
+import numpy as np
+import pandas as pd
+
+from .cache import LRUCache
+from .profiling import stage, staged
+from .results import DiagnosticLog, StageResult
+
+# Resolutions used by the consumers of the chart images
+SCREEN_DPI = 150  # dashboard and Excel report
+SLIDE_DPI = 200   # PowerPoint slides
+
+# Bump whenever the chart styling changes so stale cached images are never served
+CHART_STYLE_VERSION = "1"
+
+CHART_FIGSIZE = (9, 5.5)
+
+# PNG cache limits
+PNG_CACHE_MAX_ENTRIES = 96
+PNG_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+def _draw_net_diff_bo(ax, data):
+    """
+    1. Net Diff BO by Well (Non-Zero Wells - Top 15)
+    """
+    if data.empty:
+        ax.text(0.5, 0.5, 'No data available', ha='center', va='center', transform=ax.transAxes)
+        ax.set_title('Net Diff BO Performance')
+        return
+
+    display_wells = data['well_name']
+    display_net_diff = data['net_diff_bo']
+
+    bars = ax.bar(range(len(display_wells)), display_net_diff,
+                  color=['lightgreen' if x >= 0 else 'lightcoral' for x in display_net_diff],
+                  alpha=0.7)
+    ax.set_xlabel('Wells')
+    ax.set_ylabel('Net Diff BO')
+    ax.set_title('Net Diff BO Performance (Top 15 Wells)')
+    ax.set_xticks(range(len(display_wells)))
+    ax.set_xticklabels(display_wells, rotation=45, ha='right')
+    ax.grid(True, alpha=0.3)
+
+    for bar, value in zip(bars, display_net_diff):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{value:.1f}', ha='center', va='bottom' if height >= 0 else 'top',
+                fontsize=8)
+
+def _draw_net_bo(ax, data):
+    """
+    2. Net BO by Well (Non-Zero Wells - Top 15)
+    """
+    if data.empty:
+        ax.text(0.5, 0.5, 'No data available', ha='center', va='center', transform=ax.transAxes)
+        ax.set_title('Net BO Production')
+        return
+
+    display_wells = data['well_name']
+    display_net_bo = data['net_bo']
+
+    bars = ax.bar(range(len(display_wells)), display_net_bo,
+                  color='skyblue', alpha=0.7)
+    ax.set_xlabel('Wells')
+    ax.set_ylabel('Net BO')
+    ax.set_title('Net BO Production (Top 15 Wells)')
+    ax.set_xticks(range(len(display_wells)))
+    ax.set_xticklabels(display_wells, rotation=45, ha='right')
+    ax.grid(True, alpha=0.3)
+
+    for bar, value in zip(bars, display_net_bo):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{value:.0f}', ha='center', va='bottom',
+                fontsize=8)
+
+def _draw_top_producers(ax, data):
+    """
+    3. Top 10 Wells with Highest Net BO (ALL WELLS)
+    """
+    if data.empty:
+        ax.text(0.5, 0.5, 'No data available', ha='center', va='center', transform=ax.transAxes)
+        ax.set_title('Top 10 Highest Producing Wells')
+        return
+
+    # Create horizontal bar chart for better readability
+    bars = ax.barh(range(len(data)), data['net_bo'],
+                   color='gold', alpha=0.7, edgecolor='darkorange', linewidth=1)
+    ax.set_xlabel('Net BO')
+    ax.set_ylabel('Wells')
+    ax.set_title('Top 10 Highest Producing Wells')
+    ax.set_yticks(range(len(data)))
+    ax.set_yticklabels(data['well_name'])
+    ax.grid(True, alpha=0.3)
+
+    # Add value labels on bars
+    for bar, value in zip(bars, data['net_bo']):
+        width = bar.get_width()
+        ax.text(width + width*0.01, bar.get_y() + bar.get_height()/2.,
+                f'{value:.0f}', ha='left', va='center', fontsize=9, fontweight='bold')
+
+# Chart key -> (title used on slides and captions, draw function), in display order
+CHART_SPECS = {
+    'net_diff_bo': ("Net Diff BO Performance", _draw_net_diff_bo),
+    'net_bo': ("Net BO Production", _draw_net_bo),
+    'top_producers': ("Top 10 Highest Producing Wells", _draw_top_producers),
+}
+
+_png_cache = LRUCache(PNG_CACHE_MAX_ENTRIES, PNG_CACHE_MAX_BYTES)
+
+def get_png_cache():
+    """
+    Process-wide cache of rendered chart images
+    """
+    return _png_cache
+
+def _frame_hash(frame):
+    """
+    Content hash of a chart's data frame
+    """
+    digest = hashlib.sha1(repr(list(frame.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def render_chart_figure(key, data):
+    """
+    Draw one chart on its own figure
+    """
+    # matplotlib is the slowest import of the app, so it waits for the first chart
+    from matplotlib.figure import Figure
+
+    _, draw = CHART_SPECS[key]
+    fig = Figure(figsize=CHART_FIGSIZE)
+    ax = fig.subplots()
+    draw(ax, data)
+    fig.tight_layout()
+    return fig
+
+class ChartSet:
+    """
+    Data behind the three dashboard charts, with cached PNG rendering per chart and resolution
+
+    Only the small per-chart frames are kept, so a ChartSet is cheap to pickle to worker processes.
+    """
+    def __init__(self, frames):
+        self.frames = frames
+        self.hashes = {key: _frame_hash(frame) for key, frame in frames.items()}
+
+    @property
+    def keys(self):
+        return list(self.frames)
+
+    @staticmethod
+    def title(key):
+        return CHART_SPECS[key][0]
+
+    def png(self, key, dpi=SCREEN_DPI):
+        """
+        PNG bytes of one chart, rendered only if this data and resolution were not rendered before
+        """
+        cache_key = (key, self.hashes[key], dpi, CHART_STYLE_VERSION)
+        cache = get_png_cache()
+        image = cache.get(cache_key)
+        if image is None:
+            with stage('charts.plot', chart=key):
+                fig = render_chart_figure(key, self.frames[key])
+            buffer = io.BytesIO()
+            with stage('charts.savefig', chart=key, dpi=dpi):
+                fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+            image = buffer.getvalue()
+            cache.put(cache_key, image, len(image))
+        return image
+
+    def images(self, dpi=SCREEN_DPI):
+        """
+        (key, title, PNG bytes) for every chart in display order
+        """
+        return [(key, self.title(key), self.png(key, dpi)) for key in self.keys]
+
+@staged('charts.prepare')
+def create_visualizations(data_without_total, original_columns, all_wells_data):
+    """
+    Prepare the three dashboard charts (Net Diff BO, Net BO and top 10 producers)
+    """
+    log = DiagnosticLog()
+    try:
+        # Check if we have valid data for visualizations
+        if data_without_total.empty or all_wells_data.empty:
+            log.warning("No data available for visualizations")
+            return StageResult(diagnostics=log)
+
+        # Extract the column names
+        well_name_col = original_columns[1]  # ('RUNNING WELLS', 'Unnamed: 1_level_1')
+        net_bo_col = original_columns[2]     # ('TOTAL PRODUCTION', 'Net\nBO')
+        net_diff_bo_col = original_columns[3] # ('TOTAL PRODUCTION', 'Net diff. BO')
+
+        # Remove rows with NaN values in the key columns for visualization
+        viz_data_non_zero = data_without_total[
+            data_without_total[well_name_col].notna() &
+            data_without_total[net_bo_col].notna() &
+            data_without_total[net_diff_bo_col].notna()
+        ]
+
+        viz_data_all = all_wells_data[
+            all_wells_data[well_name_col].notna() &
+            all_wells_data[net_bo_col].notna()
+        ]
+
+        # Check if we have any data left after cleaning
+        if viz_data_non_zero.empty or viz_data_all.empty:
+            log.warning("No valid data available for visualizations after removing NaN values")
+            return StageResult(diagnostics=log)
+
+        # Non-zero wells data
+        well_names_non_zero = viz_data_non_zero[well_name_col]
+        net_bo_data_non_zero = viz_data_non_zero[net_bo_col]
+        net_diff_bo_data_non_zero = viz_data_non_zero[net_diff_bo_col]
+
+        # All wells data
+        well_names_all = viz_data_all[well_name_col]
+        net_bo_data_all = viz_data_all[net_bo_col]
+
+        # Check for finite values
+        if (net_bo_data_non_zero.isna().all() or net_diff_bo_data_non_zero.isna().all() or
+            not np.isfinite(net_bo_data_non_zero).any() or not np.isfinite(net_diff_bo_data_non_zero).any() or
+            net_bo_data_all.isna().all() or not np.isfinite(net_bo_data_all).any()):
+            log.warning("No finite values available for visualization")
+            return StageResult(diagnostics=log)
+
+        frames = {
+            'net_diff_bo': pd.DataFrame({
+                'well_name': well_names_non_zero.to_numpy(),
+                'net_diff_bo': net_diff_bo_data_non_zero.to_numpy()
+            }).head(15),
+            'net_bo': pd.DataFrame({
+                'well_name': well_names_non_zero.to_numpy(),
+                'net_bo': net_bo_data_non_zero.to_numpy()
+            }).head(15),
+            # Get top 10 wells with highest Net BO from ALL wells
+            'top_producers': pd.DataFrame({
+                'well_name': well_names_all.to_numpy(),
+                'net_bo': net_bo_data_all.to_numpy()
+            }).nlargest(10, 'net_bo').reset_index(drop=True),
+        }
+
+        return StageResult(ChartSet(frames), log)
+
+    except Exception as e:
+        log.exception(f"❌ Error creating visualizations: {str(e)}")
+        return StageResult(diagnostics=log)
@@ -0,0 +1,218 @@
+"""
+Day-over-day comparison of two or more production reports
+
+Wells are matched on their field (ignoring case and whitespace) and canonical well ID (see
+wells.py), so 'Abrar 84' and 'ABRAR-84' are the same well. The keys of all reports are hashed
+once (pandas factorize) into integer well codes, and every metric is scattered into a wells x
+reports matrix, so deltas, new and dropped wells and field rollups are vectorised array
+operations instead of per-well lookups.
+"""
+import numpy as np
+import pandas as pd
+
+from .history import HISTORY_COLUMNS, history_rows
+from .profiling import staged
+from .results import DiagnosticLog, StageResult
+from .wells import get_well_index
+
+COMPARISON_METRICS = ['Net BO', 'Net Diff BO', 'W/C']
+
+def canonical_text(values):
+    """
+    Canonical form of field or well names: upper case with collapsed whitespace
+
+    Each distinct name is normalised once; daily reports repeat the same names.
+    """
+    codes, uniques = pd.factorize(values.fillna('').astype(str))
+    canonical = np.array([' '.join(name.split()).upper() for name in uniques], dtype=object)
+    return pd.Series(canonical[codes] if len(codes) else [], index=values.index, dtype=object)
+
+def _report_label(result, position):
+    if result.report_date is not None:
+        return f"{result.report_date:%Y-%m-%d}"
+    return result.source_file or f"Report {position + 1}"
+
+class ReportComparison:
+    """
+    Metrics of every well across reports in date order
+
+    values[metric] and present are (wells x reports) arrays; wells are identified by their
+    canonical key and shown with the field and name of their latest report.
+    """
+    def __init__(self, labels, fields, wells, values, present):
+        self.labels = labels
+        self.fields = fields
+        self.wells = wells
+        self.values = values
+        self.present = present
+        self._field_codes, self._field_names = pd.factorize(canonical_text(pd.Series(fields)))
+
+    def _position(self, label, default):
+        return default if label is None else self.labels.index(label)
+
+    def wide(self, metric):
+        """
+        One column per report for a metric, indexed by (Field, Well Name)
+        """
+        index = pd.MultiIndex.from_arrays([self.fields, self.wells], names=['Field', 'Well Name'])
+        return pd.DataFrame(self.values[metric], index=index, columns=self.labels)
+
+    def deltas(self, metric):
+        """
+        Day-over-day changes of a metric, one column per report after the first (NaN unless the well is in both)
+        """
+        changes = np.diff(self.values[metric], axis=1)
+        index = pd.MultiIndex.from_arrays([self.fields, self.wells], names=['Field', 'Well Name'])
+        return pd.DataFrame(changes, index=index, columns=self.labels[1:])
+
+    def well_deltas(self, previous=None, current=None):
+        """
+        Per-well values and deltas between two reports (default: the last two), for wells in either report
+        """
+        previous = self._position(previous, len(self.labels) - 2)
+        current = self._position(current, len(self.labels) - 1)
+        in_previous = self.present[:, previous]
+        in_current = self.present[:, current]
+        rows = in_previous | in_current
+
+        frame = pd.DataFrame({'Field': self.fields[rows], 'Well Name': self.wells[rows]})
+        frame['Status'] = np.where(in_previous[rows] & in_current[rows], 'both',
+                                   np.where(in_current[rows], 'new', 'dropped'))
+        for metric in COMPARISON_METRICS:
+            before = self.values[metric][rows, previous]
+            after = self.values[metric][rows, current]
+            frame[f"{metric} ({self.labels[previous]})"] = before
+            frame[f"{metric} ({self.labels[current]})"] = after
+            frame[f"Δ {metric}"] = after - before
+        return frame
+
+    def new_wells(self, previous=None, current=None):
+        deltas = self.well_deltas(previous, current)
+        return deltas.loc[deltas['Status'] == 'new', ['Field', 'Well Name']].reset_index(drop=True)
+
+    def dropped_wells(self, previous=None, current=None):
+        deltas = self.well_deltas(previous, current)
+        return deltas.loc[deltas['Status'] == 'dropped', ['Field', 'Well Name']].reset_index(drop=True)
+
+    def field_rollup(self, previous=None, current=None):
+        """
+        Per-field totals of Net BO and Net Diff BO, average W/C and their deltas between two reports,
+        with the number of wells, new wells and dropped wells
+        """
+        previous = self._position(previous, len(self.labels) - 2)
+        current = self._position(current, len(self.labels) - 1)
+        in_previous = self.present[:, previous]
+        in_current = self.present[:, current]
+        codes = self._field_codes
+        groups = len(self._field_names)
+
+        def count(mask):
+            return np.bincount(codes[mask], minlength=groups)
+
+        def total(metric, position, mask):
+            values = np.nan_to_num(self.values[metric][:, position])
+            return np.bincount(codes[mask], weights=values[mask], minlength=groups)
+
+        def average(metric, position, mask):
+            values = self.values[metric][:, position]
+            valid = mask & ~np.isnan(values)
+            sums = np.bincount(codes[valid], weights=values[valid], minlength=groups)
+            counts = np.bincount(codes[valid], minlength=groups)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+        # Display name of each field: the latest spelling seen for it
+        names = pd.Series(self.fields).groupby(codes).last().reindex(range(groups)).to_numpy()
+        rollup = pd.DataFrame({
+            'Field': names,
+            'Wells': count(in_current),
+            'New Wells': count(in_current & ~in_previous),
+            'Dropped Wells': count(in_previous & ~in_current),
+        })
+        for metric in ('Net BO', 'Net Diff BO'):
+            before = total(metric, previous, in_previous)
+            after = total(metric, current, in_current)
+            rollup[f"{metric} ({self.labels[previous]})"] = before
+            rollup[f"{metric} ({self.labels[current]})"] = after
+            rollup[f"Δ {metric}"] = after - before
+        before = average('W/C', previous, in_previous)
+        after = average('W/C', current, in_current)
+        rollup[f"Average W/C ({self.labels[previous]})"] = before
+        rollup[f"Average W/C ({self.labels[current]})"] = after
+        rollup["Δ Average W/C"] = after - before
+        return rollup.sort_values('Field').reset_index(drop=True)
+
+    def field_totals(self, metric='Net BO'):
+        """
+        Total of a metric per field (rows) and report (columns)
+        """
+        values = np.where(self.present, np.nan_to_num(self.values[metric]), 0.0)
+        totals = np.zeros((len(self._field_names), len(self.labels)))
+        np.add.at(totals, self._field_codes, values)
+        names = pd.Series(self.fields).groupby(self._field_codes).last().reindex(range(len(self._field_names)))
+        return pd.DataFrame(totals, index=pd.Index(names.to_numpy(), name='Field'), columns=self.labels)
+
+def compare_rows(labels, frames, well_index=None):
+    """
+    Build a ReportComparison from flat per-well frames (HISTORY_COLUMNS), one per report, in order
+
+    A well listed twice in one report keeps its last row.
+    """
+    if well_index is None:
+        well_index = get_well_index()
+    long = pd.concat(
+        [frame[HISTORY_COLUMNS].assign(_report=position) for position, frame in enumerate(frames)],
+        ignore_index=True
+    )
+    keys = canonical_text(long['Field']) + '\x1f' + well_index.well_ids(long['Well Name'])
+    codes, uniques = pd.factorize(keys)
+    reports = long['_report'].to_numpy()
+    shape = (len(uniques), len(labels))
+
+    present = np.zeros(shape, dtype=bool)
+    present[codes, reports] = True
+    values = {}
+    for metric in COMPARISON_METRICS:
+        matrix = np.full(shape, np.nan)
+        # Later rows overwrite earlier ones, so the last row of a duplicated well wins
+        matrix[codes, reports] = pd.to_numeric(long[metric], errors='coerce').to_numpy(dtype=float)
+        values[metric] = matrix
+
+    # Display names from the latest report listing each well
+    latest = pd.Series(np.arange(len(long))).groupby(codes).last().to_numpy()
+    fields = long['Field'].to_numpy()[latest].astype(str)
+    wells = long['Well Name'].to_numpy()[latest].astype(str)
+    return ReportComparison(labels, fields, wells, values, present)
+
+@staged('comparison.compare')
+def compare_reports(results):
+    """
+    Compare successfully extracted production reports in report date order (upload order for undated reports)
+
+    The StageResult value is the ReportComparison, or None when fewer than two reports can be compared.
+    """
+    log = DiagnosticLog()
+    usable = [result for result in results if result.ok]
+    if len(usable) < len(results):
+        log.warning(f"⚠️ {len(results) - len(usable)} report(s) could not be extracted and are left out")
+    if len(usable) < 2:
+        log.warning("⚠️ At least two valid reports are needed for a comparison")
+        return StageResult(diagnostics=log)
+
+    undated = sum(result.report_date is None for result in usable)
+    if undated:
+        log.info(f"📅 {undated} report(s) without a date are placed after the dated reports, in upload order")
+    ordered = sorted(enumerate(usable), key=lambda item: (item[1].report_date is None,
+                                                          item[1].report_date or 0, item[0]))
+    labels = []
+    for position, (_, result) in enumerate(ordered):
+        label = _report_label(result, position)
+        if label in labels:
+            # Two reports for the same day: tell them apart by file name
+            label = f"{label} ({result.source_file or position + 1})"
+            log.warning(f"⚠️ More than one report for {label.split(' ')[0]} - both are compared")
+        labels.append(label)
+
+    comparison = compare_rows(labels, [history_rows(result) for _, result in ordered])
+    log.success(f"✅ Compared {len(labels)} reports covering {len(comparison.wells)} wells")
+    return StageResult(comparison, log)
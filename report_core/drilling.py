@@ -0,0 +1,514 @@
+"""
+Headless extraction of operation summaries from drilling report workbooks
+
+Each contractor layout is scanned in full once; later reports in that layout are read at the
+learned label cells, with a full scan whenever those cells no longer hold their labels.
+"""
+import collections
+from contextlib import ExitStack
+import hashlib
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import re
+import time
+
+from .cache import DiskCache, LRUCache
+from .profiling import stage, staged
+from .results import DiagnosticLog, StageResult
+from .uploads import BufferReader, content_hash, source_name, upload_buffer
+
+# Labels searched for in drilling reports -> key of the extracted value.
+# Add an entry here to extract another field; all labels are matched in the same pass.
+DRILLING_LABELS = {
+    'WELL NAME': 'well_name',
+    'RIG NAME': 'rig_name',
+    'LAST 24 SUMMARY': 'last_24_summary',
+    'NEXT 24 FORECAST': 'next_24_forecast',
+}
+
+class KeywordScanner:
+    """
+    Single-pass search of worksheet rows for a set of labels and the value written next to each label
+    """
+    def __init__(self, labels):
+        self.labels = [label.upper() for label in labels]
+        # Longest labels first so a label that contains another one wins
+        alternatives = sorted(self.labels, key=len, reverse=True)
+        self.pattern = re.compile('|'.join(re.escape(label) for label in alternatives), re.IGNORECASE)
+
+    @staticmethod
+    def label_value(row, position, label):
+        """
+        Value for a label found at row[position]: the next cell, or else the first other non-empty cell of the row
+        """
+        if position + 1 < len(row) and row[position + 1]:
+            return str(row[position + 1])
+        for cell in row:
+            if cell and label not in str(cell).upper():
+                return str(cell)
+        return None
+
+    def locate(self, rows, first_row=1):
+        """
+        Map each label to (value, row number, column index), taking the first row that yields a value;
+        stops once every label is found
+        """
+        found = {}
+        for row_number, row in enumerate(rows, first_row):
+            tried = set()
+            for position, cell in enumerate(row):
+                # Labels are text, so numbers, dates and empty cells are skipped without formatting them
+                if type(cell) is not str:
+                    continue
+                for match in self.pattern.finditer(cell):
+                    label = match.group(0).upper()
+                    if label in found or label in tried:
+                        continue
+                    tried.add(label)
+                    value = self.label_value(row, position, label)
+                    if value:
+                        found[label] = (value, row_number, position)
+            if len(found) == len(self.labels):
+                break
+        return found
+
+    def scan(self, rows):
+        """
+        Map each label to its value, taking the first row that yields one; stops once every label is found
+        """
+        return {label: value for label, (value, _, _) in self.locate(rows).items()}
+
+    def read_template(self, rows, first_row, template):
+        """
+        Map each label to its value read at the cells of a learned template ({label: [row, column]})
+
+        rows are the sheet rows from first_row on. Returns None when a template cell no longer
+        holds its label or the label has no value, so the caller can fall back to a full scan.
+        """
+        wanted = {}
+        for label, (row_number, position) in template.items():
+            wanted.setdefault(row_number, []).append((label, position))
+        found = {}
+        for row_number, row in enumerate(rows, first_row):
+            for label, position in wanted.get(row_number, ()):
+                cell = row[position] if position < len(row) else None
+                if type(cell) is not str or label not in cell.upper():
+                    return None
+                value = self.label_value(row, position, label)
+                if not value:
+                    return None
+                found[label] = value
+        return found if len(found) == len(template) else None
+
+_drilling_scanner = KeywordScanner(DRILLING_LABELS)
+
+# Bump whenever the extracted fields or their cleanup change so stale cached summaries are never served
+DRILLING_PARSER_VERSION = "1"
+
+DEFAULT_DRILLING_CACHE_DIR = os.environ.get('DRILLING_CACHE_DIR', '.drilling_cache')
+
+# Summary cache limits (summaries are a few hundred bytes each)
+DRILLING_CACHE_MAX_ENTRIES = 1024
+DRILLING_CACHE_MAX_BYTES = 16 * 1024 * 1024
+DRILLING_DISK_CACHE_MAX_ENTRIES = 10000
+
+# Time budget per drilling report in the parallel extraction (seconds)
+DRILLING_FILE_TIMEOUT = 60
+# Smaller batches are extracted in-process
+DRILLING_PARALLEL_MIN_FILES = 4
+
+# Learned layouts kept per rig contractor template (a template is a few dozen bytes)
+DRILLING_TEMPLATE_MAX_ENTRIES = 256
+
+def clean_label_value(value):
+    """
+    Strip the ':' and ':-' separators that follow labels in the reports
+    """
+    return value.replace(':-', '').replace(':', '').strip() if value else "Not Found"
+
+class DrillingSummaryCache:
+    """
+    Drilling report summaries keyed by file content hash: an in-memory LRU in front of a JSON disk tier
+
+    Entries hold the extracted fields without the file name, which belongs to each upload.
+    """
+    def __init__(self, directory=DEFAULT_DRILLING_CACHE_DIR, max_entries=DRILLING_CACHE_MAX_ENTRIES,
+                 disk_max_entries=DRILLING_DISK_CACHE_MAX_ENTRIES):
+        self.memory = LRUCache(max_entries, DRILLING_CACHE_MAX_BYTES)
+        self.disk = DiskCache(directory, disk_max_entries) if directory else None
+
+    @staticmethod
+    def cache_key(file_hash):
+        """
+        Cache key of a report: SHA-256 of the file content plus the extractor version
+        """
+        return f"{file_hash}-v{DRILLING_PARSER_VERSION}"
+
+    def get(self, file_hash):
+        key = self.cache_key(file_hash)
+        summary = self.memory.get(key)
+        if summary is None and self.disk is not None:
+            summary = self.disk.get(key)
+            if summary is not None:
+                self.memory.put(key, summary, _summary_size(summary))
+        return dict(summary) if summary is not None else None
+
+    def put(self, file_hash, summary):
+        key = self.cache_key(file_hash)
+        self.memory.put(key, dict(summary), _summary_size(summary))
+        if self.disk is not None:
+            self.disk.put(key, summary)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+def _summary_size(summary):
+    return sum(len(str(value)) for value in summary.values())
+
+_drilling_cache = DrillingSummaryCache()
+
+def get_drilling_cache():
+    """
+    Process-wide drilling summary cache
+    """
+    return _drilling_cache
+
+def layout_fingerprint(sheet):
+    """
+    Layout of a read-only worksheet as recorded in the file: sheet title and stored dimensions
+
+    Must be taken before reset_dimensions(); sheets saved without a dimension record give None sizes.
+    """
+    return [sheet.title, sheet.max_row, sheet.max_column]
+
+class LayoutTemplateStore:
+    """
+    Label cell coordinates learned per report layout: an in-memory LRU in front of a JSON disk tier
+
+    A template is stored under the exact layout fingerprint and under the sheet title alone, so
+    a contractor's report that grew a few rows still tries the last layout seen for that sheet.
+    """
+    def __init__(self, directory=os.path.join(DEFAULT_DRILLING_CACHE_DIR, 'templates'),
+                 max_entries=DRILLING_TEMPLATE_MAX_ENTRIES):
+        self.memory = LRUCache(max_entries, DRILLING_CACHE_MAX_BYTES)
+        self.disk = DiskCache(directory, max_entries) if directory else None
+
+    @staticmethod
+    def template_keys(fingerprint):
+        """
+        Exact and sheet-title keys of a layout; both include the labels and the extractor version
+        """
+        keys = []
+        for part in (fingerprint, fingerprint[:1]):
+            text = json.dumps([DRILLING_PARSER_VERSION, sorted(DRILLING_LABELS), part])
+            keys.append(hashlib.sha1(text.encode('utf-8')).hexdigest())
+        return keys
+
+    def candidates(self, fingerprint):
+        """
+        Distinct templates to try for a layout, the exact match first
+        """
+        templates = []
+        for key in self.template_keys(fingerprint):
+            template = self.memory.get(key)
+            if template is None and self.disk is not None:
+                template = self.disk.get(key)
+                if template is not None:
+                    self.memory.put(key, template, len(template))
+            if template is not None and template not in templates:
+                templates.append(template)
+        return templates
+
+    def put(self, fingerprint, template):
+        for key in self.template_keys(fingerprint):
+            self.memory.put(key, template, len(template))
+            if self.disk is not None:
+                self.disk.put(key, template)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+_template_store = LayoutTemplateStore()
+
+def get_template_store():
+    """
+    Process-wide store of learned drilling report layouts
+    """
+    return _template_store
+
+def extract_operation_summary_from_excel(uploaded_file):
+    """
+    Extract operation summary, well name, and rig name from an uploaded Excel file or path
+    """
+    return extract_operation_summaries([uploaded_file])[0]
+
+def _scan_drilling_workbook(file_buffer):
+    """
+    Labels and values found on the active sheet of a workbook buffer
+
+    Reports in a known layout are read at the learned cells; any other report is scanned in
+    full and, when every label is found, teaches its layout to the template store.
+    """
+    from openpyxl import load_workbook
+
+    reader = BufferReader(file_buffer)
+    wb = None
+    try:
+        # Stream the active sheet; formatting and cell objects are never materialised
+        wb = load_workbook(filename=reader, read_only=True, data_only=True)
+        sheet = wb.active
+        fingerprint = layout_fingerprint(sheet)
+        # Stale dimension records would otherwise truncate rows
+        sheet.reset_dimensions()
+
+        # Known layout: read only the learned cells, streaming no further than the last of them
+        templates = get_template_store()
+        for template in templates.candidates(fingerprint):
+            first_row = min(row for row, _ in template.values())
+            last_row = max(row for row, _ in template.values())
+            rows = sheet.iter_rows(min_row=first_row, max_row=last_row, values_only=True)
+            found = _drilling_scanner.read_template(rows, first_row, template)
+            if found is not None:
+                return found
+
+        located = _drilling_scanner.locate(sheet.iter_rows(values_only=True))
+        if len(located) == len(DRILLING_LABELS):
+            templates.put(fingerprint, {label: [row, column] for label, (_, row, column) in located.items()})
+        return {label: value for label, (value, _, _) in located.items()}
+    finally:
+        if wb is not None:
+            wb.close()
+        reader.close()
+
+def _extract_operation_summary(file_name, file_content):
+    """
+    Extract one drilling report given its display name (module-level so worker processes can run it)
+
+    file_content may be bytes, a buffer, an upload or a path; it is parsed in place, without copies.
+    """
+    log = DiagnosticLog()
+    try:
+        with upload_buffer(file_content) as file_buffer:
+            found = _scan_drilling_workbook(file_buffer)
+
+        summary = {'file_name': file_name}
+        for label, key in DRILLING_LABELS.items():
+            summary[key] = clean_label_value(found.get(label))
+        return StageResult(summary, log)
+
+    except Exception as e:
+        log.error(f"Error processing file {file_name}: {str(e)}")
+        return StageResult(diagnostics=log)
+
+def _failed_summary(file_name, reason):
+    log = DiagnosticLog()
+    log.error(f"Error processing file {file_name}: {reason}")
+    return StageResult(diagnostics=log)
+
+def _process_context():
+    """
+    Start method of the extraction workers
+
+    Forking the multithreaded Streamlit server would copy locks held by its other threads into
+    the children, so workers come from a fork server (spawned where there is none).
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context('spawn')
+
+def _summary_worker(conn):
+    """
+    Worker process: announce itself, then answer (function, name, payload) jobs until None arrives
+    """
+    try:
+        conn.send(None)
+        for function, name, payload in iter(conn.recv, None):
+            try:
+                result = function(name, payload)
+            except Exception as e:
+                result = _failed_summary(name, f"{type(e).__name__}: {e}")
+            conn.send(result)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        conn.close()
+
+class _ExtractionWorker:
+    """
+    One worker process with its own pipe, running one job at a time
+    """
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_summary_worker, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.started = False
+        self.job = None
+        self.deadline = None
+
+    def run(self, job, task, timeout):
+        self.conn.send(task)
+        self.job = job
+        self.deadline = time.monotonic() + timeout
+
+    def stop(self):
+        """
+        Let an idle worker exit, kill a busy one
+        """
+        if self.job is None and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+def _extract_in_pool(jobs, workers, timeout):
+    """
+    Run _extract_operation_summary over (name, upload, buffer) jobs, in worker processes when worthwhile
+
+    In-process extraction parses the buffers in place; worker processes get the path of files on
+    disk, or a copy of the bytes of in-memory uploads. Every job gets `timeout` seconds from the
+    moment a worker picks it up; a worker that runs past its deadline or dies is replaced, and
+    the other workers keep going.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1 or len(jobs) < DRILLING_PARALLEL_MIN_FILES:
+        return [_extract_operation_summary(name, file_buffer) for name, _, file_buffer in jobs]
+
+    def task(job):
+        name, upload, file_buffer = jobs[job]
+        payload = upload if isinstance(upload, (str, os.PathLike)) else file_buffer.tobytes()
+        return _extract_operation_summary, name, payload
+
+    def finish(job, result):
+        nonlocal remaining
+        results[job] = result
+        remaining -= 1
+
+    context = _process_context()
+    results = [None] * len(jobs)
+    remaining = len(jobs)
+    queue = collections.deque(range(len(jobs)))
+    pool = [_ExtractionWorker(context) for _ in range(workers)]
+    try:
+        while remaining:
+            if not pool:
+                # Every worker died before it could take a job
+                while queue:
+                    job = queue.popleft()
+                    finish(job, _failed_summary(jobs[job][0], "no worker process could be started"))
+                break
+
+            now = time.monotonic()
+            for position, worker in enumerate(pool):
+                if worker.job is not None and worker.deadline <= now:
+                    finish(worker.job, _failed_summary(jobs[worker.job][0], f"timed out after {timeout} s"))
+                    # Only the stuck worker is replaced
+                    worker.stop()
+                    pool[position] = _ExtractionWorker(context)
+            if not remaining:
+                break
+
+            deadlines = [worker.deadline for worker in pool if worker.job is not None]
+            ready = multiprocessing.connection.wait(
+                [worker.conn for worker in pool] + [worker.process.sentinel for worker in pool],
+                timeout=max(min(deadlines) - now, 0) if deadlines else None
+            )
+            for position, worker in enumerate(list(pool)):
+                if worker.conn not in ready and worker.process.sentinel not in ready:
+                    continue
+                try:
+                    result = worker.conn.recv()
+                except (EOFError, OSError):
+                    # The worker died (segfault, OOM kill): only its own file fails
+                    worker.stop()
+                    if worker.job is not None:
+                        finish(worker.job, _failed_summary(
+                            jobs[worker.job][0], f"worker process exited with code {worker.process.exitcode}"
+                        ))
+                    # A worker that dies before taking a job is not restarted over and over
+                    pool[position] = _ExtractionWorker(context) if worker.started else None
+                    continue
+
+                worker.started = True
+                if worker.job is not None:
+                    finish(worker.job, result)
+                    worker.job = None
+                if queue:
+                    worker.run(queue[0], task(queue[0]), timeout)
+                    queue.popleft()
+            pool = [worker for worker in pool if worker is not None]
+    finally:
+        for worker in pool:
+            worker.stop()
+    return results
+
+@staged('drilling.extract')
+def extract_operation_summaries(files, workers=None, timeout=DRILLING_FILE_TIMEOUT):
+    """
+    Extract many drilling reports (any iterable of uploads) in a process pool; returns one
+    StageResult per file, in input order
+
+    Successful results are summary dicts that also carry the file name and the content hash.
+
+    Summaries are cached by file content hash, so only files that were never parsed before
+    (and each distinct content only once) reach the pool. A file that raises, crashes its worker
+    or runs longer than `timeout` seconds only fails its own result: each file's time budget
+    starts when a worker picks it up, and only a stuck or crashed worker is replaced. Small
+    batches are parsed in-process, where starting workers would cost more than it saves.
+    """
+    cache = get_drilling_cache()
+    results = []
+    misses = {}
+    with ExitStack() as buffers:
+        with stage('drilling.hash') as details:
+            # files may be a generator (expand_archives), so uploads are counted as they come
+            for index, uploaded_file in enumerate(files):
+                file_name = source_name(uploaded_file)
+                results.append(None)
+                with ExitStack() as file_stack:
+                    try:
+                        file_buffer = file_stack.enter_context(upload_buffer(uploaded_file))
+                    except OSError as e:
+                        results[index] = _failed_summary(file_name, str(e))
+                        continue
+
+                    file_hash = content_hash(file_buffer)
+                    cached = cache.get(file_hash)
+                    if cached is not None:
+                        results[index] = StageResult({'file_name': file_name, **cached, 'content_hash': file_hash})
+                        continue
+                    entries = misses.setdefault(file_hash, [])
+                    entries.append((index, file_name, uploaded_file, file_buffer))
+                    if len(entries) == 1:
+                        # Only the first upload of each content is parsed; keep its buffer open until then
+                        buffers.enter_context(file_stack.pop_all())
+            details['files'] = len(results)
+
+        # Parse each distinct uncached content once
+        jobs = [entries[0][1:] for entries in misses.values()]
+        with stage('drilling.parse', files=len(jobs)):
+            parsed_results = _extract_in_pool(jobs, workers, timeout)
+
+    for file_hash, parsed in zip(misses, parsed_results):
+        if parsed.ok:
+            cache.put(file_hash, {key: value for key, value in parsed.value.items() if key != 'file_name'})
+        for index, file_name, _, _ in misses[file_hash]:
+            if parsed.ok:
+                results[index] = StageResult({**parsed.value, 'file_name': file_name, 'content_hash': file_hash},
+                                             list(parsed.diagnostics))
+            else:
+                results[index] = parsed
+    return results
@@ -0,0 +1,170 @@
+"""
+Full-text index of drilling report summaries, keyed by well, rig, report date and source file
+
+Backed by SQLite FTS5 (standard library): the LAST 24 SUMMARY and NEXT 24 FORECAST texts are
+indexed with the porter stemmer, so 'cement' also finds 'cementing'. Every report is identified
+by its content hash, so re-indexing a known file is a no-op.
+"""
+from contextlib import contextmanager
+import datetime
+import os
+import re
+import sqlite3
+
+import pandas as pd
+
+from .profiling import staged
+from .reader import infer_report_date
+
+DEFAULT_DRILLING_INDEX_PATH = os.environ.get('DRILLING_INDEX_DB', 'drilling_reports.sqlite')
+
+# Results returned by a search unless a limit is given
+SEARCH_RESULT_LIMIT = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS drilling_reports (
+    content_hash TEXT PRIMARY KEY,
+    well TEXT,
+    rig TEXT,
+    report_date TEXT,
+    source_file TEXT,
+    last_24_summary TEXT,
+    next_24_forecast TEXT,
+    indexed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_drilling_reports_well ON drilling_reports (well, report_date);
+CREATE INDEX IF NOT EXISTS idx_drilling_reports_rig ON drilling_reports (rig, report_date);
+CREATE VIRTUAL TABLE IF NOT EXISTS drilling_fts USING fts5(
+    last_24_summary,
+    next_24_forecast,
+    content='drilling_reports',
+    content_rowid='rowid',
+    tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS drilling_reports_ai AFTER INSERT ON drilling_reports BEGIN
+    INSERT INTO drilling_fts (rowid, last_24_summary, next_24_forecast)
+    VALUES (new.rowid, new.last_24_summary, new.next_24_forecast);
+END;
+CREATE TRIGGER IF NOT EXISTS drilling_reports_ad AFTER DELETE ON drilling_reports BEGIN
+    INSERT INTO drilling_fts (drilling_fts, rowid, last_24_summary, next_24_forecast)
+    VALUES ('delete', old.rowid, old.last_24_summary, old.next_24_forecast);
+END;
+"""
+
+def fts_query(text):
+    """
+    Turn free text into an FTS5 query: every word or "quoted phrase" must match
+
+    Words are quoted, so punctuation and FTS operators typed by users never cause syntax errors.
+    """
+    terms = re.findall(r'"([^"]+)"|(\S+)', text)
+    quoted = []
+    for phrase, word in terms:
+        term = (phrase or word).replace('"', '""').strip()
+        if term:
+            quoted.append(f'"{term}"')
+    return ' '.join(quoted)
+
+def _optional_text(value):
+    return None if value in (None, '', 'Not Found') else value
+
+class DrillingReportIndex:
+    """
+    SQLite FTS5 index of extracted drilling report summaries
+    """
+    def __init__(self, path=DEFAULT_DRILLING_INDEX_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """
+        Connection for one operation: committed on success, rolled back on error, always closed
+        """
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staged('drilling.index')
+    def add_summaries(self, summaries, report_date=None):
+        """
+        Index drilling summaries (dicts from extract_operation_summaries); returns the number of new reports
+
+        The report date is taken from the file name (e.g. 'EDC-11 2024-05-01.xlsx') unless given.
+        """
+        indexed_at = datetime.datetime.now().isoformat(timespec='seconds')
+        records = []
+        for summary in summaries:
+            date = report_date or infer_report_date(summary['file_name'])
+            records.append((
+                summary['content_hash'],
+                _optional_text(summary['well_name']),
+                _optional_text(summary['rig_name']),
+                date.isoformat() if date else None,
+                summary['file_name'],
+                _optional_text(summary['last_24_summary']),
+                _optional_text(summary['next_24_forecast']),
+                indexed_at
+            ))
+
+        with self._connect() as conn:
+            return conn.executemany(
+                'INSERT OR IGNORE INTO drilling_reports VALUES (?, ?, ?, ?, ?, ?, ?, ?)', records
+            ).rowcount
+
+    def search(self, text, well=None, rig=None, start=None, end=None, limit=SEARCH_RESULT_LIMIT):
+        """
+        Reports whose summary or forecast matches the text, best matches first, with snippets
+        that mark the matching words as «word»
+        """
+        query = fts_query(text)
+        if not query:
+            return pd.DataFrame(columns=['Report Date', 'Well Name', 'Rig Name', 'Last 24 Hours', 'Next 24 Hours',
+                                         'Source File'])
+
+        conditions = ['drilling_fts MATCH ?']
+        params = [query]
+        if well:
+            conditions.append('r.well = ?')
+            params.append(well)
+        if rig:
+            conditions.append('r.rig = ?')
+            params.append(rig)
+        if start:
+            conditions.append('r.report_date >= ?')
+            params.append(start.isoformat())
+        if end:
+            conditions.append('r.report_date <= ?')
+            params.append(end.isoformat())
+
+        sql = (
+            'SELECT r.report_date AS "Report Date", r.well AS "Well Name", r.rig AS "Rig Name", '
+            "snippet(drilling_fts, 0, '«', '»', ' … ', 16) AS \"Last 24 Hours\", "
+            "snippet(drilling_fts, 1, '«', '»', ' … ', 16) AS \"Next 24 Hours\", "
+            'r.source_file AS "Source File" '
+            'FROM drilling_fts JOIN drilling_reports r ON r.rowid = drilling_fts.rowid '
+            f'WHERE {" AND ".join(conditions)} ORDER BY bm25(drilling_fts) LIMIT ?'
+        )
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params + [limit])
+
+    def _distinct(self, column):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(
+                f'SELECT DISTINCT {column} FROM drilling_reports WHERE {column} IS NOT NULL ORDER BY {column}'
+            )]
+
+    def wells(self):
+        return self._distinct('well')
+
+    def rigs(self):
+        return self._distinct('rig')
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM drilling_reports').fetchone()[0]
@@ -0,0 +1,502 @@
+"""
+PowerPoint and Excel report builders
+"""
+import io
+import math
+import struct
+
+import pandas as pd
+
+from .charts import CHART_STYLE_VERSION, SCREEN_DPI, SLIDE_DPI
+from .production import PARSER_VERSION
+from .profiling import staged
+from .results import DiagnosticLog, StageResult
+
+# Chart images are rendered at SCREEN_DPI and shown smaller in the Excel report
+EXCEL_IMAGE_SCALE = 0.6
+
+# Header cell style of every Excel sheet
+EXCEL_HEADER_FORMAT = {
+    'bold': True,
+    'text_wrap': True,
+    'valign': 'top',
+    'fg_color': '#D7E4BC',
+    'border': 1
+}
+
+# Rows converted and written per batch by the streaming Excel export
+EXCEL_STREAM_CHUNK_ROWS = 10000
+
+def _png_height(image):
+    """
+    Pixel height from the IHDR chunk of a PNG image
+    """
+    return struct.unpack('>I', image[20:24])[0]
+
+# Data rows per PowerPoint table slide
+TABLE_ROWS_PER_SLIDE = 15
+
+def _column_text(series, numeric):
+    """
+    Cell text of one table column: numbers with thousands separators and two decimals, everything else as str
+    """
+    if not numeric or pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series.astype(str).tolist()
+    if pd.api.types.is_float_dtype(series):
+        return list(map('{:,.2f}'.format, series.to_numpy()))
+    return [f"{value:,.2f}" if isinstance(value, (int, float)) else str(value) for value in series.to_numpy()]
+
+def format_table_rows(data_df, text_columns=()):
+    """
+    Format a DataFrame column by column into rows of cell text; text_columns are never number-formatted
+    """
+    columns = [_column_text(data_df.iloc[:, i], column not in text_columns)
+               for i, column in enumerate(data_df.columns)]
+    return [list(row) for row in zip(*columns)]
+
+def paginate(rows, rows_per_page):
+    """
+    Split rows into pages of at most rows_per_page (one empty page when there are no rows)
+    """
+    return [rows[start:start + rows_per_page] for start in range(0, len(rows), rows_per_page)] or [[]]
+
+def write_table(table, header, rows):
+    """
+    Bulk-fill a freshly added pptx table with a header row and data rows
+
+    Writes one text run per cell straight into the table XML instead of going through the
+    cell/text-frame proxies, which clear and rebuild every cell.
+    """
+    for tr, values in zip(table._tbl.tr_lst, [header, *rows]):
+        for tc, value in zip(tr.tc_lst, values):
+            tc.get_or_add_txBody().p_lst[0].add_r().text = value
+
+def powerpoint_build_key(file_hash):
+    """
+    Memoization key of the PowerPoint deck built from one report
+    """
+    return 'pptx', file_hash, PARSER_VERSION, CHART_STYLE_VERSION
+
+def _ignore_progress(fraction, message):
+    pass
+
+@staged('exports.powerpoint')
+def create_comprehensive_powerpoint(data_df, well_count, stats, original_columns, charts, progress=None):
+    """
+    Create a comprehensive PowerPoint presentation with data, statistics, and visualizations
+
+    progress: optional callable(fraction, message) called as the slides are built
+    """
+    # python-pptx is loaded with the first deck rather than at app start
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    log = DiagnosticLog()
+    progress = progress or _ignore_progress
+    try:
+        # Create a new presentation
+        prs = Presentation()
+
+        progress(0.0, "Title and summary slides")
+        # Title slide
+        slide_layout = prs.slide_layouts[0]
+        slide = prs.slides.add_slide(slide_layout)
+        title = slide.shapes.title
+        subtitle = slide.placeholders[1]
+
+        title.text = "Production Analysis Report"
+        subtitle.text = f"Comprehensive Well Performance Analysis\nTotal Wells: {stats['Total All Wells']}\nGenerated on: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')}\nCreated by: Geol. Hassan Gamal Albery - Geologist @ Norpetco"
+
+        # Executive Summary Slide
+        slide_layout = prs.slide_layouts[1]
+        slide = prs.slides.add_slide(slide_layout)
+        title = slide.shapes.title
+        title.text = "Executive Summary"
+
+        # Add summary content
+        content_left = Inches(0.5)
+        content_top = Inches(1.5)
+        content_width = Inches(9.0)
+        content_height = Inches(5.0)
+
+        text_box = slide.shapes.add_textbox(content_left, content_top, content_width, content_height)
+        text_frame = text_box.text_frame
+        text_frame.word_wrap = True
+
+        # Add summary points
+        summary_points = [
+            f"• Total Wells Analyzed: {stats['Total All Wells']}",
+            f"• Wells with Non-Zero Net Diff BO: {stats['Total Wells with Non-Zero Net Diff BO']}",
+            f"• Positive Performance Wells: {stats['Positive Net Diff BO Wells']}",
+            f"• Wells Requiring Attention: {stats['Negative Net Diff BO Wells']}",
+            f"• Total Net BO Production: {stats['Total Net BO (All Wells)']:,.0f}",
+            f"• Average Net BO per Well: {stats['Average Net BO (All Wells)']:,.0f}",
+            f"• Highest Producing Well: {stats['Maximum Net BO']:,.0f}",
+            f"• Performance Range: {stats['Minimum Net BO']:,.0f} to {stats['Maximum Net BO']:,.0f}"
+        ]
+
+        # Add W/C statistics if available
+        if stats['Total W/C (All Wells)'] != 0:
+            summary_points.extend([
+                f"• Total W/C: {stats['Total W/C (All Wells)']:,.2f}%",
+                f"• Average W/C: {stats['Average W/C (All Wells)']:,.2f}%"
+            ])
+
+        for point in summary_points:
+            p = text_frame.add_paragraph()
+            p.text = point
+            p.space_after = Inches(0.05)
+
+        progress(0.15, "Data table slide")
+        # Main Data Table Slides - every well (and the TOTAL row), paginated for readability
+        header = [str(column) for column in data_df.columns]
+        table_rows = format_table_rows(data_df, text_columns=original_columns[:2])
+        pages = paginate(table_rows, TABLE_ROWS_PER_SLIDE)
+
+        for page_number, page_rows in enumerate(pages, 1):
+            slide_layout = prs.slide_layouts[1]
+            slide = prs.slides.add_slide(slide_layout)
+            title = slide.shapes.title
+            title.text = "Production Data - Key Wells"
+            if len(pages) > 1:
+                title.text += f" ({page_number}/{len(pages)})"
+
+            rows = len(page_rows) + 1
+            cols = len(header)
+            left = Inches(0.5)
+            top = Inches(1.5)
+            width = Inches(9.0)
+            height = Inches(0.8 * min(rows, 12))  # Limit height
+
+            table = slide.shapes.add_table(rows, cols, left, top, width, height).table
+            write_table(table, header, page_rows)
+
+        progress(0.35, "Key metrics slide")
+        # Key Metrics Slide
+        slide_layout = prs.slide_layouts[1]
+        slide = prs.slides.add_slide(slide_layout)
+        title = slide.shapes.title
+        title.text = "Key Performance Metrics"
+
+        # Create key metrics table
+        key_metrics = {
+            'Total Wells': stats['Total All Wells'],
+            'Wells with Significant Changes': stats['Total Wells with Non-Zero Net Diff BO'],
+            'Positive Performance Wells': stats['Positive Net Diff BO Wells'],
+            'Wells Requiring Attention': stats['Negative Net Diff BO Wells'],
+            'Total Net BO Production': stats['Total Net BO (All Wells)'],
+            'Total Net Diff BO': stats['Total Net Diff BO (All Wells)'],
+            'Average Net BO per Well': stats['Average Net BO (All Wells)'],
+            'Highest Producing Well': stats['Maximum Net BO'],
+            'Performance Standard Deviation': stats['Standard Deviation Net BO']
+        }
+
+        # Add W/C metrics if available
+        if stats['Total W/C (All Wells)'] != 0:
+            key_metrics.update({
+                'Total W/C': stats['Total W/C (All Wells)'],
+                'Average W/C': stats['Average W/C (All Wells)']
+            })
+
+        stats_rows = len(key_metrics) + 1
+        stats_cols = 2
+        left = Inches(1.0)
+        top = Inches(1.5)
+        width = Inches(8.0)
+        height = Inches(0.8 * min(stats_rows, 15))
+
+        stats_table = slide.shapes.add_table(stats_rows, stats_cols, left, top, width, height).table
+        stats_table.cell(0, 0).text = "Metric"
+        stats_table.cell(0, 1).text = "Value"
+
+        for idx, (metric, value) in enumerate(key_metrics.items(), 1):
+            stats_table.cell(idx, 0).text = metric
+            if isinstance(value, (int, float)):
+                if value > 1000:
+                    stats_table.cell(idx, 1).text = f"{value:,.0f}"
+                else:
+                    stats_table.cell(idx, 1).text = f"{value:,.2f}"
+            else:
+                stats_table.cell(idx, 1).text = str(value)
+
+        progress(0.5, "Chart slides")
+        # Visualization Slides - one slide per chart, using the cached chart images
+        if charts:
+            for _, viz_title, image in charts.images(dpi=SLIDE_DPI):
+                slide_layout = prs.slide_layouts[1]
+                slide = prs.slides.add_slide(slide_layout)
+                title = slide.shapes.title
+                title.text = f"Analysis - {viz_title}"
+
+                # Add the visualization image
+                left = Inches(1.0)
+                top = Inches(1.5)
+                width = Inches(8.0)
+                slide.shapes.add_picture(io.BytesIO(image), left, top, width=width)
+
+        progress(0.85, "Recommendations slide")
+        # Recommendations Slide
+        slide_layout = prs.slide_layouts[1]
+        slide = prs.slides.add_slide(slide_layout)
+        title = slide.shapes.title
+        title.text = "Recommendations & Next Steps"
+
+        text_box = slide.shapes.add_textbox(content_left, content_top, content_width, content_height)
+        text_frame = text_box.text_frame
+        text_frame.word_wrap = True
+
+        recommendations = [
+            "🎯 Focus Areas:",
+            "• Analyze top performing wells for best practices replication",
+            "• Review wells with negative Net Diff BO for improvement opportunities",
+            "• Monitor wells with significant performance deviations",
+            "",
+            "📊 Operational Actions:",
+            "• Optimize production parameters for underperforming wells",
+            "• Implement preventive maintenance for critical wells",
+            "• Share best practices from top performers",
+            "",
+            "📈 Continuous Improvement:",
+            "• Regular monitoring of Net Diff BO trends",
+            "• Periodic review of well performance categories",
+            "• Update operational strategies based on performance data"
+        ]
+
+        for recommendation in recommendations:
+            p = text_frame.add_paragraph()
+            p.text = recommendation
+            p.space_after = Inches(0.03)
+
+        progress(0.9, "Saving presentation")
+        # Save to bytes buffer
+        ppt_buffer = io.BytesIO()
+        prs.save(ppt_buffer)
+        ppt_buffer.seek(0)
+
+        return StageResult(ppt_buffer, log)
+
+    except Exception as e:
+        log.exception(f"❌ Error creating PowerPoint: {str(e)}")
+        return StageResult(diagnostics=log)
+
+@staged('exports.excel')
+def create_excel_with_visualizations(data_df, stats, charts, field_stats=None):
+    """
+    Create an Excel file with data, statistics, per-field statistics and embedded visualizations
+    """
+    log = DiagnosticLog()
+    try:
+        # Create Excel writer
+        excel_buffer = io.BytesIO()
+
+        with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
+            # Write main data (include TOTAL row); pandas cannot write MultiIndex columns
+            # without an index, and the header row is rewritten below anyway
+            flat_data_df = data_df.set_axis([str(col) for col in data_df.columns], axis=1)
+            flat_data_df.to_excel(writer, sheet_name='Production Data', index=False)
+
+            # Write statistics
+            stats_df = pd.DataFrame(list(stats.items()), columns=['Metric', 'Value'])
+            stats_df.to_excel(writer, sheet_name='Statistics', index=False)
+
+            # Get workbook and worksheets
+            workbook = writer.book
+
+            # Format worksheets
+            header_format = workbook.add_format(EXCEL_HEADER_FORMAT)
+
+            # Format data sheet
+            data_sheet = writer.sheets['Production Data']
+            for col_num, value in enumerate(data_df.columns.values):
+                data_sheet.write(0, col_num, str(value), header_format)
+            data_sheet.set_column('A:Z', 15)
+
+            # Format statistics sheet
+            stats_sheet = writer.sheets['Statistics']
+            stats_sheet.write(0, 0, 'Metric', header_format)
+            stats_sheet.write(0, 1, 'Value', header_format)
+            stats_sheet.set_column('A:A', 35)
+            stats_sheet.set_column('B:B', 20)
+
+            # Per-field breakdown if available
+            if field_stats is not None and not field_stats.empty:
+                field_stats.to_excel(writer, sheet_name='Field Statistics')
+                field_sheet = writer.sheets['Field Statistics']
+                for col_num, value in enumerate([field_stats.index.name or 'Field'] + list(field_stats.columns)):
+                    field_sheet.write(0, col_num, str(value), header_format)
+                field_sheet.set_column(0, len(field_stats.columns), 18)
+
+            # Add visualizations if available, stacked one below the other
+            if charts:
+                viz_sheet = workbook.add_worksheet('Visualizations')
+                row = 0
+                for key, viz_title, image in charts.images(dpi=SCREEN_DPI):
+                    viz_sheet.write(row, 0, viz_title, header_format)
+                    viz_sheet.insert_image(row + 1, 0, f'{key}.png', {
+                        'image_data': io.BytesIO(image),
+                        'x_scale': EXCEL_IMAGE_SCALE,
+                        'y_scale': EXCEL_IMAGE_SCALE
+                    })
+                    # Leave room for the image (default rows are 20 px high) plus a spacer row
+                    row += 3 + math.ceil(_png_height(image) * EXCEL_IMAGE_SCALE / 20)
+
+        excel_buffer.seek(0)
+        return StageResult(excel_buffer, log)
+
+    except Exception as e:
+        log.error(f"❌ Error creating Excel file: {str(e)}")
+        return StageResult(diagnostics=log)
+
+# Native Excel chart per ChartSet key: chart type/subtype, axis titles and series styling
+# (mirrors the matplotlib charts, but the series reference cells so the charts stay live)
+NATIVE_CHART_STYLES = {
+    'net_diff_bo': {
+        'type': {'type': 'column'},
+        'axis_titles': ('Wells', 'Net Diff BO'),
+        'series': {
+            'fill': {'color': '#90EE90'},
+            'invert_if_negative': True,
+            'invert_if_negative_color': '#F08080',
+            'data_labels': {'value': True, 'num_format': '#,##0.0'}
+        }
+    },
+    'net_bo': {
+        'type': {'type': 'column'},
+        'axis_titles': ('Wells', 'Net BO'),
+        'series': {
+            'fill': {'color': '#87CEEB'},
+            'data_labels': {'value': True, 'num_format': '#,##0'}
+        }
+    },
+    'top_producers': {
+        'type': {'type': 'bar'},
+        'axis_titles': ('Net BO', 'Wells'),
+        'series': {
+            'fill': {'color': '#FFD700'},
+            'border': {'color': '#FF8C00'},
+            'data_labels': {'value': True, 'num_format': '#,##0'}
+        }
+    },
+}
+
+def _excel_values(frame):
+    """
+    Rows of a DataFrame as lists of Python values, with NaN/None turned into blank cells
+    """
+    values = frame.to_numpy(dtype=object)
+    values[pd.isna(values)] = None
+    return values.tolist()
+
+def _stream_frame(worksheet, frame, header, header_format, first_row=0, chunk_rows=EXCEL_STREAM_CHUNK_ROWS):
+    """
+    Write a header row and then the frame's rows in order, converting one chunk at a time
+    """
+    worksheet.write_row(first_row, 0, header, header_format)
+    row = first_row + 1
+    for start in range(0, len(frame), chunk_rows):
+        for values in _excel_values(frame.iloc[start:start + chunk_rows]):
+            worksheet.write_row(row, 0, values)
+            row += 1
+    return row
+
+def _write_chart_data(workbook, charts, header_format):
+    """
+    Write the ChartSet frames side by side on a 'Chart Data' sheet
+
+    Returns {key: (first data row, last data row, category column, value column)} for the chart ranges.
+    """
+    sheet = workbook.add_worksheet('Chart Data')
+    frames = [(key, charts.frames[key]) for key in charts.keys]
+    ranges = {}
+    header = []
+    for position, (key, frame) in enumerate(frames):
+        column = position * 3
+        ranges[key] = (1, len(frame), column, column + 1)
+        header += [f"{charts.title(key)} - Well", f"{charts.title(key)} - Value", None]
+        sheet.set_column(column, column + 1, 18)
+
+    # Constant-memory worksheets must be written row by row, so interleave the frames
+    sheet.write_row(0, 0, header, header_format)
+    frame_rows = [_excel_values(frame) for _, frame in frames]
+    for row in range(max((len(rows) for rows in frame_rows), default=0)):
+        values = []
+        for rows in frame_rows:
+            values += (rows[row] if row < len(rows) else [None, None]) + [None]
+        sheet.write_row(row + 1, 0, values)
+    return ranges
+
+def _add_native_charts(workbook, sheet, charts, ranges):
+    """
+    Insert one native Excel chart per ChartSet key, stacked on the given sheet
+    """
+    for position, key in enumerate(charts.keys):
+        style = NATIVE_CHART_STYLES[key]
+        first_row, last_row, category_col, value_col = ranges[key]
+        chart = workbook.add_chart(style['type'])
+        chart.add_series({
+            'name': charts.title(key),
+            'categories': ['Chart Data', first_row, category_col, last_row, category_col],
+            'values': ['Chart Data', first_row, value_col, last_row, value_col],
+            **style['series']
+        })
+        x_title, y_title = style['axis_titles']
+        chart.set_title({'name': charts.title(key)})
+        chart.set_x_axis({'name': x_title})
+        chart.set_y_axis({'name': y_title, 'major_gridlines': {'visible': True}})
+        chart.set_legend({'none': True})
+        chart.set_size({'width': 900, 'height': 420})
+        sheet.insert_chart(position * 22, 0, chart)
+
+@staged('exports.excel_streaming')
+def create_streaming_excel_report(data_df, stats, charts=None, field_stats=None, output=None):
+    """
+    Create the Excel report with constant-memory row streaming and native Excel charts
+
+    Rows are flushed to disk as they are written, so memory stays flat however many rows the
+    report has, and the charts reference the 'Chart Data' sheet instead of embedding rendered
+    images. output may be a file path; by default the workbook is returned in a BytesIO buffer.
+    """
+    import xlsxwriter
+
+    log = DiagnosticLog()
+    try:
+        excel_buffer = io.BytesIO() if output is None else output
+        workbook = xlsxwriter.Workbook(excel_buffer, {'constant_memory': True})
+        try:
+            header_format = workbook.add_format(EXCEL_HEADER_FORMAT)
+
+            # Main data (include TOTAL row)
+            data_sheet = workbook.add_worksheet('Production Data')
+            data_sheet.set_column('A:Z', 15)
+            _stream_frame(data_sheet, data_df, [str(col) for col in data_df.columns], header_format)
+
+            # Statistics
+            stats_sheet = workbook.add_worksheet('Statistics')
+            stats_sheet.set_column('A:A', 35)
+            stats_sheet.set_column('B:B', 20)
+            _stream_frame(stats_sheet, pd.DataFrame(list(stats.items()), columns=['Metric', 'Value']),
+                          ['Metric', 'Value'], header_format)
+
+            # Per-field breakdown if available
+            if field_stats is not None and not field_stats.empty:
+                field_sheet = workbook.add_worksheet('Field Statistics')
+                field_sheet.set_column(0, len(field_stats.columns), 18)
+                _stream_frame(field_sheet, field_stats.reset_index(),
+                              [str(field_stats.index.name or 'Field')] + [str(col) for col in field_stats.columns],
+                              header_format)
+
+            # Native charts over the chart data ranges
+            if charts:
+                viz_sheet = workbook.add_worksheet('Visualizations')
+                ranges = _write_chart_data(workbook, charts, header_format)
+                _add_native_charts(workbook, viz_sheet, charts, ranges)
+        finally:
+            workbook.close()
+
+        if output is None:
+            excel_buffer.seek(0)
+        return StageResult(excel_buffer, log)
+
+    except Exception as e:
+        log.error(f"❌ Error creating Excel file: {str(e)}")
+        return StageResult(diagnostics=log)
@@ -0,0 +1,270 @@
+"""
+Local history store of extracted well rows, keyed by report date, field and well (and the
+entry number of wells listed more than once in a report)
+
+Backed by SQLite (standard library) with indexes for per-well and per-field date range queries.
+Every report is identified by its content hash, so re-ingesting a known file is a no-op.
+"""
+from contextlib import contextmanager
+import datetime
+import os
+import sqlite3
+
+import pandas as pd
+
+from .production import FIELD_NAMES, PARSER_VERSION
+
+DEFAULT_HISTORY_PATH = os.environ.get('PRODUCTION_HISTORY_DB', 'production_history.sqlite')
+
+# Columns of the flat per-well frame stored for every report
+HISTORY_COLUMNS = ['Field', 'Well Name', 'Net BO', 'Net Diff BO', 'W/C']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    content_hash TEXT PRIMARY KEY,
+    report_date TEXT NOT NULL,
+    source_file TEXT,
+    parser_version TEXT,
+    well_count INTEGER,
+    ingested_at TEXT
+);
+CREATE TABLE IF NOT EXISTS well_rows (
+    report_date TEXT NOT NULL,
+    field TEXT NOT NULL,
+    well TEXT NOT NULL,
+    entry INTEGER NOT NULL,
+    net_bo REAL,
+    net_diff_bo REAL,
+    wc REAL,
+    content_hash TEXT NOT NULL,
+    PRIMARY KEY (report_date, field, well, entry)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_well_rows_well ON well_rows (well, report_date);
+CREATE INDEX IF NOT EXISTS idx_well_rows_field ON well_rows (field, report_date);
+"""
+
+# Stores created before wells listed twice in a report were kept apart (entry 0 is the first listing)
+_ADD_ENTRY = """
+CREATE TABLE well_rows_entries (
+    report_date TEXT NOT NULL,
+    field TEXT NOT NULL,
+    well TEXT NOT NULL,
+    entry INTEGER NOT NULL,
+    net_bo REAL,
+    net_diff_bo REAL,
+    wc REAL,
+    content_hash TEXT NOT NULL,
+    PRIMARY KEY (report_date, field, well, entry)
+) WITHOUT ROWID;
+INSERT INTO well_rows_entries
+    SELECT report_date, field, well, 0, net_bo, net_diff_bo, wc, content_hash FROM well_rows;
+DROP TABLE well_rows;
+ALTER TABLE well_rows_entries RENAME TO well_rows;
+"""
+
+_VALUE_COLUMNS = {'Net BO': 'net_bo', 'Net Diff BO': 'net_diff_bo', 'W/C': 'wc'}
+
+def history_rows(result):
+    """
+    Flat frame of every well before the TOTAL row (zeros included) from an ExtractionResult
+
+    Field is forward filled for merged field cells, as in the per-field breakdown.
+    """
+    field_col, well_name_col, net_bo_col, net_diff_bo_col = result.original_columns[:4]
+    wc_col = result.original_columns[4] if len(result.original_columns) > 4 else None
+    data = result.df_before_total
+
+    wells = data[well_name_col]
+    mask = wells.notna() & (wells != '') & ~wells.isin(FIELD_NAMES)
+    fields = data[field_col].ffill()[mask]
+    data = data[mask]
+
+    return pd.DataFrame({
+        'Field': fields.fillna('').astype(str).to_numpy(),
+        'Well Name': data[well_name_col].astype(str).to_numpy(),
+        'Net BO': data[net_bo_col].to_numpy(),
+        'Net Diff BO': data[net_diff_bo_col].to_numpy(),
+        'W/C': data[wc_col].to_numpy() if wc_col is not None else None
+    }, columns=HISTORY_COLUMNS)
+
+def duplicate_wells(rows):
+    """
+    'Field / Well Name' of every well listed more than once in a flat per-well frame
+    """
+    repeated = rows.loc[rows.duplicated(['Field', 'Well Name']), ['Field', 'Well Name']].drop_duplicates()
+    return [f"{field} / {well}" for field, well in repeated.itertuples(index=False, name=None)]
+
+def _as_date_text(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value.isoformat() if isinstance(value, datetime.date) else str(value)
+
+def _optional_float(value):
+    return None if pd.isna(value) else float(value)
+
+class HistoryStore:
+    """
+    SQLite-backed history of extracted well rows
+    """
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        with self._connect() as conn:
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(well_rows)')]
+            if columns and 'entry' not in columns:
+                conn.executescript(_ADD_ENTRY)
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """
+        Connection for one operation: committed on success, rolled back on error, always closed
+        """
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def has_report(self, content_hash):
+        """
+        Whether the report is stored with rows from the current parser version
+        """
+        with self._connect() as conn:
+            row = conn.execute('SELECT 1 FROM reports WHERE content_hash = ? AND parser_version = ?',
+                               (content_hash, PARSER_VERSION)).fetchone()
+        return row is not None
+
+    def ingest(self, content_hash, report_date, rows, source_file=None):
+        """
+        Store the well rows of one report; returns the number of rows written (0 when already ingested)
+
+        A well listed more than once keeps every row, numbered by its entry column (see
+        duplicate_wells()). Rows for the same (date, field, well) from a newer file replace all the
+        older rows of that well. A report stored by an older parser version is stored again,
+        replacing its rows.
+        """
+        if report_date is None:
+            raise ValueError("A report date is required to store the report in the history")
+
+        date_text = _as_date_text(report_date)
+        rows = rows[HISTORY_COLUMNS]
+        entries = rows.groupby(['Field', 'Well Name'], sort=False).cumcount()
+        records = [
+            (
+                date_text,
+                field,
+                well,
+                entry,
+                _optional_float(net_bo),
+                _optional_float(net_diff_bo),
+                _optional_float(wc),
+                content_hash
+            )
+            for (field, well, net_bo, net_diff_bo, wc), entry in zip(rows.itertuples(index=False, name=None),
+                                                                     entries.tolist())
+        ]
+
+        with self._connect() as conn:
+            stored = conn.execute('SELECT parser_version FROM reports WHERE content_hash = ?',
+                                  (content_hash,)).fetchone()
+            if stored is not None:
+                if stored[0] == PARSER_VERSION:
+                    return 0
+                conn.execute('DELETE FROM well_rows WHERE content_hash = ?', (content_hash,))
+            conn.executemany('DELETE FROM well_rows WHERE report_date = ? AND field = ? AND well = ?',
+                             {record[:3] for record in records})
+            conn.execute(
+                'INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?)',
+                (content_hash, date_text, source_file, PARSER_VERSION, len(records),
+                 datetime.datetime.now().isoformat(timespec='seconds'))
+            )
+            conn.executemany('INSERT INTO well_rows VALUES (?, ?, ?, ?, ?, ?, ?, ?)', records)
+        return len(records)
+
+    def ingest_result(self, result, report_date=None):
+        """
+        Store an ExtractionResult; report_date overrides the date detected from the report
+        """
+        return self.ingest(
+            result.content_hash,
+            report_date or result.report_date,
+            history_rows(result),
+            source_file=result.source_file
+        )
+
+    def _query(self, sql, params):
+        with self._connect() as conn:
+            frame = pd.read_sql_query(sql, conn, params=params)
+        if 'report_date' in frame.columns:
+            frame['report_date'] = pd.to_datetime(frame['report_date'])
+        return frame
+
+    @staticmethod
+    def _date_range(start, end):
+        return _as_date_text(start) or '0000-01-01', _as_date_text(end) or '9999-12-31'
+
+    @staticmethod
+    def _value_columns(columns):
+        columns = columns or list(_VALUE_COLUMNS)
+        return ', '.join(f'{_VALUE_COLUMNS[column]} AS "{column}"' for column in columns)
+
+    def well_history(self, well, start=None, end=None, columns=None):
+        """
+        Daily values of one well between two dates (inclusive)
+        """
+        return self._query(
+            f'SELECT report_date, field AS "Field", {self._value_columns(columns)} FROM well_rows '
+            'WHERE well = ? AND report_date BETWEEN ? AND ? ORDER BY report_date',
+            (well, *self._date_range(start, end))
+        )
+
+    def field_history(self, field, start=None, end=None, columns=None):
+        """
+        Daily values of every well of one field between two dates (inclusive)
+        """
+        return self._query(
+            f'SELECT report_date, well AS "Well Name", {self._value_columns(columns)} FROM well_rows '
+            'WHERE field = ? AND report_date BETWEEN ? AND ? ORDER BY report_date, well',
+            (field, *self._date_range(start, end))
+        )
+
+    def field_daily_totals(self, start=None, end=None):
+        """
+        Net BO and Net Diff BO totals per field and report date
+        """
+        return self._query(
+            'SELECT report_date, field AS "Field", COUNT(*) AS "Wells", '
+            'SUM(net_bo) AS "Net BO", SUM(net_diff_bo) AS "Net Diff BO" FROM well_rows '
+            'WHERE report_date BETWEEN ? AND ? GROUP BY report_date, field ORDER BY report_date, field',
+            self._date_range(start, end)
+        )
+
+    def reports(self):
+        """
+        Ingested reports, newest first
+        """
+        return self._query(
+            'SELECT report_date, source_file AS "Source File", well_count AS "Wells", '
+            'ingested_at AS "Ingested At", content_hash AS "Content Hash" FROM reports '
+            'ORDER BY report_date DESC, ingested_at DESC',
+            ()
+        )
+
+    def wells(self, field=None):
+        """
+        Distinct well names, optionally for one field
+        """
+        if field is None:
+            sql, params = 'SELECT DISTINCT well FROM well_rows ORDER BY well', ()
+        else:
+            sql, params = 'SELECT DISTINCT well FROM well_rows WHERE field = ? ORDER BY well', (field,)
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(sql, params)]
+
+    def fields(self):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute('SELECT DISTINCT field FROM well_rows ORDER BY field')]
@@ -0,0 +1,122 @@
+"""
+Background builds of report exports, memoized per data hash
+
+Builds run in a small thread pool so the dashboard renders as soon as the statistics are
+ready; the UI polls the returned BuildJob for progress and picks up the result when done.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import threading
+
+from .results import DiagnosticLog, StageResult
+
+BUILD_WORKERS = 2
+# Finished builds kept for reuse (a PowerPoint deck is a few hundred KB)
+BUILD_CACHE_MAX_ENTRIES = 16
+
+class BuildJob:
+    """
+    One background build: its latest progress and, once finished, its StageResult
+    """
+    def __init__(self, key):
+        self.key = key
+        self.fraction = 0.0
+        self.message = "Queued"
+        self.future = None
+
+    def report(self, fraction, message):
+        """
+        Progress callback handed to the build function
+        """
+        self.fraction = min(max(float(fraction), 0.0), 1.0)
+        self.message = message
+
+    @property
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    @property
+    def result(self):
+        """
+        StageResult of the build, or None while it is still running
+        """
+        if not self.done:
+            return None
+        return self.future.result()
+
+    @property
+    def ok(self):
+        return self.done and self.result.ok
+
+class BackgroundBuilder:
+    """
+    Runs build functions in worker threads; a key that is already queued, running or built is not rebuilt
+    """
+    def __init__(self, max_workers=BUILD_WORKERS, max_entries=BUILD_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-build')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Job for a key, or None when the key was never submitted (or was evicted)
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def submit(self, key, build, *args, **kwargs):
+        """
+        Start build(*args, progress=job.report, **kwargs) unless the key already has a live or successful job
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not (job.done and not job.result.ok):
+                self._jobs.move_to_end(key)
+                return job
+
+            job = BuildJob(key)
+            self._jobs[key] = job
+            # Run in the submitter's context, so an active stage profiler also times the build
+            context = contextvars.copy_context()
+            job.future = self._executor.submit(context.run, self._run, job, build, args, kwargs)
+            self._evict()
+            return job
+
+    @staticmethod
+    def _run(job, build, args, kwargs):
+        try:
+            result = build(*args, progress=job.report, **kwargs)
+        except Exception as e:
+            log = DiagnosticLog()
+            log.exception(f"❌ Background build failed: {str(e)}")
+            result = StageResult(diagnostics=log)
+        job.report(1.0, "Done" if result.ok else "Failed")
+        return result
+
+    def _evict(self):
+        """
+        Drop the least recently used finished jobs beyond the entry limit (running jobs are kept)
+        """
+        finished = [key for key, job in self._jobs.items() if job.done]
+        for key in finished[:max(len(self._jobs) - self.max_entries, 0)]:
+            del self._jobs[key]
+
+    def clear(self):
+        """
+        Forget finished builds; running builds finish but are no longer tracked
+        """
+        with self._lock:
+            self._jobs.clear()
+
+_builder = BackgroundBuilder()
+
+def get_background_builder():
+    """
+    Process-wide background builder shared by all sessions
+    """
+    return _builder
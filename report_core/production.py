@@ -0,0 +1,361 @@
+"""
+Headless extraction of wells with non-zero Net Diff BO from production 'Report' workbooks
+"""
+from dataclasses import dataclass, field, replace
+import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cache import LRUCache
+from .reader import (
+    find_total_row,
+    infer_report_date,
+    is_zip_workbook,
+    open_report_worksheet,
+    read_report_date,
+    read_report_header,
+    read_report_sheet_legacy,
+    stream_report_rows,
+)
+from .profiling import stage
+from .results import Diagnostic, DiagnosticLog
+from .schema import COLUMN_ROLE_LABELS, get_schema_registry
+from .stats import field_breakdown, metric_matrix, production_stats
+from .uploads import BufferReader, content_hash, source_name, upload_buffer
+
+# Bump whenever the extraction logic changes so stale cached results are never served
+PARSER_VERSION = "7"
+
+# Field names that appear as section headings in the well name column
+FIELD_NAMES = ['Ferdaus', 'Sidra', 'Ganna', 'Rayan', 'Abrar', 'Abrar-South', 'Rawda']
+
+# Result cache limits (entries and approximate DataFrame memory)
+RESULT_CACHE_MAX_ENTRIES = 32
+RESULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+@dataclass
+class ExtractionResult:
+    """
+    Everything extracted from one production report; final_df is None when extraction failed
+    """
+    final_df: Optional[pd.DataFrame] = None
+    well_count: Optional[int] = None
+    stats: Optional[Dict[str, Any]] = None
+    original_columns: Optional[List[tuple]] = None
+    df_before_total: Optional[pd.DataFrame] = None
+    columns_info: Optional[pd.DataFrame] = None
+    layout_name: Optional[str] = None
+    report_date: Optional[datetime.date] = None
+    field_stats: Optional[pd.DataFrame] = None
+    content_hash: Optional[str] = None
+    source_file: Optional[str] = None
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return self.final_df is not None
+
+    def as_tuple(self):
+        """
+        (final_df, well_count, stats, original_columns, df_before_total), the shape the UI has always used
+        """
+        return self.final_df, self.well_count, self.stats, self.original_columns, self.df_before_total
+
+    def copy(self):
+        """
+        Copy the mutable parts so callers cannot corrupt a cached result
+        """
+        if not self.ok:
+            return replace(self, diagnostics=list(self.diagnostics))
+        return replace(
+            self,
+            final_df=self.final_df.copy(),
+            stats=dict(self.stats),
+            original_columns=list(self.original_columns),
+            df_before_total=self.df_before_total.copy(),
+            field_stats=self.field_stats.copy() if self.field_stats is not None else None,
+            diagnostics=list(self.diagnostics)
+        )
+
+    def memory_size(self):
+        """
+        Approximate memory footprint in bytes
+        """
+        size = 0
+        for frame in (self.final_df, self.df_before_total, self.columns_info, self.field_stats):
+            if frame is not None:
+                size += int(frame.memory_usage(deep=True).sum())
+        return size
+
+class ExtractionResultCache(LRUCache):
+    """
+    LRU cache of extraction results keyed by file content hash and parser version
+    """
+    def __init__(self, max_entries=RESULT_CACHE_MAX_ENTRIES, max_bytes=RESULT_CACHE_MAX_BYTES):
+        super().__init__(max_entries, max_bytes)
+
+_extraction_cache = ExtractionResultCache()
+
+def get_extraction_cache():
+    """
+    Process-wide extraction cache
+    """
+    return _extraction_cache
+
+def extraction_cache_key(file_hash):
+    """
+    Build the cache key for a report: SHA-256 of the file content plus the parser version
+    """
+    return file_hash, PARSER_VERSION
+
+def extract_wells_with_net_diff_bo(file_content):
+    """
+    Extract wells with non-zero Net Diff BO, reusing a cached result when the same file was already analysed
+    """
+    file_name = source_name(file_content)
+    cache = get_extraction_cache()
+
+    # Hash and parse the upload in place, without copying it
+    with stage('production.extract') as details, upload_buffer(file_content) as file_buffer:
+        details['file_bytes'] = file_buffer.nbytes
+        with stage('production.hash'):
+            file_hash = content_hash(file_buffer)
+        key = extraction_cache_key(file_hash)
+        cached = cache.get(key)
+        details['cached'] = cached is not None
+        if cached is None:
+            result = _extract_wells_with_net_diff_bo_uncached(file_buffer)
+
+    if cached is not None:
+        result = cached.copy()
+        result.diagnostics.insert(0, Diagnostic('info', "⚡ This report was already analysed - using cached results"))
+    else:
+        result.content_hash = file_hash
+        if result.ok:
+            cache.put(key, result.copy(), result.memory_size())
+
+    # Per-upload details are applied after caching, the same content can arrive under different names
+    result.source_file = file_name
+    if result.report_date is None:
+        # Fall back to a date in the file name, e.g. 'Production 2024-05-01.xlsx'
+        result.report_date = infer_report_date(file_name)
+    return result
+
+def _extract_wells_with_net_diff_bo_uncached(file_buffer):
+    """
+    Extract wells that have Net Diff BO values (excluding zeros) from specific columns and stop at TOTAL row
+    """
+    log = DiagnosticLog()
+    workbook = None
+    reader = BufferReader(file_buffer)
+    try:
+        if is_zip_workbook(file_buffer):
+            # Phase 1: resolve the columns from the header rows only
+            with stage('production.read_header'):
+                workbook, worksheet = open_report_worksheet(reader)
+                columns = read_report_header(worksheet)
+                report_date = read_report_date(worksheet)
+            df = None
+        else:
+            # Legacy .xls workbooks cannot be streamed, read the whole sheet
+            with stage('production.read_excel') as details:
+                df = read_report_sheet_legacy(reader)
+                details['rows'] = len(df)
+            columns = list(df.columns)
+            report_date = None
+
+        # Describe all columns to help with debugging
+        columns_info = []
+        for i, col in enumerate(columns):
+            col_info = {
+                'Column Index': i,
+                'Level 0': str(col[0]) if pd.notna(col[0]) else '',
+                'Level 1': str(col[1]) if len(col) > 1 and pd.notna(col[1]) else '',
+                'Full Name': str(col)
+            }
+            columns_info.append(col_info)
+
+        columns_df = pd.DataFrame(columns_info)
+
+        # Resolve the columns we need from the known report layouts
+        with stage('production.detect_columns') as details:
+            layout_name, positions, from_cache = get_schema_registry().resolve(columns)
+            details['known_layout'] = from_cache
+        if from_cache:
+            log.info(f"⚡ Known report layout '{layout_name}' - column detection skipped")
+
+        for role, label in COLUMN_ROLE_LABELS.items():
+            if role in positions:
+                i = positions[role]
+                log.success(f"✅ Found {label} column: {columns[i]} (Index {i})")
+
+        field_col = columns[positions['field']] if 'field' in positions else None
+        well_name_col = columns[positions['well_name']] if 'well_name' in positions else None
+        net_bo_col = columns[positions['net_bo']] if 'net_bo' in positions else None
+        net_diff_bo_col = columns[positions['net_diff_bo']] if 'net_diff_bo' in positions else None
+        wc_col = columns[positions['wc']] if 'wc' in positions else None
+
+        # Validation
+        if field_col is None:
+            log.error("❌ Could not find 'Field' column")
+            return ExtractionResult(columns_info=columns_df, layout_name=layout_name, diagnostics=log)
+
+        if well_name_col is None:
+            log.error("❌ Could not find well name column")
+            return ExtractionResult(columns_info=columns_df, layout_name=layout_name, diagnostics=log)
+
+        if net_diff_bo_col is None:
+            log.error("❌ Could not find 'Net diff. BO' column")
+            return ExtractionResult(columns_info=columns_df, layout_name=layout_name, diagnostics=log)
+
+        if net_bo_col is None:
+            log.error("❌ Could not find 'Net BO' column")
+            return ExtractionResult(columns_info=columns_df, layout_name=layout_name, diagnostics=log)
+
+        if wc_col is None:
+            log.warning("⚠️ Could not find 'W/C' column, but continuing with analysis")
+
+        # Only the columns used by the analysis are kept
+        needed_roles = ['field', 'well_name', 'net_bo', 'net_diff_bo']
+        if wc_col:
+            needed_roles.append('wc')
+        needed_positions = [positions[role] for role in needed_roles]
+        needed_columns = [columns[i] for i in needed_positions]
+
+        with stage('production.read_rows') as details:
+            if df is None:
+                # Phase 2: stream just the needed columns and stop at the TOTAL row
+                rows, stop_index = stream_report_rows(worksheet, needed_positions, field_position=0)
+                df_before_total = pd.DataFrame(rows, columns=pd.MultiIndex.from_tuples(needed_columns))
+            else:
+                df = df.iloc[:, needed_positions]
+                stop_index = find_total_row(df[field_col])
+                df_before_total = df.iloc[:stop_index].copy() if stop_index is not None else df.copy()
+            details['rows'] = len(df_before_total)
+
+        # Convert numeric columns
+        df_before_total[net_diff_bo_col] = pd.to_numeric(df_before_total[net_diff_bo_col], errors='coerce')
+        df_before_total[net_bo_col] = pd.to_numeric(df_before_total[net_bo_col], errors='coerce')
+        if wc_col:
+            df_before_total[wc_col] = pd.to_numeric(df_before_total[wc_col], errors='coerce')
+
+        if stop_index is not None:
+            log.info(f"🛑 Found 'TOTAL' row at index {stop_index}, stopping extraction here")
+        else:
+            # If no TOTAL found, all rows were used
+            log.warning("⚠️ No 'TOTAL' row found, using all available data")
+
+        # Metric matrices (Net BO, Net Diff BO, W/C) for the vectorised statistics kernel
+        metric_columns = [net_bo_col, net_diff_bo_col, wc_col]
+        all_values = metric_matrix(df_before_total, metric_columns)
+        net_diff_all = all_values[:, 1]
+        all_wells_count = len(df_before_total)
+
+        # Filter rows that have Net diff. BO values AND are not zero (but include negative values)
+        non_zero_mask = ~np.isnan(net_diff_all) & (net_diff_all != 0)  # Exclude zeros but include negatives
+        if not non_zero_mask.any():
+            log.warning("⚠️ No wells found with non-zero Net Diff BO values before TOTAL row")
+            return ExtractionResult(columns_info=columns_df, layout_name=layout_name, diagnostics=log)
+
+        # Show how many wells were filtered out due to zero values
+        zero_wells_count = int((net_diff_all == 0).sum())
+        log.info(f"📊 Filtered out {zero_wells_count} wells with zero Net Diff BO values")
+
+        # Show distribution of positive vs negative values
+        positive_count = int((net_diff_all > 0).sum())
+        negative_count = int((net_diff_all < 0).sum())
+        log.info(f"📈 Value distribution: {positive_count} positive, {negative_count} negative Net Diff BO values")
+
+        # Select the columns we need in the correct order
+        result_columns = [field_col, well_name_col, net_bo_col, net_diff_bo_col]
+        if wc_col:
+            result_columns.append(wc_col)
+
+        # Clean up the data - remove rows where well name is empty or is a field name
+        well_names = df_before_total[well_name_col]
+        well_mask = well_names.notna().to_numpy() & (well_names != '').to_numpy() & ~well_names.isin(FIELD_NAMES).to_numpy()
+        result_mask = non_zero_mask & well_mask
+
+        # Create final result dataframe
+        result_df = df_before_total.loc[result_mask, result_columns].reset_index(drop=True)
+        well_count_non_zero = len(result_df)
+
+        # Statistics for both ALL wells and non-zero wells in one vectorised pass
+        with stage('production.stats'):
+            stats = production_stats(
+                all_values,
+                all_values[result_mask],
+                all_wells_count,
+                positive_count,
+                negative_count,
+                has_wc=wc_col is not None
+            )
+        total_net_bo_all = stats['Total Net BO (All Wells)']
+        total_net_diff_bo_all = stats['Total Net Diff BO (All Wells)']
+        total_wc_all = stats['Total W/C (All Wells)']
+
+        # Per-field breakdown of every well (Field is forward filled for merged field cells)
+        with stage('production.field_breakdown'):
+            field_stats = field_breakdown(
+                df_before_total[field_col].ffill().to_numpy()[well_mask],
+                all_values[well_mask],
+                has_wc=wc_col is not None
+            )
+
+        # Create the final dataframe with proper column structure
+        final_df = result_df.copy()
+
+        # Format numeric columns
+        for col in [net_bo_col, net_diff_bo_col]:
+            if col in final_df.columns and final_df[col].dtype in [np.float64, np.int64]:
+                final_df[col] = final_df[col].round(2)
+
+        if wc_col and wc_col in final_df.columns and final_df[wc_col].dtype in [np.float64, np.int64]:
+            final_df[wc_col] = final_df[wc_col].round(2)
+
+        # Add TOTAL (All Wells) row with net bo and net diff bo
+        total_row_all_data = {
+            field_col: 'TOTAL (All Wells)',
+            well_name_col: f'{all_wells_count} Total Wells',
+            net_bo_col: total_net_bo_all,
+            net_diff_bo_col: total_net_diff_bo_all
+        }
+
+        if wc_col:
+            total_row_all_data[wc_col] = total_wc_all
+
+        total_row_all = pd.DataFrame([total_row_all_data])
+
+        # Combine main data with total row
+        final_df = pd.concat([final_df, total_row_all], ignore_index=True)
+
+        log.success(f"✅ Successfully extracted {well_count_non_zero} wells with non-zero Net Diff BO values")
+
+        # Return the original columns including W/C if found
+        original_columns = [field_col, well_name_col, net_bo_col, net_diff_bo_col]
+        if wc_col:
+            original_columns.append(wc_col)
+
+        return ExtractionResult(
+            final_df=final_df,
+            well_count=well_count_non_zero,
+            stats=stats,
+            original_columns=original_columns,
+            df_before_total=df_before_total,
+            columns_info=columns_df,
+            layout_name=layout_name,
+            report_date=report_date,
+            field_stats=field_stats,
+            diagnostics=log
+        )
+
+    except Exception as e:
+        log.exception(f"❌ Error processing file: {str(e)}")
+        return ExtractionResult(diagnostics=log)
+
+    finally:
+        if workbook is not None:
+            workbook.close()
+        reader.close()
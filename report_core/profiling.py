@@ -0,0 +1,191 @@
+"""
+Stage timing and memory instrumentation for the report pipeline
+
+Pipeline functions mark their stages with `with stage('production.read_header'):`. Outside a
+profiling session a stage costs a context variable lookup; inside one it records the wall
+time, the CPU time of the running thread and the tracemalloc peak above the memory in use
+when the stage started.
+"""
+from contextlib import contextmanager
+import contextvars
+from dataclasses import asdict, dataclass, field
+import datetime
+import functools
+import itertools
+import json
+import os
+import platform
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, Optional
+import uuid
+
+import pandas as pd
+
+DEFAULT_PROFILE_LOG = os.environ.get('REPORT_PROFILE_LOG', 'stage_timings.jsonl')
+
+@dataclass
+class StageTiming:
+    """
+    Measurements of one run of a stage
+
+    peak_memory_bytes is None when memory was not traced. tracemalloc is process-wide, so stages
+    running at the same time in other threads are included in each other's peaks.
+    """
+    stage: str
+    sequence: int
+    wall_seconds: float
+    cpu_seconds: float
+    peak_memory_bytes: Optional[int]
+    depth: int
+    ok: bool
+    details: Dict[str, Any] = field(default_factory=dict)
+
+class _Frame:
+    def __init__(self, name, details):
+        self.name = name
+        self.details = details
+        self.start_memory = 0
+        self.peak_memory = 0
+
+class StageProfiler:
+    """
+    Collects the StageTiming of every stage run while it is active (see profiling())
+
+    With a log_path, each timing is also appended to that JSON lines file as soon as its stage
+    ends, tagged with the run id, a timestamp, the Python version and the given context (e.g.
+    the app or the parser version). Background builds that finish after the run are logged too.
+    """
+    def __init__(self, trace_memory=True, log_path=None, context=None):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.trace_memory = trace_memory
+        self.log_path = log_path
+        self.context = {'run_id': self.run_id, 'python': platform.python_version(), **(context or {})}
+        self.timings = []
+        self._started = itertools.count()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def stage(self, name, details=None):
+        stack = self._stack()
+        frame = _Frame(name, details if details is not None else {})
+        sequence = next(self._started)
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # reset_peak() discards the enclosing stage's peak, so hand it over first
+            if stack:
+                stack[-1].peak_memory = max(stack[-1].peak_memory, peak)
+            tracemalloc.reset_peak()
+            frame.start_memory = frame.peak_memory = current
+        stack.append(frame)
+
+        ok = False
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield frame.details
+            ok = True
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            stack.pop()
+            peak_bytes = None
+            if tracing and tracemalloc.is_tracing():
+                frame.peak_memory = max(frame.peak_memory, tracemalloc.get_traced_memory()[1])
+                peak_bytes = frame.peak_memory - frame.start_memory
+                if stack:
+                    stack[-1].peak_memory = max(stack[-1].peak_memory, frame.peak_memory)
+            self._record(StageTiming(name, sequence, wall, cpu, peak_bytes, len(stack), ok, frame.details))
+
+    def _record(self, timing):
+        with self._lock:
+            self.timings.append(timing)
+            if self.log_path is None:
+                return
+            record = {**self.context, 'recorded_at': datetime.datetime.now().isoformat(timespec='seconds'),
+                      **asdict(timing)}
+            try:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, default=str) + '\n')
+            except OSError:
+                pass
+
+    def frame(self):
+        """
+        Timings as a DataFrame in start order, nested stages indented under their parent
+        """
+        with self._lock:
+            # Stages are recorded when they end, and a parent ends after its children
+            timings = sorted(self.timings, key=lambda timing: timing.sequence)
+        rows = []
+        for timing in timings:
+            rows.append({
+                'Stage': '  ' * timing.depth + timing.stage,
+                'Wall (ms)': round(timing.wall_seconds * 1000, 1),
+                'CPU (ms)': round(timing.cpu_seconds * 1000, 1),
+                'Peak memory (MB)': (round(timing.peak_memory_bytes / 2**20, 2)
+                                     if timing.peak_memory_bytes is not None else None),
+                'OK': timing.ok,
+                'Details': ', '.join(f"{key}={value}" for key, value in timing.details.items()),
+            })
+        return pd.DataFrame(rows, columns=['Stage', 'Wall (ms)', 'CPU (ms)', 'Peak memory (MB)', 'OK', 'Details'])
+
+_active_profiler = contextvars.ContextVar('report_profiler', default=None)
+
+def current_profiler():
+    """
+    Profiler of the running profiling() session, or None
+    """
+    return _active_profiler.get()
+
+@contextmanager
+def profiling(profiler):
+    """
+    Record the stages run inside the block (and in background builds submitted from it) in profiler
+
+    Memory tracing is started for the block when the profiler traces memory and nothing else
+    is tracing already.
+    """
+    token = _active_profiler.set(profiler)
+    started_tracing = profiler.trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        yield profiler
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _active_profiler.reset(token)
+
+@contextmanager
+def stage(name, **details):
+    """
+    Time a pipeline stage when a profiler is active; yields a dict the stage can add details to
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield details
+        return
+    with profiler.stage(name, details) as stage_details:
+        yield stage_details
+
+def staged(name):
+    """
+    Decorator form of stage() for functions that are a stage as a whole
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,206 @@
+"""
+Two-phase streaming reader for the production 'Report' sheet
+"""
+import datetime
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+# Layout of the production 'Report' sheet: 6 title rows, then two header rows
+REPORT_SHEET_NAME = 'Report'
+REPORT_SKIP_ROWS = 6
+
+def _is_blank_cell(value):
+    """
+    Check whether a raw cell value is empty the way pandas treats it
+    """
+    return value is None or (isinstance(value, str) and value == '')
+
+def _dedup_columns(columns):
+    """
+    Suffix repeated column tuples with .1, .2, ... on their last level, like pandas does for duplicate headers
+    """
+    counts = {}
+    deduped = []
+    for column in columns:
+        count = counts.get(column, 0)
+        while count > 0:
+            counts[column] = count + 1
+            column = (*column[:-1], f"{column[-1]}.{count}")
+            count = counts.get(column, 0)
+        deduped.append(column)
+        counts[column] = count + 1
+    return deduped
+
+def build_report_columns(header_rows, width=None):
+    """
+    Build the MultiIndex column tuples pd.read_excel(header=[0, 1]) gives for the raw header rows of the 'Report' sheet
+
+    Follows pandas' rules: every row is padded to `width` (pandas uses the widest row of the
+    whole sheet; default: the widest header row), blank header cells are forward filled inside
+    their parent column, cells that stay blank become 'Unnamed: {i}_level_{level}', and
+    repeated tuples get a .1, .2, ... suffix on their last level.
+    """
+    width = max([width or 0] + [len(row) for row in header_rows])
+    control_row = [True] * width
+    levels = []
+
+    for level, raw_row in enumerate(header_rows):
+        row = list(raw_row) + [None] * (width - len(raw_row))
+
+        # Forward fill merged header cells, but only inside the same parent column (same as pandas)
+        last = row[0]
+        for i in range(1, width):
+            if not control_row[i]:
+                last = row[i]
+            if _is_blank_cell(row[i]):
+                row[i] = last
+            else:
+                control_row[i] = False
+                last = row[i]
+
+        levels.append([
+            f'Unnamed: {i}_level_{level}' if _is_blank_cell(value) else value
+            for i, value in enumerate(row)
+        ])
+
+    return _dedup_columns(list(zip(*levels)))
+
+def read_report_header(worksheet):
+    """
+    Phase 1 of the streaming reader: read only the title rows and the two header rows that follow them
+
+    Rows are padded to the widest title or header row. pandas pads to the widest row of the whole
+    sheet; columns that only data rows reach are left out here, they repeat the labels of the
+    last header column and never match a column role before it.
+    """
+    rows = list(worksheet.iter_rows(min_row=1, max_row=REPORT_SKIP_ROWS + 2, values_only=True))
+    header_rows = rows[REPORT_SKIP_ROWS:]
+    if len(header_rows) < 2:
+        raise ValueError("'Report' sheet does not contain the two expected header rows")
+    width = max(_trimmed_length(row) for row in rows)
+    return build_report_columns([row[:_trimmed_length(row)] for row in header_rows], width)
+
+def _trimmed_length(row):
+    """
+    Length of a row without its trailing blank cells (pandas trims them before padding)
+    """
+    length = len(row)
+    while length and _is_blank_cell(row[length - 1]):
+        length -= 1
+    return length
+
+# Date patterns found in report titles and file names, tried in order (day-first for D-M-Y)
+_DATE_PATTERNS = [
+    (re.compile(r'(?<!\d)(\d{4})[-_./](\d{1,2})[-_./](\d{1,2})(?!\d)'), ('year', 'month', 'day')),
+    (re.compile(r'(?<!\d)(\d{1,2})[-_./](\d{1,2})[-_./](\d{4})(?!\d)'), ('day', 'month', 'year')),
+    (re.compile(r'(?<!\d)(\d{4})(\d{2})(\d{2})(?!\d)'), ('year', 'month', 'day')),
+]
+
+def infer_report_date(value):
+    """
+    Report date from a cell value or file name, or None when it does not contain a valid date
+    """
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if not isinstance(value, str):
+        return None
+
+    for pattern, order in _DATE_PATTERNS:
+        for match in pattern.finditer(value):
+            parts = dict(zip(order, (int(group) for group in match.groups())))
+            try:
+                return datetime.date(parts['year'], parts['month'], parts['day'])
+            except ValueError:
+                continue
+    return None
+
+def read_report_date(worksheet):
+    """
+    First date found in the title rows above the header, or None
+    """
+    for row in worksheet.iter_rows(min_row=1, max_row=REPORT_SKIP_ROWS, values_only=True):
+        for value in row:
+            report_date = infer_report_date(value)
+            if report_date is not None:
+                return report_date
+    return None
+
+def stream_report_rows(worksheet, column_indices, field_position=0):
+    """
+    Phase 2 of the streaming reader: yield only the requested columns of each data row and stop at the TOTAL row
+
+    Returns the projected rows and the index of the TOTAL row (None if the sheet has no TOTAL row).
+    Blank rows inside the data are kept as rows of None, like pandas keeps them as NaN rows;
+    blank rows at the end of the sheet are dropped, as pandas trims them.
+    """
+    rows = []
+    blank_rows = 0
+    for raw_row in worksheet.iter_rows(min_row=REPORT_SKIP_ROWS + 3, values_only=True):
+        if all(_is_blank_cell(value) for value in raw_row):
+            # Only kept once a later row shows they are not trailing
+            blank_rows += 1
+            continue
+        rows.extend([None] * len(column_indices) for _ in range(blank_rows))
+        blank_rows = 0
+
+        row_length = len(raw_row)
+        row = [
+            None if i >= row_length or _is_blank_cell(raw_row[i]) else raw_row[i]
+            for i in column_indices
+        ]
+
+        field_value = row[field_position]
+        if field_value is not None and 'TOTAL' in str(field_value).upper():
+            return rows, len(rows)
+        rows.append(row)
+
+    return rows, None
+
+def is_zip_workbook(file_bytes):
+    """
+    .xlsx/.xlsm files are zip containers and can be streamed; legacy .xls files cannot
+    """
+    return bytes(file_bytes[:4]) == b'PK\x03\x04'
+
+def _as_file(source):
+    """
+    File object for raw bytes; file objects (e.g. a BufferReader over an upload) are used as they are
+    """
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+def open_report_worksheet(source):
+    """
+    Open the 'Report' sheet of workbook bytes or a binary file object in openpyxl read-only mode
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(_as_file(source), read_only=True, data_only=True, keep_links=False)
+    worksheet = workbook[REPORT_SHEET_NAME]
+    # Stale dimension records would otherwise truncate or pad rows incorrectly
+    worksheet.reset_dimensions()
+    return workbook, worksheet
+
+def read_report_sheet_legacy(source):
+    """
+    Read the whole 'Report' sheet with pandas (used for .xls workbooks, which cannot be streamed)
+    """
+    return pd.read_excel(
+        _as_file(source),
+        sheet_name=REPORT_SHEET_NAME,
+        skiprows=REPORT_SKIP_ROWS,
+        header=[0, 1]  # Two header rows
+    )
+
+def find_total_row(field_values):
+    """
+    Position of the first row whose Field value contains 'TOTAL', or None
+    """
+    matches = field_values.astype(str).str.upper().str.contains('TOTAL', regex=False) & field_values.notna()
+    if matches.any():
+        return int(np.argmax(matches.to_numpy()))
+    return None
@@ -0,0 +1,58 @@
+"""
+Structured results returned by the headless report pipeline
+
+Every stage returns its output together with the diagnostics it produced, so the
+Streamlit tabs, batch jobs and benchmarks can decide themselves how to surface them.
+"""
+from dataclasses import dataclass, field
+import traceback
+from typing import Any, List, Optional
+
+DIAGNOSTIC_LEVELS = ('info', 'success', 'warning', 'error')
+
+@dataclass
+class Diagnostic:
+    """
+    A single message produced while running a stage
+    """
+    level: str
+    message: str
+    detail: Optional[str] = None
+
+@dataclass
+class StageResult:
+    """
+    Output of one pipeline stage plus its diagnostics; value is None when the stage failed
+    """
+    value: Any = None
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return self.value is not None
+
+    @property
+    def errors(self):
+        return [d for d in self.diagnostics if d.level == 'error']
+
+class DiagnosticLog(list):
+    """
+    List of diagnostics with helpers for each level
+    """
+    def info(self, message):
+        self.append(Diagnostic('info', message))
+
+    def success(self, message):
+        self.append(Diagnostic('success', message))
+
+    def warning(self, message):
+        self.append(Diagnostic('warning', message))
+
+    def error(self, message, detail=None):
+        self.append(Diagnostic('error', message, detail))
+
+    def exception(self, message):
+        """
+        Record an error for the exception currently being handled, including its traceback
+        """
+        self.append(Diagnostic('error', message, traceback.format_exc()))
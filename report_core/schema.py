@@ -0,0 +1,143 @@
+"""
+Registry of known production 'Report' header layouts
+"""
+import hashlib
+import re
+import threading
+
+_UNNAMED_HEADER = re.compile(r'^Unnamed: \d+_level_\d+$')
+_WHITESPACE = re.compile(r'\s+')
+
+# Display labels of the column roles, in the order they are reported
+COLUMN_ROLE_LABELS = {
+    'net_diff_bo': 'Net Diff BO',
+    'net_bo': 'Net BO',
+    'field': 'Field',
+    'well_name': 'Well Name',
+    'wc': 'W/C'
+}
+
+def normalize_header_label(value):
+    """
+    Normalize one header label: lower case, collapsed whitespace, and pandas 'Unnamed: N_level_K' placeholders as ''
+    """
+    if value is None:
+        return ''
+    text = str(value)
+    if _UNNAMED_HEADER.match(text):
+        return ''
+    return _WHITESPACE.sub(' ', text).strip().lower()
+
+def header_signature(columns):
+    """
+    Stable signature of a report header, independent of the 'Unnamed' placeholder numbering
+    """
+    normalized = '\x1f'.join(
+        '\x1e'.join(normalize_header_label(label) for label in col) for col in columns
+    )
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+class ReportLayout:
+    """
+    A known 'Report' sheet layout: one (level 0, level 1) header pattern per column role
+
+    Patterns are regular expressions applied to normalized labels; a level 1 pattern of None matches anything.
+    """
+    def __init__(self, name, column_patterns, required_roles):
+        self.name = name
+        self.required_roles = tuple(required_roles)
+        self.matchers = {
+            role: (
+                re.compile(level0_pattern),
+                re.compile(level1_pattern) if level1_pattern is not None else None
+            )
+            for role, (level0_pattern, level1_pattern) in column_patterns.items()
+        }
+
+    def match(self, normalized_columns):
+        """
+        Map each role to the index of the first column whose labels match its patterns
+        """
+        positions = {}
+        for i, (level0, level1) in enumerate(normalized_columns):
+            for role, (level0_matcher, level1_matcher) in self.matchers.items():
+                if role in positions or not level0_matcher.fullmatch(level0):
+                    continue
+                if level1_matcher is None or level1_matcher.fullmatch(level1):
+                    positions[role] = i
+                    break
+        return positions
+
+    def is_complete(self, positions):
+        return all(role in positions for role in self.required_roles)
+
+DAILY_PRODUCTION_LAYOUT = ReportLayout(
+    name='daily-production',
+    column_patterns={
+        'field': (r'field', r''),
+        'well_name': (r'running wells', r''),
+        'net_bo': (r'total production', r'net ?bo'),
+        'net_diff_bo': (r'total production', r'net diff\.? ?bo'),
+        'wc': (r'w/c', r'%'),
+    },
+    required_roles=['field', 'well_name', 'net_bo', 'net_diff_bo']
+)
+
+class ReportSchemaRegistry:
+    """
+    Registry of known report layouts with a per-signature cache of resolved column positions
+    """
+    def __init__(self, layouts=()):
+        self._layouts = list(layouts)
+        self._resolved = {}
+        self._lock = threading.Lock()
+
+    @property
+    def layouts(self):
+        return list(self._layouts)
+
+    def register(self, layout):
+        """
+        Add a layout; it is tried before the ones registered earlier
+        """
+        with self._lock:
+            self._layouts.insert(0, layout)
+            # A new layout can change how previously seen headers resolve
+            self._resolved.clear()
+
+    def resolve(self, columns):
+        """
+        Resolve column positions for a header
+
+        Returns (layout name, {role: column index}, cached). The layout name is None when no
+        registered layout provides all of its required columns; the positions are then the best partial match.
+        """
+        signature = header_signature(columns)
+        cached = self._resolved.get(signature)
+        if cached is not None:
+            return cached[0], dict(cached[1]), True
+
+        normalized_columns = [
+            (normalize_header_label(col[0]), normalize_header_label(col[1]) if len(col) > 1 else '')
+            for col in columns
+        ]
+
+        best_positions = {}
+        for layout in self._layouts:
+            positions = layout.match(normalized_columns)
+            if layout.is_complete(positions):
+                with self._lock:
+                    self._resolved[signature] = (layout.name, positions)
+                return layout.name, dict(positions), False
+            if len(positions) > len(best_positions):
+                best_positions = positions
+
+        return None, best_positions, False
+
+_schema_registry = ReportSchemaRegistry([DAILY_PRODUCTION_LAYOUT])
+
+def get_schema_registry():
+    """
+    Process-wide report layout registry
+    """
+    return _schema_registry
@@ -0,0 +1,133 @@
+"""
+Vectorised statistics kernel for production metrics
+
+All reductions are computed on a (rows x metrics) float matrix at once, and the per-field
+breakdown uses a single grouped aggregation, so the cost stays flat as multi-day,
+multi-asset datasets grow.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Metric order of the value matrices
+METRICS = ('Net BO', 'Net Diff BO', 'W/C')
+
+def metric_matrix(frame, columns):
+    """
+    Stack metric columns of a DataFrame into a float matrix; a missing column (None) becomes NaN
+    """
+    matrix = np.full((len(frame), len(columns)), np.nan)
+    for i, col in enumerate(columns):
+        if col is not None:
+            matrix[:, i] = pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    return matrix
+
+def summarize(matrix):
+    """
+    Count, sum, mean, max, min, median and sample standard deviation of every column, ignoring NaN
+
+    Matches pandas semantics: sums of empty columns are 0, the other statistics are NaN,
+    and the standard deviation needs at least two values.
+    """
+    valid = ~np.isnan(matrix)
+    count = valid.sum(axis=0)
+    filled = np.where(valid, matrix, 0.0)
+    total = filled.sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean = total / count
+        deviations = np.where(valid, matrix - mean, 0.0)
+        std = np.sqrt((deviations ** 2).sum(axis=0) / (count - 1))
+        if len(matrix):
+            maximum = np.nanmax(matrix, axis=0)
+            minimum = np.nanmin(matrix, axis=0)
+            median = np.nanmedian(matrix, axis=0)
+        else:
+            maximum = minimum = median = np.full(matrix.shape[1], np.nan)
+
+    std = np.where(count > 1, std, np.nan)
+    return {
+        'count': count,
+        'sum': total,
+        'mean': mean,
+        'max': maximum,
+        'min': minimum,
+        'median': median,
+        'std': std
+    }
+
+def production_stats(all_values, non_zero_values, all_wells_count, positive_count, negative_count, has_wc=True):
+    """
+    Build the report statistics dict from the all-wells and non-zero-wells metric matrices
+
+    Both matrices have the METRICS columns. W/C statistics are reported as 0 when the report has no W/C column.
+    """
+    all_summary = summarize(all_values)
+    non_zero_summary = summarize(non_zero_values)
+
+    def value(summary, key, metric):
+        if metric == 'W/C' and not has_wc:
+            return 0
+        return summary[key][METRICS.index(metric)]
+
+    stats = {
+        # All Wells Statistics
+        'Total All Wells': all_wells_count,
+        'Total Net BO (All Wells)': value(all_summary, 'sum', 'Net BO'),
+        'Total Net Diff BO (All Wells)': value(all_summary, 'sum', 'Net Diff BO'),
+        'Total W/C (All Wells)': value(all_summary, 'sum', 'W/C'),
+        'Average Net BO (All Wells)': value(all_summary, 'mean', 'Net BO'),
+        'Average Net Diff BO (All Wells)': value(all_summary, 'mean', 'Net Diff BO'),
+        'Average W/C (All Wells)': value(all_summary, 'mean', 'W/C'),
+
+        # Non-Zero Wells Statistics
+        'Total Wells with Non-Zero Net Diff BO': len(non_zero_values),
+        'Positive Net Diff BO Wells': positive_count,
+        'Negative Net Diff BO Wells': negative_count,
+        'Total Net BO (Non-Zero Wells)': value(non_zero_summary, 'sum', 'Net BO'),
+        'Total Net Diff BO (Non-Zero Wells)': value(non_zero_summary, 'sum', 'Net Diff BO'),
+        'Total W/C (Non-Zero Wells)': value(non_zero_summary, 'sum', 'W/C'),
+        'Average Net BO (Non-Zero Wells)': value(non_zero_summary, 'mean', 'Net BO'),
+        'Average Net Diff BO (Non-Zero Wells)': value(non_zero_summary, 'mean', 'Net Diff BO'),
+        'Average W/C (Non-Zero Wells)': value(non_zero_summary, 'mean', 'W/C'),
+    }
+
+    # Keys are grouped per statistic (all Maximum values, then Minimum, ...) as in the exports
+    for key, label in [('max', 'Maximum'), ('min', 'Minimum'), ('median', 'Median'), ('std', 'Standard Deviation')]:
+        for metric in METRICS:
+            stats[f'{label} {metric}'] = value(non_zero_summary, key, metric)
+
+    return stats
+
+def field_breakdown(fields, values, has_wc=True):
+    """
+    Per-field statistics in one grouped pass
+
+    fields: Field name per row; values: matrix of the METRICS columns for the same rows.
+    Returns a DataFrame indexed by Field with well counts, the Net Diff BO distribution and
+    total/average/maximum/minimum/median/standard deviation of every metric.
+    """
+    metrics = list(METRICS if has_wc else METRICS[:2])
+    frame = pd.DataFrame(values[:, :len(metrics)], columns=metrics)
+    frame['Field'] = np.asarray(fields, dtype=object)
+    frame = frame[frame['Field'].notna()]
+
+    net_diff = frame['Net Diff BO']
+    frame['Non-Zero'] = net_diff.notna() & (net_diff != 0)
+    frame['Positive'] = net_diff > 0
+    frame['Negative'] = net_diff < 0
+
+    aggregations = {
+        'Wells': ('Field', 'size'),
+        'Wells with Non-Zero Net Diff BO': ('Non-Zero', 'sum'),
+        'Positive Net Diff BO Wells': ('Positive', 'sum'),
+        'Negative Net Diff BO Wells': ('Negative', 'sum'),
+    }
+    for metric in metrics:
+        for label, func in [('Total', 'sum'), ('Average', 'mean'), ('Maximum', 'max'),
+                            ('Minimum', 'min'), ('Median', 'median'), ('Standard Deviation', 'std')]:
+            aggregations[f'{label} {metric}'] = (metric, func)
+
+    return frame.groupby('Field', sort=True).agg(**aggregations)
@@ -0,0 +1,121 @@
+"""
+Synthetic production 'Report' and drilling report workbooks for benchmarks
+
+Workbooks are written with xlsxwriter in constant-memory mode from a seeded random generator
+and a fixed creation date, so the same arguments always give byte-identical files.
+"""
+import datetime
+import random
+
+import xlsxwriter
+
+from .production import FIELD_NAMES
+from .reader import REPORT_SHEET_NAME, REPORT_SKIP_ROWS
+
+SYNTHETIC_CREATED = datetime.datetime(2024, 1, 1)
+
+def field_names(count):
+    """
+    The report's real field names first, then numbered ones
+    """
+    names = list(FIELD_NAMES[:count])
+    names.extend(f"Field-{i}" for i in range(len(names) + 1, count + 1))
+    return names
+
+def _workbook(target):
+    workbook = xlsxwriter.Workbook(target, {'constant_memory': True, 'in_memory': False})
+    workbook.set_properties({'created': SYNTHETIC_CREATED})
+    return workbook
+
+def write_production_report(target, wells=100, fields=3, seed=0, report_date=datetime.date(2024, 5, 1),
+                            zero_fraction=0.3, extra_columns=0):
+    """
+    Write a daily production workbook in the layout of the real 'Report' sheet
+
+    6 title rows (the report date in the second), the two header rows (Field, RUNNING WELLS,
+    TOTAL PRODUCTION Gross / Net BO / Net diff. BO, W/C %, Remarks), a section row per field,
+    `wells` well rows spread over the fields, the TOTAL row and a few trailing notes.
+    zero_fraction of the wells get a Net diff. BO of exactly 0; extra_columns adds unrelated
+    columns before TOTAL PRODUCTION. target is a path or a binary file object.
+    """
+    rng = random.Random(seed)
+    workbook = _workbook(target)
+    sheet = workbook.add_worksheet(REPORT_SHEET_NAME)
+
+    titles = ["NORPETCO", f"Daily Production Report {report_date:%d/%m/%Y}", "Operations Department"]
+    for row, title in enumerate(titles):
+        sheet.write(row, 0, title)
+
+    extras = [f"Extra {i + 1}" for i in range(extra_columns)]
+    header0 = ['Field', 'RUNNING WELLS'] + extras + ['TOTAL PRODUCTION', None, None, 'W/C', 'Remarks']
+    header1 = [None, None] + ['' for _ in extras] + ['Gross', 'Net\nBO', 'Net diff. BO', '%', None]
+    row = REPORT_SKIP_ROWS
+    for header in (header0, header1):
+        sheet.write_row(row, 0, header)
+        row += 1
+
+    names = field_names(fields)
+    per_field = [wells // fields + (1 if i < wells % fields else 0) for i in range(fields)]
+    totals = [0.0, 0.0, 0.0]
+    wc_values = []
+    for field, count in zip(names, per_field):
+        sheet.write_row(row, 0, [field, field])
+        row += 1
+        for number in range(1, count + 1):
+            gross = round(rng.uniform(100, 3000), 1)
+            wc = round(rng.uniform(0, 95), 1)
+            net = round(gross * (1 - wc / 100), 1)
+            net_diff = 0.0 if rng.random() < zero_fraction else round(rng.gauss(0, 30), 1)
+            values = [field, f"{field.upper()}-{number}"] + [rng.randint(0, 9) for _ in extras]
+            values += [gross, net, net_diff, wc, rng.choice(['', '', 'ESP', 'GL', 'Shut-in test'])]
+            sheet.write_row(row, 0, values)
+            row += 1
+            totals[0] += gross
+            totals[1] += net
+            totals[2] += net_diff
+            wc_values.append(wc)
+
+    average_wc = sum(wc_values) / len(wc_values) if wc_values else 0
+    sheet.write_row(row, 0, ['TOTAL', None] + [None for _ in extras] + [round(value, 1) for value in totals]
+                    + [round(average_wc, 1)])
+    sheet.write(row + 2, 0, "Remarks: synthetic report")
+    sheet.write(row + 3, 0, "Prepared by: benchmark")
+    workbook.close()
+
+DRILLING_ACTIVITIES = [
+    "Drilled 8 1/2\" hole", "Circulated hole clean", "POOH to surface", "Ran 7\" liner",
+    "Cemented liner", "Performed wiper trip", "Logging run", "Waited on cement", "Tested BOP",
+]
+
+def write_drilling_report(target, well='ABRAR-84', rig='EDC-11', seed=0, report_date=datetime.date(2024, 5, 1),
+                          header_rows=10, activity_rows=200):
+    """
+    Write a rig contractor's daily drilling report: the WELL NAME / RIG NAME line and a block of
+    header fields, `activity_rows` rows of the time breakdown table, then the labelled
+    LAST 24 SUMMARY and NEXT 24 FORECAST cells
+    """
+    rng = random.Random(seed)
+    workbook = _workbook(target)
+    sheet = workbook.add_worksheet('DDR')
+
+    sheet.write_row(0, 0, ['DAILY DRILLING REPORT', None, None, 'Date:', f"{report_date:%d/%m/%Y}"])
+    sheet.write_row(1, 0, ['WELL NAME :-', well, None, 'RIG NAME:', rig])
+    row = 2
+    for number in range(header_rows):
+        sheet.write_row(row, 0, [f"Parameter {number + 1}", rng.randint(0, 10000), None, 'Unit', 'ft'])
+        row += 1
+
+    row += 1
+    sheet.write_row(row, 0, ['From', 'To', 'Hours', 'Code', 'Operation Details', 'Depth'])
+    row += 1
+    for number in range(activity_rows):
+        start = number % 24
+        sheet.write_row(row, 0, [f"{start:02d}:00", f"{(start + 1) % 24:02d}:00", 1.0, rng.randint(1, 20),
+                                 rng.choice(DRILLING_ACTIVITIES), rng.randint(5000, 12000)])
+        row += 1
+
+    summary = ', '.join(rng.sample(DRILLING_ACTIVITIES, 3))
+    forecast = ', '.join(rng.sample(DRILLING_ACTIVITIES, 2))
+    sheet.write_row(row + 1, 0, ['LAST 24 SUMMARY :', summary])
+    sheet.write_row(row + 2, 0, ['NEXT 24 FORECAST :-', forecast])
+    workbook.close()
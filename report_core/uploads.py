@@ -0,0 +1,134 @@
+"""
+Helpers for reading uploaded files, file-like objects and paths uniformly
+
+upload_buffer() gives a read-only view of an upload without copying it: a memoryview of
+in-memory uploads, or a memory map of files on disk (streams are spooled to a temporary file
+first). The view is hashed directly and parsed through a BufferReader.
+"""
+from contextlib import ExitStack, contextmanager
+import hashlib
+import io
+import mmap
+import os
+import shutil
+import tempfile
+
+# Chunk size used when spooling a non-seekable stream to disk
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+def source_name(file_content, default='uploaded file'):
+    """
+    Display name of an upload or path
+    """
+    if isinstance(file_content, (str, os.PathLike)):
+        return os.path.basename(os.fspath(file_content))
+    return getattr(file_content, 'name', None) or default
+
+def content_hash(file_bytes):
+    """
+    SHA-256 hex digest of a file's content (bytes or any buffer, e.g. a memoryview)
+    """
+    return hashlib.sha256(file_bytes).hexdigest()
+
+def _close_quietly(buffer):
+    try:
+        buffer.close()
+    except BufferError:
+        # A parser still holds a view; the map is released once that view is garbage collected
+        pass
+
+def _map_file(stack, file_obj):
+    """
+    Read-only memory map of an open file, closed (with the file) when the stack exits
+    """
+    stack.enter_context(file_obj)
+    if os.fstat(file_obj.fileno()).st_size == 0:
+        return memoryview(b'')
+    mapped = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+    stack.callback(_close_quietly, mapped)
+    return memoryview(mapped)
+
+@contextmanager
+def upload_buffer(file_content):
+    """
+    Read-only memoryview of an upload's bytes, valid inside the with block
+
+    bytes-like objects and BytesIO uploads (Streamlit's UploadedFile) are viewed in place, paths
+    are memory-mapped, and other streams are spooled to a temporary file that is memory-mapped.
+    """
+    with ExitStack() as stack:
+        if isinstance(file_content, (bytes, bytearray, memoryview)):
+            view = memoryview(file_content)
+        elif hasattr(file_content, 'getbuffer'):
+            view = file_content.getbuffer()
+        elif isinstance(file_content, (str, os.PathLike)):
+            view = _map_file(stack, open(file_content, 'rb'))
+        else:
+            spool = tempfile.TemporaryFile()
+            position = file_content.tell()
+            file_content.seek(0)
+            shutil.copyfileobj(file_content, spool, SPOOL_CHUNK_BYTES)
+            file_content.seek(position)
+            spool.flush()
+            view = _map_file(stack, spool)
+
+        try:
+            yield view
+        finally:
+            view.release()
+
+class BufferReader(io.RawIOBase):
+    """
+    Seekable read-only file object over a buffer; only the chunks that are read get copied
+
+    Pass it to parsers (openpyxl, pandas) in place of io.BytesIO(buffer), which copies the whole buffer.
+    Close it before the buffer is released.
+    """
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"invalid whence ({whence})")
+        if position < 0:
+            # Same as a real file, so parsers probing short inputs handle it
+            raise OSError(f"negative seek position {position}")
+        self._position = position
+        return position
+
+    def read(self, size=-1):
+        start = min(self._position, len(self._view))
+        end = len(self._view) if size is None or size < 0 else min(start + size, len(self._view))
+        self._position = end
+        return self._view[start:end].tobytes()
+
+    def readall(self):
+        return self.read()
+
+    def readinto(self, target):
+        start = min(self._position, len(self._view))
+        end = min(start + len(target), len(self._view))
+        target[:end - start] = self._view[start:end]
+        self._position = end
+        return end - start
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
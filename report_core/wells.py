@@ -0,0 +1,163 @@
+"""
+Canonical well IDs shared by production reports and drilling reports
+
+Production reports name wells in their RUNNING WELLS column ('ABRAR-84'), drilling reports in
+their WELL NAME cell ('Abrar 84', 'Abrar-84 ST'). canonical_well_id() reduces every spelling to
+one ID by rule, and an alias table maps the spellings the rules cannot (renamed wells, typos)
+onto an ID. The well index remembers the ID of every spelling it has resolved, so joining the
+two sources is a single hash join on the well ID.
+"""
+import csv
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .reader import infer_report_date
+
+DEFAULT_WELL_ALIASES_PATH = os.environ.get('WELL_ALIASES_PATH', 'well_aliases.csv')
+
+# Sidetracks keep the well's name: 'ABRAR-84 ST', 'ABRAR-84ST2', 'ABRAR-84 (S/T)'
+_SIDETRACK_SUFFIX = re.compile(r'(?<=\d)[\s\-_(]*(?:SIDETRACK|S/T|ST)[\s\-_]*\d*\)?\s*$')
+_NAME_TOKENS = re.compile(r'[A-Z]+|\d+')
+
+# Drilling report columns joined to production wells, with their display names
+DRILLING_ACTIVITY_COLUMNS = {
+    'well_name': 'Drilling Well Name',
+    'rig_name': 'Rig Name',
+    'last_24_summary': 'Last 24 Hours',
+    'next_24_forecast': 'Next 24 Hours',
+    'file_name': 'Drilling Report',
+}
+
+def canonical_well_id(name):
+    """
+    Well ID of a spelling: upper case field words, a dash, then the well number without leading
+    zeros and its letter suffix ('Abrar 084a' -> 'ABRAR-84A'); sidetrack suffixes are dropped
+    """
+    text = _SIDETRACK_SUFFIX.sub('', str(name).upper().strip())
+    tokens = _NAME_TOKENS.findall(text)
+    first_number = next((i for i, token in enumerate(tokens) if token.isdigit()), len(tokens))
+    words = ' '.join(tokens[:first_number])
+    number = ''.join(token.lstrip('0') or '0' if token.isdigit() else token for token in tokens[first_number:])
+    if not number:
+        return words
+    return f"{words}-{number}" if words else number
+
+class WellIndex:
+    """
+    Spelling -> well ID lookup built from the canonical rules and an alias table
+
+    Aliases are stored by the canonical form of both sides, so an alias covers all spellings
+    that reduce to it. Aliases added with add_alias() are appended to the aliases CSV file
+    (columns alias, well_id) when the index has one.
+    """
+    def __init__(self, aliases_path=None, aliases=None):
+        self.aliases_path = aliases_path
+        self._aliases = {}
+        self._ids = {}
+        self._lock = threading.Lock()
+        if aliases_path and os.path.exists(aliases_path):
+            with open(aliases_path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    self._set_alias(row['alias'], row['well_id'])
+        for alias, well_id in (aliases or {}).items():
+            self._set_alias(alias, well_id)
+
+    def _set_alias(self, alias, well_id):
+        self._aliases[canonical_well_id(alias)] = canonical_well_id(well_id)
+
+    def add_alias(self, alias, well_id):
+        """
+        Map the spellings of alias onto well_id from now on
+        """
+        with self._lock:
+            self._set_alias(alias, well_id)
+            # Spellings resolved before may now map elsewhere
+            self._ids = {}
+            if self.aliases_path:
+                is_new = not os.path.exists(self.aliases_path)
+                with open(self.aliases_path, 'a', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    if is_new:
+                        writer.writerow(['alias', 'well_id'])
+                    writer.writerow([alias, well_id])
+
+    def aliases(self):
+        """
+        Alias table as a DataFrame of canonical spellings and the well IDs they map to
+        """
+        with self._lock:
+            aliases = sorted(self._aliases.items())
+        return pd.DataFrame(aliases, columns=['Alias', 'Well ID'])
+
+    def _resolve(self, name):
+        # Callers hold the lock, so concurrent sessions never resolve a spelling against different aliases
+        well_id = self._ids.get(name)
+        if well_id is None:
+            canonical = canonical_well_id(name)
+            well_id = self._ids[name] = self._aliases.get(canonical, canonical)
+        return well_id
+
+    def well_id(self, name):
+        with self._lock:
+            return self._resolve(name)
+
+    def well_ids(self, names):
+        """
+        Well IDs of a Series of names; each distinct spelling is resolved once, missing names get ''
+        """
+        codes, uniques = pd.factorize(names)
+        with self._lock:
+            resolved = [self._resolve(name) for name in uniques]
+        # Code -1 (missing name) picks the trailing ''
+        ids = np.array(resolved + [''], dtype=object)
+        return pd.Series(ids[codes], index=names.index, dtype=object)
+
+    def __len__(self):
+        return len(self._ids)
+
+_well_index = WellIndex(DEFAULT_WELL_ALIASES_PATH)
+
+def get_well_index():
+    """
+    Process-wide well index with the aliases of DEFAULT_WELL_ALIASES_PATH
+    """
+    return _well_index
+
+def latest_drilling_activity(summaries, well_index=None):
+    """
+    The latest drilling report of every well (by the date in its file name, then upload order),
+    indexed by well ID, from drilling summary dicts
+    """
+    if well_index is None:
+        well_index = get_well_index()
+    frame = pd.DataFrame(summaries, columns=list(DRILLING_ACTIVITY_COLUMNS))
+    frame = frame[frame['well_name'].notna() & (frame['well_name'] != 'Not Found')]
+    dates = pd.to_datetime(pd.Series([infer_report_date(name) for name in frame['file_name']], dtype=object))
+    frame = frame.assign(_date=dates.to_numpy(), _order=np.arange(len(frame)))
+    frame = frame.sort_values(['_date', '_order'], na_position='first', kind='stable')
+    frame['Well ID'] = well_index.well_ids(frame['well_name'])
+    frame = frame.drop_duplicates('Well ID', keep='last')
+    return frame.set_index('Well ID')[list(DRILLING_ACTIVITY_COLUMNS)].rename(columns=DRILLING_ACTIVITY_COLUMNS)
+
+def join_drilling_activity(production_rows, summaries, well_index=None):
+    """
+    Production wells (flat frame with Field and Well Name, e.g. history_rows()) next to the latest
+    drilling report of the same well
+
+    An outer hash join on the well ID; Match is 'both', 'production only' or 'drilling only'
+    (wells being drilled that are not producing yet).
+    """
+    if well_index is None:
+        well_index = get_well_index()
+    production = production_rows.assign(**{'Well ID': well_index.well_ids(production_rows['Well Name'])})
+    activity = latest_drilling_activity(summaries, well_index)
+    # Production wells keep their report order, wells only in drilling reports follow
+    joined = production.merge(activity, how='left', left_on='Well ID', right_index=True)
+    joined['Match'] = np.where(production['Well ID'].isin(activity.index), 'both', 'production only')
+    drilling_only = activity[~activity.index.isin(production['Well ID'])].reset_index()
+    drilling_only['Match'] = 'drilling only'
+    return pd.concat([joined, drilling_only], ignore_index=True)
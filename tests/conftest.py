@@ -0,0 +1,10 @@
+import pytest
+
+@pytest.fixture(autouse=True)
+def isolated_caches(monkeypatch):
+    """
+    Fresh in-memory caches for every test, so results never come from an earlier test
+    """
+    from report_core import production
+
+    monkeypatch.setattr(production, '_extraction_cache', production.ExtractionResultCache())
@@ -0,0 +1,52 @@
+import gzip
+import io
+import types
+import zipfile
+
+from report_core.archives import ArchiveMember, expand_archives
+
+def zip_upload(name, members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        for member_name, data in members.items():
+            zf.writestr(member_name, data)
+    return ArchiveMember(name, buffer.getvalue())
+
+def test_duplicates_are_skipped_across_loose_uploads_and_archives():
+    files = [
+        ArchiveMember('a.xlsx', b'report a'),
+        zip_upload('batch.zip', {'a.xlsx': b'report a', 'b.xlsx': b'report b', 'c.xlsx': b'report b'}),
+        ArchiveMember('copy of b.xlsx', b'report b'),
+        ArchiveMember('d.xlsx', b'report d'),
+    ]
+    expanded = expand_archives(files)
+    names = [upload.name for upload in expanded.value]
+
+    assert names == ['a.xlsx', 'batch.zip/b.xlsx', 'd.xlsx']
+    messages = [diagnostic.message for diagnostic in expanded.diagnostics]
+    assert any('batch.zip: 1 report(s) found, 2 duplicate(s) skipped' in message for message in messages)
+    assert any('copy of b.xlsx' in message for message in messages)
+
+def test_members_are_read_lazily():
+    read = []
+    files = [zip_upload(f'{i}.zip', {'report.xlsx': f'report {i}'.encode()}) for i in range(3)]
+    expanded = expand_archives(files)
+
+    assert isinstance(expanded.value, types.GeneratorType)
+    for upload in expanded.value:
+        read.append(upload.name)
+        # The next archive is not opened before this member is consumed
+        assert len(read) == len(expanded.diagnostics) + 1
+    assert read == ['0.zip/report.xlsx', '1.zip/report.xlsx', '2.zip/report.xlsx']
+
+def test_gzipped_workbook_is_decompressed():
+    files = [ArchiveMember('report.xlsx.gz', gzip.compress(b'report a')), ArchiveMember('a.xlsx', b'report a')]
+    uploads = list(expand_archives(files).value)
+
+    assert [(upload.name, upload.getvalue()) for upload in uploads] == [('report.xlsx', b'report a')]
+
+def test_corrupt_gzip_is_reported():
+    expanded = expand_archives([ArchiveMember('report.xlsx.gz', b'not gzip')])
+
+    assert list(expanded.value) == []
+    assert 'Error reading archive report.xlsx.gz' in expanded.diagnostics[0].message
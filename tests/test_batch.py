@@ -0,0 +1,23 @@
+import os
+import time
+
+from report_core import batch
+
+def fake_report(path, output_dir, stem, formats, keep_history, native_charts):
+    if 'crash' in path:
+        os._exit(1)
+    # Still running when the crash breaks the pool
+    time.sleep(0.5)
+    return {'Source File': os.path.basename(path), 'Status': 'ok', 'Outputs': '', 'Error': ''}, None, None
+
+def test_crashed_worker_only_fails_its_own_file(monkeypatch, tmp_path):
+    # Workers are forked, so they run the patched report processing
+    monkeypatch.setattr(batch, 'process_report', fake_report)
+    paths = [f'{name}.xlsx' for name in ['a', 'b', 'crash', 'c', 'd', 'e']]
+    progress = []
+
+    summary = batch.run_batch(paths, str(tmp_path), workers=2, progress=lambda done, total, row: progress.append(done))
+
+    assert list(summary['Status']) == ['ok', 'ok', 'failed', 'ok', 'ok', 'ok']
+    assert 'BrokenProcessPool' in summary['Error'][2]
+    assert progress == [1, 2, 3, 4, 5, 6]
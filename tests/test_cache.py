@@ -0,0 +1,18 @@
+import os
+
+from report_core.cache import DiskCache
+
+def test_unserialisable_value_is_a_miss(tmp_path):
+    cache = DiskCache(str(tmp_path), max_entries=10)
+    cache.put('key', {'value': object()})
+
+    assert cache.get('key') is None
+    assert os.listdir(tmp_path) == []
+
+def test_failed_write_keeps_the_previous_entry(tmp_path):
+    cache = DiskCache(str(tmp_path), max_entries=10)
+    cache.put('key', {'value': 1})
+    cache.put('key', {'value': {1, 2}})
+
+    assert cache.get('key') == {'value': 1}
+    assert os.listdir(tmp_path) == ['key.json']
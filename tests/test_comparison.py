@@ -0,0 +1,74 @@
+import datetime
+
+import numpy as np
+
+from report_core.comparison import compare_reports, compare_rows
+from report_core.history import history_rows
+from report_core.production import extract_wells_with_net_diff_bo
+from report_core.wells import WellIndex
+
+from workbooks import MERGED_FIELD_CELLS, MERGED_FIELD_ROWS, PRODUCTION_HEADER, write_report
+
+# The next day: ABRAR-2 spelled differently, ABRAR-1 dropped, ABRAR-9 new, Sidra's X-1 changed
+NEXT_DAY_ROWS = [
+    ['Abrar', 'Abrar'],
+    ['Abrar', 'Abrar 2', 100, 75, 0, 25],
+    [None, 'X-1', 100, 60, -4, 40],
+    [None, 'ABRAR-9', 100, 10, 10, 90],
+    ['Sidra', 'Sidra'],
+    ['Sidra', 'SIDRA-1', 100, 50, 2, 50],
+    [None, 'X-1', 100, 45, 1, 55],
+    ['TOTAL', None, 500, 240, 9, 52],
+]
+
+def extract_day(rows, merged_field_cells, day):
+    title = f"Daily Production Report {day:%d/%m/%Y}"
+    result = extract_wells_with_net_diff_bo(write_report(PRODUCTION_HEADER, rows, merged_field_cells, title))
+    assert result.ok and result.report_date == day
+    return result
+
+def two_day_comparison():
+    first = extract_day(MERGED_FIELD_ROWS, MERGED_FIELD_CELLS, datetime.date(2024, 5, 1))
+    second = extract_day(NEXT_DAY_ROWS, [(1, 3), (5, 6)], datetime.date(2024, 5, 2))
+    # Upload order does not matter, reports are compared in date order
+    result = compare_reports([second, first])
+    assert result.ok
+    return result.value
+
+def test_wells_under_merged_field_cells_keep_their_field():
+    comparison = two_day_comparison()
+    assert comparison.labels == ['2024-05-01', '2024-05-02']
+    assert '' not in set(comparison.fields)
+    deltas = comparison.well_deltas().set_index(['Field', 'Well Name'])
+    assert deltas['Status'].to_dict() == {
+        ('Abrar', 'ABRAR-1'): 'dropped',
+        ('Abrar', 'Abrar 2'): 'both',
+        ('Abrar', 'X-1'): 'both',
+        ('Abrar', 'ABRAR-9'): 'new',
+        ('Sidra', 'SIDRA-1'): 'both',
+        ('Sidra', 'X-1'): 'both',
+    }
+
+def test_wells_are_keyed_by_field_and_canonical_well_id():
+    deltas = two_day_comparison().well_deltas().set_index(['Field', 'Well Name'])
+    # Same spelling in two fields: two wells; two spellings of one well: one well
+    assert deltas.loc[('Abrar', 'X-1'), 'Δ Net BO'] == 0
+    assert deltas.loc[('Sidra', 'X-1'), 'Δ Net BO'] == 5
+    assert deltas.loc[('Abrar', 'Abrar 2'), 'Δ Net BO'] == 5
+
+def test_field_rollup():
+    rollup = two_day_comparison().field_rollup().set_index('Field')
+    assert list(rollup.index) == ['Abrar', 'Sidra']
+    assert rollup.loc['Abrar', ['Wells', 'New Wells', 'Dropped Wells']].tolist() == [3, 1, 1]
+    assert rollup.loc['Abrar', 'Δ Net BO'] == (75 + 60 + 10) - (80 + 70 + 60)
+    assert rollup.loc['Sidra', 'Δ Net BO'] == 5
+    assert np.isclose(rollup.loc['Sidra', 'Δ Average W/C'], -2.5)
+
+def test_aliases_join_renamed_wells():
+    first = extract_day(MERGED_FIELD_ROWS, MERGED_FIELD_CELLS, datetime.date(2024, 5, 1))
+    second = extract_day(NEXT_DAY_ROWS, [(1, 3), (5, 6)], datetime.date(2024, 5, 2))
+    comparison = compare_rows(['1', '2'], [history_rows(first), history_rows(second)],
+                              WellIndex(aliases={'ABRAR-9': 'ABRAR-1'}))
+    # ABRAR-9 is the renamed ABRAR-1, so no well is new or dropped
+    statuses = comparison.well_deltas()['Status'].value_counts().to_dict()
+    assert statuses == {'both': 5}
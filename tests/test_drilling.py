@@ -0,0 +1,40 @@
+import os
+import time
+
+from report_core import drilling
+
+def slow_summary(file_name, file_content):
+    if file_name.startswith('stuck'):
+        time.sleep(60)
+    if file_name.startswith('crash'):
+        os._exit(1)
+    if file_name.startswith('slow'):
+        time.sleep(1.5)
+    return drilling.StageResult({'file_name': file_name})
+
+def extract(monkeypatch, names, workers=2, timeout=1):
+    # Workers get the extraction function by reference, so they run the patched one
+    monkeypatch.setattr(drilling, '_extract_operation_summary', slow_summary)
+    jobs = [(name, None, memoryview(name.encode())) for name in names]
+    return drilling._extract_in_pool(jobs, workers=workers, timeout=timeout)
+
+def test_stuck_files_do_not_starve_the_others(monkeypatch):
+    started = time.monotonic()
+    results = extract(monkeypatch, ['stuck-1', 'stuck-2', 'ok-1', 'ok-2'])
+
+    assert [result.ok for result in results] == [False, False, True, True]
+    assert 'timed out' in results[0].errors[0].message
+    assert [result.value['file_name'] for result in results[2:]] == ['ok-1', 'ok-2']
+    assert time.monotonic() - started < 30
+
+def test_crashed_worker_only_fails_its_own_file(monkeypatch):
+    results = extract(monkeypatch, ['ok-1', 'crash-1', 'ok-2', 'ok-3', 'ok-4'], timeout=30)
+
+    assert [result.ok for result in results] == [True, False, True, True, True]
+    assert 'exited with code 1' in results[1].errors[0].message
+
+def test_time_budget_starts_when_a_worker_picks_the_file_up(monkeypatch):
+    # Three slow files on two workers: the third starts after 1.5 s and still has its full budget
+    results = extract(monkeypatch, ['slow-1', 'slow-2', 'slow-3', 'ok-1'], timeout=2.5)
+
+    assert all(result.ok for result in results)
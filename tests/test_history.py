@@ -0,0 +1,83 @@
+import sqlite3
+
+import pandas as pd
+
+from report_core import history
+from report_core.history import HistoryStore, duplicate_wells, history_rows
+from report_core.production import extract_wells_with_net_diff_bo
+
+from workbooks import MERGED_FIELD_CELLS, MERGED_FIELD_ROWS, PRODUCTION_HEADER, write_report
+
+def merged_field_result():
+    workbook = write_report(PRODUCTION_HEADER, MERGED_FIELD_ROWS, merged_field_cells=MERGED_FIELD_CELLS)
+    result = extract_wells_with_net_diff_bo(workbook)
+    assert result.ok
+    return result
+
+def test_history_rows_forward_fill_merged_field_cells():
+    rows = history_rows(merged_field_result())
+    assert rows[['Field', 'Well Name']].values.tolist() == [
+        ['Abrar', 'ABRAR-1'], ['Abrar', 'ABRAR-2'], ['Abrar', 'X-1'],
+        ['Sidra', 'SIDRA-1'], ['Sidra', 'X-1'],
+    ]
+
+def test_history_rows_agree_with_field_breakdown():
+    result = merged_field_result()
+    counts = history_rows(result).groupby('Field').size()
+    assert counts.to_dict() == result.field_stats['Wells'].to_dict()
+
+def test_store_keeps_wells_with_the_same_name_apart(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.sqlite'))
+    result = merged_field_result()
+    assert store.ingest_result(result, report_date='2024-05-01') == 5
+
+    totals = store.field_daily_totals()
+    assert totals.set_index('Field')['Wells'].to_dict() == {'Abrar': 3, 'Sidra': 2}
+    assert sorted(store.well_history('X-1')['Field']) == ['Abrar', 'Sidra']
+
+def test_reports_from_an_older_parser_are_stored_again(tmp_path, monkeypatch):
+    store = HistoryStore(str(tmp_path / 'history.sqlite'))
+    result = merged_field_result()
+    with monkeypatch.context() as patch:
+        patch.setattr(history, 'PARSER_VERSION', 'old')
+        store.ingest_result(result, report_date='2024-05-01')
+    assert not store.has_report(result.content_hash)
+
+    assert store.ingest_result(result, report_date='2024-05-01') == 5
+    assert store.has_report(result.content_hash)
+    assert store.ingest_result(result, report_date='2024-05-01') == 0
+    assert len(store.field_history('Abrar')) == 3
+
+def history_frame(rows):
+    return pd.DataFrame(rows, columns=history.HISTORY_COLUMNS)
+
+def test_wells_listed_twice_keep_every_row(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.sqlite'))
+    rows = history_frame([['Abrar', 'ABRAR-1', 100.0, 5.0, 20.0], ['Abrar', 'ABRAR-1', 50.0, -1.0, 30.0],
+                          ['Abrar', 'ABRAR-2', 10.0, 0.0, 10.0]])
+    assert duplicate_wells(rows) == ['Abrar / ABRAR-1']
+    assert store.ingest('hash-1', '2024-05-01', rows) == 3
+
+    totals = store.field_daily_totals().iloc[0]
+    assert (totals['Wells'], totals['Net BO'], totals['Net Diff BO']) == (3, 160.0, 4.0)
+
+    # A newer report of the same day replaces every row of the wells it lists
+    store.ingest('hash-2', '2024-05-01', history_frame([['Abrar', 'ABRAR-1', 90.0, 2.0, 25.0]]))
+    assert store.well_history('ABRAR-1')['Net BO'].tolist() == [90.0]
+    assert store.well_history('ABRAR-2')['Net BO'].tolist() == [10.0]
+
+def test_stores_without_entry_numbers_are_migrated(tmp_path):
+    path = str(tmp_path / 'history.sqlite')
+    with sqlite3.connect(path) as conn:
+        conn.executescript("""
+            CREATE TABLE well_rows (report_date TEXT NOT NULL, field TEXT NOT NULL, well TEXT NOT NULL,
+                                    net_bo REAL, net_diff_bo REAL, wc REAL, content_hash TEXT NOT NULL,
+                                    PRIMARY KEY (report_date, field, well)) WITHOUT ROWID;
+            INSERT INTO well_rows VALUES ('2024-05-01', 'Abrar', 'ABRAR-1', 100, 5, 20, 'hash-1');
+        """)
+    conn.close()
+
+    store = HistoryStore(path)
+    assert store.well_history('ABRAR-1')['Net BO'].tolist() == [100.0]
+    store.ingest('hash-2', '2024-05-02', history_frame([['Abrar', 'ABRAR-1', 90.0, 2.0, 25.0]] * 2))
+    assert store.well_history('ABRAR-1')['Net BO'].tolist() == [100.0, 90.0, 90.0]
@@ -0,0 +1,112 @@
+import io
+import random
+
+import pandas as pd
+import pytest
+
+from report_core import production
+from report_core.reader import (
+    REPORT_SHEET_NAME,
+    REPORT_SKIP_ROWS,
+    build_report_columns,
+    open_report_worksheet,
+    read_report_header,
+    stream_report_rows,
+)
+
+from workbooks import PRODUCTION_HEADER, write_report
+
+def pandas_columns(workbook):
+    frame = pd.read_excel(io.BytesIO(workbook), sheet_name=REPORT_SHEET_NAME, skiprows=REPORT_SKIP_ROWS,
+                          header=[0, 1])
+    return list(frame.columns)
+
+def streamed_columns(workbook):
+    _, worksheet = open_report_worksheet(workbook)
+    return read_report_header(worksheet)
+
+@pytest.mark.parametrize('header_rows', [
+    PRODUCTION_HEADER,
+    # Repeated labels get pandas' .1 / .2 suffixes
+    (['Field', 'RUNNING WELLS', 'TOTAL PRODUCTION', None, None, 'TOTAL PRODUCTION', None],
+     [None, None, 'Gross', 'Net\nBO', 'Net diff. BO', 'Net\nBO', 'Net\nBO']),
+    # Header rows of different widths, trailing columns without labels
+    (['Field', 'RUNNING WELLS', 'W/C'], ['A', None, '%', None, 'B', None, None]),
+])
+def test_header_matches_pandas(header_rows):
+    width = max(i + 1 for row in header_rows for i, value in enumerate(row) if value is not None)
+    workbook = write_report(header_rows, [['A', 'A-1', 1, 2, 3, 4, 'x'][:width]])
+    assert streamed_columns(workbook) == pandas_columns(workbook)
+
+def test_random_headers_match_pandas():
+    labels = ['Field', 'W/C', 'Net', 'Gross', 'A', None, None]
+    for seed in range(100):
+        rng = random.Random(seed)
+        level0 = [rng.choice(labels) or 'Field' if i == 0 else rng.choice(labels) for i in range(rng.randint(2, 8))]
+        level1 = [rng.choice(labels) for _ in range(rng.randint(1, 8))]
+        # Data rows no wider than the labelled header cells (see the suffix test below)
+        width = max(i + 1 for row in (level0, level1) for i, value in enumerate(row) if value is not None)
+        workbook = write_report([level0, level1], [[rng.choice([1, 'x', None]) for _ in range(width)]])
+        assert streamed_columns(workbook) == pandas_columns(workbook), (level0, level1)
+
+def test_columns_only_data_rows_reach_are_a_suffix():
+    workbook = write_report(PRODUCTION_HEADER, [['A', 'A-1', 1, 2, 3, 4, 'x', 'extra', 'extra']])
+    streamed = streamed_columns(workbook)
+    assert pandas_columns(workbook)[:len(streamed)] == streamed
+
+def test_full_width_matches_pandas():
+    header_rows = [['W/C', None, None], ['W/C', 'W/C', 'Field']]
+    workbook = write_report(header_rows, [[1, 2, 3, 4, 5, 6]])
+    assert build_report_columns(header_rows, width=6) == pandas_columns(workbook)
+
+def test_blank_spacer_rows_are_kept():
+    rows = [['A', 'A-1', 10, 9, 1, 5], [None] * 6, ['A', 'A-2', 10, 9, 2, 5], ['TOTAL', None, 20, 18, 3, 5]]
+    _, worksheet = open_report_worksheet(write_report(PRODUCTION_HEADER, rows))
+    streamed, total_index = stream_report_rows(worksheet, [0, 1, 3])
+    assert total_index == 3
+    assert streamed == [['A', 'A-1', 9], [None, None, None], ['A', 'A-2', 9]]
+
+def test_trailing_blank_rows_are_dropped():
+    # Empty string cells keep the trailing rows in the sheet XML, pandas treats them as blank
+    rows = [['A', 'A-1', 10, 9, 1, 5], [None] * 6, ['A', 'A-2', 10, 9, 2, 5], [''] * 6, [''] * 6]
+    workbook = write_report(PRODUCTION_HEADER, rows)
+    _, worksheet = open_report_worksheet(workbook)
+    streamed, total_index = stream_report_rows(worksheet, [0, 1, 3])
+    assert total_index is None
+    assert len(streamed) == 3
+    frame = pd.read_excel(io.BytesIO(workbook), sheet_name=REPORT_SHEET_NAME, skiprows=REPORT_SKIP_ROWS,
+                          header=[0, 1])
+    assert len(frame) == 3
+
+def extract(workbook, streaming, monkeypatch):
+    with monkeypatch.context() as patch:
+        if not streaming:
+            # The .xls fallback reads the whole sheet with pandas
+            patch.setattr(production, 'is_zip_workbook', lambda file_bytes: False)
+        production.get_extraction_cache().clear()
+        return production.extract_wells_with_net_diff_bo(workbook)
+
+@pytest.mark.parametrize('header_rows', [
+    PRODUCTION_HEADER,
+    (['Field', 'RUNNING WELLS', 'TOTAL PRODUCTION', None, None, 'W/C', 'TOTAL PRODUCTION', None],
+     [None, None, 'Gross', 'Net\nBO', 'Net diff. BO', '%', 'Net\nBO', 'Net diff. BO']),
+])
+def test_streaming_extraction_matches_pandas(header_rows, monkeypatch):
+    rows = [
+        ['Abrar', 'Abrar'],
+        ['Abrar', 'ABRAR-1', 100, 80, 5, 20, 1, 1],
+        ['Abrar', 'ABRAR-2', 100, 70, 0, 30, 1, 1],
+        [None] * 8,
+        ['Abrar', 'ABRAR-3', 100, 60, -4, 40, 1, 1],
+        ['TOTAL', None, 300, 210, 1, 30, 3, 3],
+        ['Remarks: none'],
+    ]
+    workbook = write_report(header_rows, rows)
+    streamed = extract(workbook, True, monkeypatch)
+    legacy = extract(workbook, False, monkeypatch)
+
+    assert streamed.ok and legacy.ok
+    assert streamed.original_columns == legacy.original_columns
+    assert len(streamed.df_before_total) == len(legacy.df_before_total) == 5
+    pd.testing.assert_frame_equal(streamed.final_df, legacy.final_df, check_dtype=False)
+    assert streamed.stats == legacy.stats
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from report_core.history import history_rows
+from report_core.production import extract_wells_with_net_diff_bo
+from report_core.wells import WellIndex, canonical_well_id, join_drilling_activity
+
+from workbooks import MERGED_FIELD_CELLS, MERGED_FIELD_ROWS, PRODUCTION_HEADER, write_report
+
+@pytest.mark.parametrize('name', ['ABRAR-84', 'Abrar 84', 'Abrar-84 ST', 'abrar-084', 'ABRAR_84ST2', 'Abrar-84 (S/T)'])
+def test_spellings_share_one_well_id(name):
+    assert canonical_well_id(name) == 'ABRAR-84'
+
+def test_names_ending_in_st_are_not_sidetracks():
+    assert canonical_well_id('West') == 'WEST'
+    assert canonical_well_id('Abrar-84A') == 'ABRAR-84A'
+
+def summary(well_name, file_name, last_24='Drilling ahead'):
+    return {'well_name': well_name, 'rig_name': 'EDC-11', 'last_24_summary': last_24,
+            'next_24_forecast': 'Continue', 'file_name': file_name}
+
+def test_join_keeps_forward_filled_fields():
+    result = extract_wells_with_net_diff_bo(
+        write_report(PRODUCTION_HEADER, MERGED_FIELD_ROWS, merged_field_cells=MERGED_FIELD_CELLS)
+    )
+    summaries = [
+        summary('Abrar 2', 'EDC-11 2024-05-01.xlsx', 'Old report'),
+        summary('ABRAR-002 ST', 'EDC-11 2024-05-02.xlsx', 'Latest report'),
+        summary('Rawda 5', 'EDC-12 2024-05-02.xlsx'),
+        summary('Not Found', 'EDC-13 2024-05-02.xlsx'),
+    ]
+    joined = join_drilling_activity(history_rows(result), summaries, WellIndex())
+
+    matched = joined[joined['Match'] == 'both']
+    assert matched[['Field', 'Well Name', 'Last 24 Hours']].values.tolist() == [['Abrar', 'ABRAR-2', 'Latest report']]
+    production = joined[joined['Match'] != 'drilling only']
+    assert '' not in set(production['Field'])
+    assert joined.loc[joined['Match'] == 'drilling only', 'Well ID'].tolist() == ['RAWDA-5']
+
+def test_aliases_are_persisted(tmp_path):
+    path = str(tmp_path / 'aliases.csv')
+    index = WellIndex(path)
+    assert index.well_id('Old Name 1') == 'OLD NAME-1'
+    index.add_alias('Old Name 1', 'Abrar 84')
+    assert index.well_id('Old Name 1') == 'ABRAR-84'
+
+    reloaded = WellIndex(path)
+    assert reloaded.well_ids(pd.Series(['old name-001', None])).tolist() == ['ABRAR-84', '']
@@ -0,0 +1,48 @@
+"""
+Small production 'Report' workbooks written with openpyxl for the tests
+"""
+import io
+
+import openpyxl
+from report_core.reader import REPORT_SHEET_NAME, REPORT_SKIP_ROWS
+
+PRODUCTION_HEADER = (
+    ['Field', 'RUNNING WELLS', 'TOTAL PRODUCTION', None, None, 'W/C', 'Remarks'],
+    [None, None, 'Gross', 'Net\nBO', 'Net diff. BO', '%', None],
+)
+
+def write_report(header_rows, rows, merged_field_cells=(), title='Daily Production Report 01/05/2024'):
+    """
+    Bytes of an .xlsx workbook with a 'Report' sheet: title rows, the header rows and the data rows
+
+    Only non-empty cells are written, so a row of None is a blank spacer row. merged_field_cells
+    are (first, last) data row positions whose Field cells are merged, with the value in the first.
+    """
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = REPORT_SHEET_NAME
+    sheet.cell(row=1, column=1, value=title)
+    for offset, row in enumerate(list(header_rows) + list(rows)):
+        for column, value in enumerate(row, start=1):
+            if value is not None:
+                sheet.cell(row=REPORT_SKIP_ROWS + 1 + offset, column=column, value=value)
+    first_data_row = REPORT_SKIP_ROWS + len(header_rows) + 1
+    for first, last in merged_field_cells:
+        sheet.merge_cells(start_row=first_data_row + first, end_row=first_data_row + last,
+                          start_column=1, end_column=1)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+# Two fields whose Field cells are merged over their wells; both have a well named 'X-1'
+MERGED_FIELD_ROWS = [
+    ['Abrar', 'Abrar'],
+    ['Abrar', 'ABRAR-1', 100, 80, 5, 20],
+    [None, 'ABRAR-2', 100, 70, 0, 30],
+    [None, 'X-1', 100, 60, -4, 40],
+    ['Sidra', 'Sidra'],
+    ['Sidra', 'SIDRA-1', 100, 50, 2, 50],
+    [None, 'X-1', 100, 40, 1, 60],
+    ['TOTAL', None, 500, 300, 4, 40],
+]
+MERGED_FIELD_CELLS = [(1, 3), (5, 6)]